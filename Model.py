@@ -68,5 +68,15 @@ class DHModel(BaseDHModel):
             {"joint_name": "j1", "joint_type": "r", "link_length": 0.4, "twist": 0, "joint_offset": 0.2, "theta": 0, 'offset': 0.0},
             {"joint_name": "j2", "joint_type": "r", "link_length": 0.4, "twist": 0, "joint_offset": 0, "theta": 0, 'offset': 0.0}
         ],
+
+        'iiwa7': [
+            {'joint_name': 'j1', 'joint_type': 'r', 'link_length': 0, 'twist': -90.0, 'joint_offset': 0.34,  'theta': 0.0, 'offset': 0.0},
+            {'joint_name': 'j2', 'joint_type': 'r', 'link_length': 0, 'twist': 90.0,  'joint_offset': 0.0,   'theta': 0.0, 'offset': 0.0},
+            {'joint_name': 'j3', 'joint_type': 'r', 'link_length': 0, 'twist': 90.0,  'joint_offset': 0.40,  'theta': 0.0, 'offset': 0.0},
+            {'joint_name': 'j4', 'joint_type': 'r', 'link_length': 0, 'twist': -90.0, 'joint_offset': 0.0,   'theta': 0.0, 'offset': 0.0},
+            {'joint_name': 'j5', 'joint_type': 'r', 'link_length': 0, 'twist': -90.0, 'joint_offset': 0.40,  'theta': 0.0, 'offset': 0.0},
+            {'joint_name': 'j6', 'joint_type': 'r', 'link_length': 0, 'twist': 90.0,  'joint_offset': 0.0,   'theta': 0.0, 'offset': 0.0},
+            {'joint_name': 'j7', 'joint_type': 'r', 'link_length': 0, 'twist': 0.0,   'joint_offset': 0.126, 'theta': 0.0, 'offset': 0.0},
+        ],
     }
 
@@ -11,8 +11,14 @@
 from .model import RobotModel
 from .fk import ForwardKinematics
 from .ik import InverseKinematics
+from .ik_seed import SeedIndex
+from .ik_regressor import SeedRegressor
+from .reachability import ReachabilityMap
+from .service import AsyncRobot
 from .jacobian import Jacobian
 from .trajectory import TrajectoryPlanner
+from .traj_poly import Trajectory
+from .traj_file import TrajectoryFile
 from .plotting import Plotter
 from .mviz import VizModel
 from .dhmodel_generator import generate_model_file
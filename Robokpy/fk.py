@@ -76,6 +76,66 @@ class ForwardKinematics:
         self.model.homogeneous_t_matrices = t_matrices
         return t_matrices
 
+    def _dh_columns(self):
+        """Constant DH columns as float arrays (twist in rads)."""
+        args = self.model.args
+        a = np.array([float(x['link_length']) for x in args])
+        twist = np.array([float(x['twist']) for x in args])
+        if not self.model.link_twist_in_rads:
+            twist = (twist / 180) * m.pi
+        d = np.array([float(x['joint_offset']) for x in args])
+        theta = np.array([float(x['theta']) for x in args])
+        offset = np.array([float(x.get('offset', 0.0)) for x in args])
+        revolute = np.array([x['joint_type'] == 'r' for x in args])
+        return a, twist, d, theta, offset, revolute
+
+    def frames_batch(self, joint_vars, rads=True):
+        """
+        Vectorized FK for N configurations.
+        Returns base-to-joint frames with shape (N, n+1, 4, 4); index 0 is the base
+        and index n the end effector. Does not touch the model state.
+        """
+        q = np.atleast_2d(np.asarray(joint_vars, dtype=float))
+        a, twist, d, theta, offset, revolute = self._dh_columns()
+        n = len(a)
+        if q.shape[1] != n:
+            raise IndexError(f"Expected {n} joint values but got {q.shape[1]}")
+        N = q.shape[0]
+        th = np.where(revolute, q if rads else np.deg2rad(q), theta)
+        dz = np.where(revolute, d, q) + offset
+        ct, st = np.cos(th), np.sin(th)
+        ca, sa = np.cos(twist), np.sin(twist)
+
+        A = np.zeros((N, n, 4, 4))
+        A[..., 0, 0] = ct
+        A[..., 0, 1] = -st * ca
+        A[..., 0, 2] = st * sa
+        A[..., 0, 3] = a * ct
+        A[..., 1, 0] = st
+        A[..., 1, 1] = ct * ca
+        A[..., 1, 2] = -ct * sa
+        A[..., 1, 3] = a * st
+        A[..., 2, 1] = sa
+        A[..., 2, 2] = ca
+        A[..., 2, 3] = dz
+        A[..., 3, 3] = 1.0
+
+        frames = np.empty((N, n + 1, 4, 4))
+        frames[:, 0] = np.eye(4)
+        for i in range(n):
+            np.matmul(frames[:, i], A[:, i], out=frames[:, i + 1])
+        return frames
+
+    def compute_batch(self, joint_vars, rads=True):
+        """End-effector transforms for N configurations, shape (N, 4, 4)."""
+        return self.frames_batch(joint_vars, rads)[:, -1]
+
+    def pose_batch(self, joint_vars, rads=True):
+        """End-effector poses [x, y, z, qx, qy, qz, qw] for N configurations."""
+        T = self.compute_batch(joint_vars, rads)
+        quats = R.from_matrix(T[:, :3, :3]).as_quat()
+        return np.hstack((T[:, :3, 3], quats))
+
     @staticmethod
     def _pair_multiply(htmxes):
         if len(htmxes) % 2 != 0:
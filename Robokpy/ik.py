@@ -8,8 +8,17 @@
 # You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
 # """
 
+import math as m
+import time
 import numpy as np
 from scipy.spatial.transform import Rotation as R
+from .ik_cache import IKCache
+from .ik_workspace import IKWorkspace
+from .ik_analytic import find_analytic_solver, target_to_pose, wrap_angle
+from .reachability import ReachabilityMap
+from .ik_branch import elbow_joint, branch_flags, parse_branch, branch_match
+from .ik_nullspace import (OBJECTIVES, jacobians_batch, jacobian_derivatives, manipulability,
+                           manipulability_gradient, joint_limit_gradient, rest_pose_gradient)
 
 class InverseKinematics:
     def __init__(self, model, fk, jacobian, damp=1e-2):
@@ -20,16 +29,245 @@ class InverseKinematics:
         self.success = False
         self.initial_guess_val = None
         self.initial_guess_rads = False
+        self.cache = None
+        self.seeder = None
+        self.active_joints = []
+        self.exit_reason = None
+        self.iterations = 0
+        self.final_error = None
+        self.verbose = True
+        self.workspace = None
+        self.method = 'dls'
+        self.use_analytic = True
+        self.last_solution = None
+        self.track_corrections = 0
+        self.reachability = None
+        self.reach_check = True
+        self.branch_retries = 8
+        self._branch_pool = None
+        self._elbow = False  # not looked up yet
+        self._revolute = None
+        self.objectives = []
+        self.null_max_iter = 50
+        self.null_tol = 1e-6
+        self.null_damp = 1e-9  # the projector stays within [0, 1] for any damping, keep it near exact
+        self.broyden_refresh = 10
+        self.broyden_reuse_tol = 0.05
+        self.jacobian_evals = 0
+        self.batch_exit_reasons = []
+        self._broyden_state = None  # (mask, config) the workspace Jacobian was last computed for
+        self._analytic = False  # not looked up yet
+        self.joint_weights = None
         
     def initial_guess(self, val, rads=False):
         self.initial_guess_rads = rads
         self.initial_guess_val = val
 
-    def init_guess(self):
-        if self.initial_guess_val is None:
-            num_of_joints = self.model.get_num_of_joints()
-            self.initial_guess_val = np.zeros(num_of_joints)
-        self.fk.compute(self.initial_guess_val, rads=self.initial_guess_rads)
+    def enable_cache(self, max_size=1024, pos_tol=1e-4, rot_tol=1e-3, seed_tol=1e-1):
+        """
+        Put an LRU solution cache in front of solve().
+        Targets within pos_tol (m) / rot_tol (quaternion units) of a cached pose,
+        solved with the same mask and a seed within seed_tol, reuse the cached
+        solution as the starting point and return without further iterations.
+        """
+        self.cache = IKCache(max_size=max_size, pos_tol=pos_tol, rot_tol=rot_tol, seed_tol=seed_tol)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    def cache_stats(self):
+        if self.cache is None:
+            raise ValueError("IK cache is not enabled, call enable_cache() first")
+        return self.cache.stats()
+
+    def set_method(self, method='dls'):
+        """
+        Select the iteration used by solve():
+            'dls' - damped least squares on [position error, quaternion rotation vector] (default)
+            'se3' - Newton iteration on the SE(3) log error log(T_target^-1 T) with its exact Jacobian
+            'broyden' - 'dls' with rank-1 Broyden Jacobian updates; the full Jacobian is recomputed
+                        every broyden_refresh iterations, when the error stops dropping, and is
+                        carried over to the next solve when it starts near the last configuration
+        """
+        assert method in ('dls', 'se3', 'broyden'), "IK method must be 'dls', 'se3' or 'broyden'"
+        self.method = method
+
+    def analytic_solver(self):
+        """Closed-form solver matching the DH structure (planar RR, SCARA) or None."""
+        if self._analytic is False:
+            self._analytic = find_analytic_solver(self.fk)
+        return self._analytic
+
+    def solve_analytic(self, targets, rpy_deg=False, seed=None):
+        """
+        Batched closed-form IK for targets of shape (N, 6) or (N, 7).
+        Returns every elbow branch as an array (N, branches, n) in rads / m and
+        a boolean (N, branches) array marking reachable solutions.
+        """
+        solver = self.analytic_solver()
+        if solver is None:
+            raise ValueError(f"No closed-form IK available for {self.model.robot_name}")
+        p, Rm = target_to_pose(targets, rpy_deg=rpy_deg)
+        yaw = np.arctan2(Rm[:, 1, 0], Rm[:, 0, 0])
+        return solver.branches(p, yaw, seed=seed)
+
+    def _analytic_seed(self, ws, mask, th, limits=None):
+        # Closest reachable closed-form branch to th; None if no branch applies
+        solver = self.analytic_solver()
+        yaw = None
+        if mask[5] != 0:
+            yaw = np.array([np.arctan2(ws.R_des[1, 0], ws.R_des[0, 0])])
+        q, valid = solver.branches(ws.p_des[None, :], yaw, seed=th)
+        q, valid = q[0], valid[0]
+        if limits is not None:
+            valid &= np.all((q >= limits[0]) & (q <= limits[1]), axis=1)
+        if not valid.any():
+            return None
+        diff = q - th
+        diff[:, ws.revolute] = wrap_angle(diff[:, ws.revolute])
+        dist = np.where(valid, np.linalg.norm(diff, axis=1), np.inf)
+        return np.array(q[np.argmin(dist)], dtype=float)
+
+    def get_workspace(self):
+        """Preallocated solver buffers, built once per robot on first use."""
+        if self.workspace is None:
+            self.workspace = IKWorkspace(self.model, self.fk)
+            self.workspace.set_joint_weights(self.joint_weights)
+        return self.workspace
+
+    def set_joint_weights(self, weights=None):
+        """
+        Joint weights W for the weighted pseudo-inverse step dθ = W⁻¹Jᵀ(JW⁻¹Jᵀ + λI)⁻¹e.
+        A joint with a larger weight takes a smaller share of the motion, which picks
+        the solution of a redundant (n > 6 or masked) task. None resets to equal weights.
+        """
+        if weights is not None:
+            if type(weights) not in [np.ndarray, list, tuple]:
+                raise TypeError("weights must be of type list or ndarray")
+            weights = np.array(weights, dtype=float)
+            n = self.model.get_num_of_joints()
+            if weights.shape != (n,):
+                raise ValueError(f"Expected {n} joint weights but got {weights.size}")
+            if not np.all(weights > 0):
+                raise ValueError("joint weights must be positive")
+        self.joint_weights = weights
+        if self.workspace is not None:
+            self.workspace.set_joint_weights(weights)
+
+    def branch_of(self, joint_vars, rads=True):
+        """
+        Configuration branch of one (n,) or several (N, n) joint vectors as flags
+        [shoulder, elbow, wrist] of +1 / -1 (0 where a flag does not apply).
+        Pass the flags of a known configuration to solve(branch=...) to stay on its branch.
+        """
+        q = np.asarray(joint_vars, dtype=float)
+        flags = self._branch_flags(self.fk.frames_batch(q, rads=rads))
+        return flags[0] if q.ndim == 1 else flags
+
+    def _branch_flags(self, frames):
+        if self._elbow is False:
+            self._elbow = elbow_joint(self.fk)
+            self._revolute = self.fk._dh_columns()[5]
+        return branch_flags(frames, self._elbow, self._revolute)
+
+    def _branch_seeds(self, p_desired, q_desired, mask, want, k, pool_size=4096, rot_weight=0.1):
+        # k sampled configurations on the wanted branch with poses closest to the target
+        if self._branch_pool is None or self._branch_pool[0] != self.model.model_hash():
+            lower, upper = self.model.get_sampling_bounds()
+            configs = np.random.default_rng(0).uniform(lower, upper, size=(pool_size, len(lower)))
+            poses = self.fk.pose_batch(configs)
+            self._branch_pool = (self.model.model_hash(), configs, poses, self.branch_of(configs))
+        configs, poses, flags = self._branch_pool[1:]
+        idx = np.flatnonzero(branch_match(flags, want))
+        mask = np.asarray(mask, dtype=float)
+        dist = np.linalg.norm((poses[idx, :3] - p_desired) * mask[:3], axis=1)
+        if np.any(mask[3:] != 0):
+            dot = np.clip(np.abs(poses[idx, 3:] @ q_desired), 0.0, 1.0)
+            dist = dist + rot_weight * 2.0 * np.arccos(dot)
+        return configs[idx[np.argsort(dist)[:k]]]
+
+    # -------------------------
+    # Null-space objectives
+    # -------------------------
+
+    def add_objective(self, name, weight=0.1, rest_pose=None):
+        """
+        Add a secondary objective that solve() follows in the null space of the task
+        when the chain has more joints than constrained task rows (mask):
+            'joint_limits'   - keep joints near the middle of their limits (sampling bounds if unset)
+            'manipulability' - climb log sqrt(det(J Jᵀ)) of the task rows, away from singularities
+            'rest_pose'      - stay close to rest_pose (rads / m)
+        After convergence the solver keeps stepping along the objectives for up to
+        null_max_iter iterations while the task error stays below tol.
+        """
+        assert name in OBJECTIVES, f"objective must be one of {OBJECTIVES}"
+        if type(weight) not in [int, float] or weight <= 0:
+            raise ValueError("weight must be a positive integer or float")
+        data = None
+        if name == 'rest_pose':
+            if rest_pose is None or len(rest_pose) != self.model.get_num_of_joints():
+                raise ValueError(f"rest_pose must hold {self.model.get_num_of_joints()} joint values")
+            data = np.array(rest_pose, dtype=float)
+        self.objectives.append((name, float(weight), data))
+
+    def clear_objectives(self):
+        self.objectives = []
+
+    def manipulability(self, joint_vars, mask=None, rads=True):
+        """Manipulability of one (n,) or several (N, n) configurations over the mask's task rows."""
+        q = np.asarray(joint_vars, dtype=float)
+        rows = None if mask is None else np.flatnonzero(np.asarray(mask) != 0)
+        J = jacobians_batch(self.fk.frames_batch(q, rads=rads), self.fk._dh_columns()[5])
+        w = manipulability(J, rows)
+        return w[0] if q.ndim == 1 else w
+
+    def _objective_gradient(self, th, ws, rows, bounds):
+        grad = np.zeros(ws.n)
+        for name, weight, data in self.objectives:
+            if name == 'joint_limits':
+                grad += weight * joint_limit_gradient(th, *bounds)
+            elif name == 'manipulability':
+                H = jacobian_derivatives(ws.frames[None], ws.revolute)
+                grad += weight * manipulability_gradient(ws.J[None], H, rows, log=True)[0]
+            else:
+                grad += weight * rest_pose_gradient(th, data)
+        return grad
+
+    def get_reachability(self):
+        """Reachability test used by solve(); a bounding sphere unless a voxel map was set."""
+        if self.reachability is None:
+            self.reachability = ReachabilityMap(self.model)
+        return self.reachability
+
+    def set_reachability(self, rmap):
+        """
+        Use rmap (a ReachabilityMap, e.g. with a voxel bitmap) to reject targets before solving.
+        Pass None to go back to the bounding sphere check.
+        """
+        if rmap is not None and not callable(getattr(rmap, 'reachable', None)):
+            raise TypeError("rmap must provide a reachable(points, mask) method")
+        self.reachability = rmap
+
+    def set_seeder(self, seeder):
+        """
+        Seed solve() from a pose lookup (e.g. SeedIndex or SeedRegressor) when no initial_guess is set.
+        The seeder must provide query(p_desired, q_desired, mask) returning joint values in rads.
+        Pass None to fall back to the zero configuration.
+        """
+        if seeder is not None and not callable(getattr(seeder, 'query', None)):
+            raise TypeError("seeder must provide a query(p_desired, q_desired, mask) method")
+        if callable(getattr(seeder, 'attach', None)):
+            seeder.attach(self.fk)
+        self.seeder = seeder
+
+    def init_guess(self, p_desired=None, q_desired=None, mask=None):
+        if self.initial_guess_val is not None:
+            self.fk.compute(self.initial_guess_val, rads=self.initial_guess_rads)
+        elif self.seeder is not None and p_desired is not None:
+            self.fk.compute(self.seeder.query(p_desired, q_desired, mask), rads=True)
+        else:
+            self.fk.compute(np.zeros(self.model.get_num_of_joints()), rads=True)
 
     # -------------------------
     # Quaternion utilities
@@ -62,25 +300,264 @@ class InverseKinematics:
         # robust — use SciPy
         return R.from_quat(q).as_rotvec()
 
+    # -------------------------
+    # Joint limits
+    # -------------------------
+
+    @staticmethod
+    def limited_step(Jw, ew, th, q_min, q_max, damp, w_inv=None):
+        """
+        Damped least squares step projected onto the joint limits.
+        Joints whose step would leave [q_min, q_max] are locked (their Jacobian
+        column removed) and the step is re-solved for the remaining joints.
+        w_inv holds the inverse joint weights of a weighted step.
+        """
+        rows, n = Jw.shape
+        w_inv = np.ones(n) if w_inv is None else w_inv
+        free = np.ones(n, dtype=bool)
+        locked = np.zeros(n)
+        for _ in range(n):
+            Jf = Jw * free
+            r = ew - Jw @ locked
+            if n < rows:
+                d_theta = np.linalg.solve(Jf.T @ Jf + np.diag(damp / w_inv), Jf.T @ r) + locked
+            else:
+                y = np.linalg.solve((Jf * w_inv) @ Jf.T + damp * np.eye(rows), r)
+                d_theta = w_inv * (Jf.T @ y) + locked
+            th_new = th + d_theta
+            blocked = free & ((th_new < q_min) | (th_new > q_max))
+            if not blocked.any():
+                break
+            # move the blocked joints onto their bound and lock them
+            locked[blocked] = (np.clip(th_new, q_min, q_max) - th)[blocked]
+            free &= ~blocked
+        return d_theta
+
+    # -------------------------
+    # Batched solves
+    # -------------------------
+
+    def solve_batch(self, targets, masks=None, **solve_kwargs):
+        """
+        Solve IK for N targets (N, 6) or (N, 7) in one call.
+        masks is None, a single mask for every target or one mask per target; the
+        remaining keyword arguments go to solve(). Returns joint values (N, n) in
+        rads / m and a boolean (N,) success array; exit reasons are kept in
+        self.batch_exit_reasons.
+        """
+        targets = [np.asarray(t, dtype=float) for t in targets]
+        if masks is None or (len(masks) == 6 and all(m is not None and np.ndim(m) == 0 for m in masks)):
+            masks = [masks] * len(targets)
+        if len(masks) != len(targets):
+            raise ValueError(f"Expected {len(targets)} masks but got {len(masks)}")
+        n = self.model.get_num_of_joints()
+        q = np.zeros((len(targets), n))
+        success = np.zeros(len(targets), dtype=bool)
+        self.batch_exit_reasons = []
+        verbose, self.verbose = self.verbose, False
+        try:
+            for k, (target, mask) in enumerate(zip(targets, masks)):
+                q[k] = self.solve(target, mask=mask, **solve_kwargs)
+                success[k] = self.success
+                self.batch_exit_reasons.append(self.exit_reason)
+        finally:
+            self.verbose = verbose
+        return q, success
+
+    def solve_vectorized(self, targets, mask=None, tol=1e-3, max_iter=500, rpy_deg=False, q_start=None):
+        """
+        Weighted damped least squares for N targets (N, 6) or (N, 7) advanced together:
+        every iteration runs batched FK, batched Jacobians and one stacked linear solve
+        (6×6 or n×n, whichever is smaller), so the per-target Python overhead of solve()
+        is paid once per iteration instead of once per target.
+        All targets share one mask. q_start (rads / m) is a single seed or one per target,
+        zeros by default; joint weights and joint limits (by clipping) apply as in solve().
+        Returns joint values (N, n) and a boolean (N,) success array; exit reasons
+        ('converged' / 'max_iter') are kept in self.batch_exit_reasons.
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=float))
+        if targets.shape[1] == 7:
+            rot = R.from_quat(targets[:, 3:])
+        elif targets.shape[1] == 6:
+            rot = R.from_euler("xyz", np.deg2rad(targets[:, 3:]) if rpy_deg else targets[:, 3:])
+        else:
+            raise ValueError("Targets must have 6 (RPY) or 7 (quaternion) columns")
+        if mask is None:
+            mask = [1, 1, 1, 1, 1, 1]
+        elif type(mask) not in [np.ndarray, list]:
+            raise TypeError(f"mask must be of type list or ndarray. e.g: {[1, 1, 1, 1, 1, 1]}")
+        w = np.asarray(mask, dtype=float)
+
+        N, n = len(targets), self.model.get_num_of_joints()
+        p_des = targets[:, :3]
+        R_des = rot.as_matrix()
+        q = np.zeros((N, n)) if q_start is None else np.array(np.broadcast_to(q_start, (N, n)), dtype=float)
+        limits = self.model.get_joint_limits()
+        use_limits = self.model.joint_lim_enable and len(limits) != 0
+        if use_limits:
+            q_min = np.asarray(limits[0], dtype=float)
+            q_max = np.asarray(limits[1], dtype=float)
+            np.clip(q, q_min, q_max, out=q)
+        revolute = self.fk._dh_columns()[5]
+        w_q = np.ones(n) if self.joint_weights is None else self.joint_weights
+        w_inv = 1.0 / w_q
+        damp = self.damp
+
+        success = np.zeros(N, dtype=bool)
+        active = np.arange(N)
+        for it in range(int(max_iter) + 1):
+            frames = self.fk.frames_batch(q[active], rads=True)
+            T = frames[:, -1]
+            err = np.empty((len(active), 6))
+            err[:, :3] = p_des[active] - T[:, :3, 3]
+            err[:, 3:] = R.from_matrix(R_des[active] @ T[:, :3, :3].transpose(0, 2, 1)).as_rotvec()
+            err *= w
+            done = np.einsum('ij,ij->i', err, err) < tol * tol
+            success[active[done]] = True
+            keep = ~done
+            active, err = active[keep], err[keep]
+            if len(active) == 0 or it == max_iter:
+                break
+            J = jacobians_batch(frames[keep], revolute) * w[:, None]
+            Jt = J.transpose(0, 2, 1)
+            if n < 6:
+                A = Jt @ J + np.diag(damp * w_q)
+                d_theta = np.linalg.solve(A, (Jt @ err[..., None]))[..., 0]
+            else:
+                Js = J * w_inv
+                A = Js @ Jt + damp * np.eye(6)
+                d_theta = (Js.transpose(0, 2, 1) @ np.linalg.solve(A, err[..., None]))[..., 0]
+            q[active] += d_theta
+            if use_limits:
+                q[active] = np.clip(q[active], q_min, q_max)
+
+        self.batch_exit_reasons = ['converged' if ok else 'max_iter' for ok in success]
+        return q, success
+
+    # -------------------------
+    # Resolved-rate tracking
+    # -------------------------
+
+    def track(self, poses, velocities, times, mask=None, tol=1e-3, q_start=None):
+        """
+        Differential IK along a dense Cartesian path.
+        Integrates dq = J^+ (xdot dt + e) from sample to sample, where xdot is the
+        planned TCP twist and e the residual pose error, and takes a single corrective
+        Newton step only when the error at a sample exceeds tol.
+        Args:
+            poses: (N, 7) [x, y, z, qx, qy, qz, qw] samples
+            velocities: (N, 3) planned linear TCP velocities
+            times: (N,) sample times
+            q_start: joint vector (rads / m) at poses[0]; solved with solve() if None
+        Returns an (N, n) array of joint vectors.
+        """
+        poses = np.asarray(poses, dtype=float)
+        velocities = np.asarray(velocities, dtype=float)
+        times = np.asarray(times, dtype=float)
+        if poses.ndim != 2 or poses.shape[1] != 7:
+            raise ValueError("poses must have shape (N, 7) [x, y, z, qx, qy, qz, qw]")
+        if len(velocities) != len(poses) or len(times) != len(poses):
+            raise ValueError("poses, velocities and times must have the same length")
+        mask = [1, 1, 1, 1, 1, 1] if mask is None else mask
+        w = np.array(mask, dtype=float)
+
+        if q_start is None:
+            self.solve(poses[0], mask=mask, tol=tol)
+            if not self.success:
+                raise ValueError("IK tracking failed: the start pose could not be solved")
+            q_start = self.last_solution
+        q = np.array(q_start, dtype=float)
+
+        limits = self.model.get_joint_limits()
+        use_limits = self.model.joint_lim_enable and len(limits) != 0
+
+        ws = self.get_workspace()
+        self._broyden_state = None  # the workspace Jacobian is overwritten below
+        R_prev = np.zeros((3, 3))
+        rot_inc = np.zeros(6)
+        out = np.empty((len(poses), len(q)))
+        self.track_corrections = 0
+
+        for k in range(len(poses)):
+            quat = poses[k, 3:] / np.linalg.norm(poses[k, 3:])
+            ws.set_target(poses[k, :3], quat, w)
+            ws.update(q)
+            if ws.error() > tol:
+                # drift: one corrective Newton step back onto the path
+                ws.jacobian()
+                q += ws.dls_step(self.damp)
+                if use_limits:
+                    np.clip(q, limits[0], limits[1], out=q)
+                ws.update(q)
+                ws.error()
+                self.track_corrections += 1
+            out[k] = q
+            if k == len(poses) - 1:
+                break
+
+            # feed-forward twist to the next sample on top of the residual error
+            dt = times[k + 1] - times[k]
+            R_prev[:] = ws.R_des
+            ws.err[:3] += 0.5 * (velocities[k] + velocities[k + 1]) * dt * w[:3]
+            nq = poses[k + 1, 3:] / np.linalg.norm(poses[k + 1, 3:])
+            ws.set_target(poses[k + 1, :3], nq, w)
+            ws._rotation_log(ws.R_des @ R_prev.T, rot_inc)
+            ws.err[3:] += rot_inc[3:] * w[3:]
+            ws.jacobian()
+            q += ws.dls_step(self.damp)
+            if use_limits:
+                np.clip(q, limits[0], limits[1], out=q)
+
+        return out
+
     # -------------------------
     # Main IK solver
     # -------------------------
     def solve(self, target_position, mask=None, tol=1e-3, max_iter=500,
-              rpy_deg=False, output_deg=False):
-        
+              rpy_deg=False, output_deg=False, stall_tol=1e-3, stall_window=20,
+              step_tol=1e-10, time_budget=None, deadline=None, method=None,
+              branch=None, q_seed=None):
+        """
+        Solve IK for a single target pose with damped least squares.
+        method overrides self.method ('dls' or 'se3'). The 'se3' iteration measures the
+        error as the twist log(T_target^-1 T) and needs the full pose, so masked targets
+        fall back to 'dls'.
+        The loop ends as soon as one of these holds; the cause is stored in self.exit_reason:
+            'converged'  - error norm below tol
+            'max_iter'   - max_iter iterations used
+            'stalled'    - error improved by less than stall_tol (relative) over stall_window iterations
+            'small_step' - joint step norm below step_tol
+            'deadline'   - time_budget seconds elapsed or time.perf_counter() passed deadline
+            'wrong_branch' - no seed converged on the requested branch
+        branch restricts the solution to a configuration branch (see branch_of), e.g.
+        {'elbow': 1}; q_seed (rads) replaces the initial guess for this call.
+        Targets that fail the reachability precheck (see set_reachability) are rejected
+        without iterating and report 'unreachable'.
+        A failed solve returns the lowest-error iterate (zeros when rejected before iterating);
+        check self.success.
+        """
+        t_start = time.perf_counter()
+
         if type(target_position) not in [np.ndarray, list]:
             raise TypeError(f"Expected a list of cartesian waypoints but got {type(target_position)}")
         if type(tol) not in [int, float]:
             raise TypeError("tolerance must be of type integer or float")
         if type(max_iter) not in [int, float]:
             raise TypeError("max_iter must be of type integer or float")
-        
-        print("\nIK:searching...")
-        print("────────────────────────────────────────────────────────")
-        print(f"{'Iter':>4} | {'Error':>12} | {'Δθ':>12}")
-        print("────────────────────────────────────────────────────────")
-
-        self.init_guess()
+        if type(stall_window) not in [int, float]:
+            raise TypeError("stall_window must be of type integer or float")
+        if stall_window < 1:
+            raise ValueError("stall_window must be at least 1")
+        stall_window = int(stall_window)
+        for name, val in (('time_budget', time_budget), ('deadline', deadline)):
+            if val is not None and type(val) not in [int, float]:
+                raise TypeError(f"{name} must be of type integer or float")
+
+        t_stop = np.inf
+        if time_budget is not None:
+            t_stop = t_start + time_budget
+        if deadline is not None:
+            t_stop = min(t_stop, deadline)
 
         if mask is None:
             mask = [1, 1, 1, 1, 1, 1]
@@ -90,6 +567,11 @@ class InverseKinematics:
         mask_p = np.array(mask[:3], dtype=float)
         mask_r = np.array(mask[3:], dtype=float)
 
+        method = self.method if method is None else method
+        assert method in ('dls', 'se3', 'broyden'), "IK method must be 'dls', 'se3' or 'broyden'"
+        broyden = method == 'broyden'
+        se3 = method == 'se3' and np.all(mask_p != 0) and np.all(mask_r != 0)
+
         # --------------------------------
         # Process target input
         # --------------------------------
@@ -109,75 +591,247 @@ class InverseKinematics:
 
         q_desired = self.normalize_quat(q_desired)
 
-        # --------------------------------
-        # IK iteration loop
-        # --------------------------------
-        i = 0
-        th = np.zeros(self.model.num_of_joints)
-        final_conv_error = 0
-        damp = self.damp
-
-        while True:
-            # FK current pose
-            p_current = np.array(self.fk.get_target_xyz(), dtype=float)
-            q_current = self.normalize_quat(
-                np.array(self.fk.get_target_quart(), dtype=float)
-            )
+        if self.reach_check and not self.get_reachability().reachable(p_desired, mask)[0]:
+            self.success = False
+            self.exit_reason = 'unreachable'
+            self.iterations = 0
+            self.final_error = None
+            self.active_joints = []
+            if self.verbose:
+                print(f"\nWarning!: target position {p_desired.tolist()} is outside the reachable workspace.")
+            return np.zeros(self.model.num_of_joints)
 
-            # Position error
-            e_position = (p_desired - p_current) * mask_p
+        if self.verbose:
+            print("\nIK:searching...")
+            print("────────────────────────────────────────────────────────")
+            print(f"{'Iter':>4} | {'Error':>12} | {'Δθ':>12}")
+            print("────────────────────────────────────────────────────────")
 
-            # Quaternion orientation error
-            q_err = self.quat_mul(q_desired, self.quat_conjugate(q_current))
-            e_orientation = self.quat_to_rotvec(q_err)
-            e_orientation = e_orientation * mask_r
+        if q_seed is not None:
+            self.fk.compute(np.asarray(q_seed, dtype=float), rads=True)
+        else:
+            self.init_guess(p_desired, q_desired, mask)
 
-            # Final error vector
-            error = np.concatenate((e_position, e_orientation))
+        # --------------------------------
+        # IK iteration loop
+        # --------------------------------
+        # start from the seed the FK state was initialized with
+        th = np.array(self.fk.get_joint_states(), dtype=float)
+
+        want = None if branch is None else parse_branch(branch)
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            cache_key = self.cache.key(p_desired, q_desired, mask, th, want)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                th = cached
+                if self.verbose:
+                    print("IK: cache hit")
 
-            # Check convergence
-            if np.linalg.norm(error) < tol:
+        damp = self.damp
+        ws = self.get_workspace()
+        ws.set_target(p_desired, q_desired, np.hstack((mask_p, mask_r)))
+
+        # Joint limits are enforced inside the loop when enabled on the model
+        limits = self.model.get_joint_limits()
+        use_limits = self.model.joint_lim_enable and len(limits) != 0
+        if use_limits:
+            q_min = np.asarray(limits[0], dtype=float)
+            q_max = np.asarray(limits[1], dtype=float)
+        self.active_joints = []
+
+        # with a target branch, seeds on the wrong branch are swapped for pool samples on it
+        seeds = [th]
+        pooled = False
+        if want is not None and not branch_match(self.branch_of(th), want)[0]:
+            seeds = list(self._branch_seeds(p_desired, q_desired, mask, want, self.branch_retries)) or seeds
+            pooled = True
+
+        # ring buffer of past error norms for stall detection
+        err_history = np.empty(stall_window)
+        # lowest-error iterate over all seeds, returned when the solve fails
+        best_th, best_err = th.copy(), np.inf
+        verbose = self.verbose
+        total_iters = 0
+
+        # secondary objectives only act when the task leaves joints free
+        rows = np.flatnonzero(np.hstack((mask_p, mask_r)) != 0)
+        redundant = bool(self.objectives) and len(rows) < ws.n
+        bounds = self.model.get_sampling_bounds() if redundant else None
+
+        # the objectives read the exact Jacobian, so Broyden updates are only used without them
+        broyden = broyden and not redundant
+        # Jw holds the mask weights, so reuse needs the same weights, not only the same rows
+        mask_key = tuple(np.round(np.hstack((mask_p, mask_r)) * 1e6).astype(np.int64).tolist())
+        if not broyden:
+            self._broyden_state = None
+        self.jacobian_evals = 0
+
+        for attempt, th in enumerate(seeds):
+            th = np.array(th, dtype=float)
+            if use_limits:
+                np.clip(th, q_min, q_max, out=th)
+            self.exit_reason = None
+
+            # closed-form start for planar RR / SCARA models; the loop below only verifies it
+            if self.use_analytic and (cached is None or attempt > 0) and self.analytic_solver() is not None:
+                q_closed = self._analytic_seed(ws, mask, th, (q_min, q_max) if use_limits else None)
+                if q_closed is not None:
+                    th = q_closed
+
+            i = 0
+            nudges = 0
+            null_i = 0
+            null_done = False
+            th_conv = None
+            if broyden:
+                # reuse the workspace Jacobian of the previous solve when it starts nearby
+                state = self._broyden_state
+                b_age = 0 if state is not None and state[0] == mask_key and \
+                    np.abs(state[1] - th).max() < self.broyden_reuse_tol else None
+                err_prev = np.zeros(6)
+                err_last = np.inf
+                th_prev = th.copy()
+            while True:
+                # FK current pose and weighted pose error
+                ws.update(th)
+                err_norm = ws.se3_error() if se3 else ws.error()
+                if err_norm < best_err:
+                    best_th, best_err = th.copy(), err_norm
+
+                # Check convergence / termination
+                self.success = err_norm < tol
+                optimizing = self.success and redundant and not null_done and \
+                    null_i < self.null_max_iter and time.perf_counter() < t_stop
+                if optimizing:
+                    # converged: keep moving along the objectives, remember the last converged state
+                    th_conv, err_conv = th.copy(), err_norm
+                    null_i += 1
+                elif self.success:
+                    self.exit_reason = 'converged'
+                elif i >= max_iter:
+                    self.exit_reason = 'max_iter'
+                elif i >= stall_window and \
+                        err_history[i % stall_window] - err_norm < stall_tol * err_history[i % stall_window]:
+                    self.exit_reason = 'stalled'
+                elif time.perf_counter() >= t_stop:
+                    self.exit_reason = 'deadline'
+                if self.exit_reason is not None:
+                    break
+                err_history[i % stall_window] = err_norm
+
+                # Jacobian and damped least squares
+                if broyden and b_age is not None and b_age < self.broyden_refresh and \
+                        (i == 0 or err_norm < 0.9 * err_last):
+                    if i > 0:
+                        # rank-1 secant update so that Jw (θ - θ_prev) matches the observed pose change
+                        dth = th - th_prev
+                        dth_sq = dth.dot(dth)
+                        if dth_sq > 0.0:
+                            r = (err_prev - ws.err) - ws.Jw @ dth
+                            ws.Jw += np.outer(r, dth / dth_sq)
+                    b_age += 1
+                else:
+                    ws.jacobian()
+                    self.jacobian_evals += 1
+                    b_age = 0
+                if broyden:
+                    err_prev[:] = ws.err
+                    th_prev[:] = th
+                    err_last = err_norm
+                if se3:
+                    # Newton step J_e dθ = -xi, damping shrinks with the error
+                    ws.se3_jacobian()
+                    ws.err *= -1.0
+                    damp_k = damp * min(1.0, err_norm)
+                else:
+                    damp_k = damp
+                if use_limits:
+                    d_theta = self.limited_step(ws.Jw, ws.err, th, q_min, q_max, damp_k,
+                                                ws.w_inv if ws.weighted else None)
+                else:
+                    d_theta = ws.dls_step(damp_k)
+                if redundant:
+                    d_null = ws.null_step(self._objective_gradient(th, ws, rows, bounds), self.null_damp)
+                    if optimizing and m.sqrt(d_null.dot(d_null)) < self.null_tol:
+                        null_done = True
+                    d_theta = d_theta + d_null
+                step_norm = m.sqrt(d_theta.dot(d_theta))
+
+                if use_limits and not self.success and step_norm < step_tol and nudges < 3:
+                    # a step blocked by joints on their bounds (e.g. a stretched elbow held on its
+                    # limit, where the Jacobian is singular) has not vanished: move them off the bound
+                    low, high = th <= q_min + 1e-12, th >= q_max - 1e-12
+                    if low.any() or high.any():
+                        d_theta = 1e-3 * (q_max - q_min) * (low.astype(float) - high)
+                        step_norm = m.sqrt(d_theta.dot(d_theta))
+                        nudges += 1
+
+                if not step_norm >= step_tol:  # also catches a failed (NaN) solve
+                    self.exit_reason = 'converged' if self.success else 'small_step'
+                    break
+
+                # Apply update
+                th += d_theta
+                if use_limits:
+                    np.clip(th, q_min, q_max, out=th)
+
+                # Logging
+                if verbose and i % 10 == 0:
+                    print(f"{i:4d} | {err_norm:12.6e} | {step_norm:12.6e}")
+
+                i += 1
+
+            total_iters += i
+            if broyden and b_age is not None:
+                # Jw is valid near th only if this solve computed or reused it
+                self._broyden_state = (mask_key, th.copy())
+            if not self.success and th_conv is not None:
+                # drifted out of tolerance while following the objectives
+                th, err_norm = th_conv, err_conv
+                ws.update(th)
                 self.success = True
-                break
-            if i >= max_iter:
+                self.exit_reason = 'converged'
+            if self.success and want is not None and not branch_match(self._branch_flags(ws.frames[None]), want)[0]:
                 self.success = False
+                self.exit_reason = 'wrong_branch'
+            if self.success or self.exit_reason == 'deadline':
                 break
+            if want is not None and not pooled:
+                # the seed failed or left the branch, continue from pool seeds on it
+                seeds += list(self._branch_seeds(p_desired, q_desired, mask, want, self.branch_retries))
+                pooled = True
 
-            # Jacobian and damped least squares
-            try:
-                J = np.asarray(self.jacobian.compute())  # 6×n
-
-                # Weighted rows (masking)
-                W = np.diag(np.hstack((mask_p, mask_r)))
-                Jw = W @ J
-                ew = W @ error
-
-                JJt = Jw @ Jw.T
-                y = np.linalg.solve(JJt + damp * np.eye(6), ew)
-                d_theta = Jw.T @ y
-
-            except Exception:
-                d_theta = np.zeros(self.model.num_of_joints)
-
-            # Apply update
-            th += d_theta
-            self.fk.compute(th, rads=True)
-
-            # Logging
-            if i % 10 == 0:
-                print(f"{i:4d} | {np.linalg.norm(error):12.6e} | {np.linalg.norm(d_theta):12.6e}")
-
-            final_conv_error = f"{np.linalg.norm(error):.6f}"
-            i += 1
+        i = total_iters
+        if not self.success:
+            th, err_norm = best_th, best_err
+        final_conv_error = f"{err_norm:.6f}"
+        self.fk.compute(th, rads=True)
 
         # --------------------------------
         # Output
         # --------------------------------
-        if self.success:
-            print("────────────────────────────────────────────────────────")
-            print(f"Converged in {i} iterations")
-            print(f"Final error norm: {final_conv_error}")
+        self.iterations = i
+        self.final_error = float(err_norm)
 
+        if self.success:
+            if self.verbose:
+                print("────────────────────────────────────────────────────────")
+                print(f"Converged in {i} iterations")
+                print(f"Final error norm: {final_conv_error}")
+
+            if cache_key is not None:
+                self.cache.put(cache_key, th)
+
+            if use_limits:
+                names = self.model.get_joint_names()
+                at_bound = (th <= q_min + 1e-9) | (th >= q_max - 1e-9)
+                self.active_joints = [names[j] for j in np.flatnonzero(at_bound)]
+                if self.active_joints and self.verbose:
+                    print(f"Joints at limit: {', '.join(self.active_joints)}")
+
+            self.last_solution = th.copy()
             self.model.joint_states_deg = output_deg
             result = self.fk.get_joint_states(in_degrees=output_deg)
 
@@ -186,9 +840,20 @@ class InverseKinematics:
             return result
 
         else:
+            reasons = {
+                'max_iter': "within maximum iterations",
+                'stalled': f"(error stalled after {i} iterations)",
+                'small_step': f"(step vanished after {i} iterations)",
+                'deadline': f"within the time budget ({i} iterations)",
+                'wrong_branch': f"on the requested configuration branch ({len(seeds)} seeds tried)",
+            }
+            if self.verbose:
+                print(f"\nWarning!: solver failed to converge {reasons[self.exit_reason]}.")
+                print(f"Final error norm: {final_conv_error}")
+                print("────────────────────────────────────────────────────────")
+            self.model.joint_states_deg = output_deg
+            self.fk.compute(th, rads=True)
+            result = self.fk.get_joint_states(in_degrees=output_deg)
             self.fk.compute(np.zeros(self.model.num_of_joints), rads=True)
-            print("\nWarning!: solver failed to converge within maximum iterations.")
-            print(f"Final error norm: {final_conv_error}")
-            print("────────────────────────────────────────────────────────")
-            return np.zeros(self.model.num_of_joints)
+            return result
 
@@ -0,0 +1,132 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+# -------------------------
+# Closed-form IK for simple topologies
+# -------------------------
+
+def wrap_angle(q):
+    return (np.asarray(q) + np.pi) % (2 * np.pi) - np.pi
+
+
+def target_to_pose(targets, rpy_deg=False):
+    """
+    Split (N, 7) [x,y,z,qx,qy,qz,qw] or (N, 6) [x,y,z,r,p,y] targets into
+    positions (N, 3) and rotation matrices (N, 3, 3).
+    """
+    targets = np.atleast_2d(np.asarray(targets, dtype=float))
+    if targets.shape[1] == 7:
+        rot = R.from_quat(targets[:, 3:])
+    elif targets.shape[1] == 6:
+        rot = R.from_euler("xyz", targets[:, 3:], degrees=rpy_deg)
+    else:
+        raise ValueError("Target must be length 6 (RPY) or 7 (quaternion)")
+    return targets[:, :3], rot.as_matrix()
+
+
+def two_link(x, y, a1, a2):
+    """
+    Both elbow branches of a planar two-link arm reaching (x, y).
+    Returns q1, q2 with shape (N, 2) (branch 0: q2 >= 0, branch 1: q2 <= 0)
+    and a boolean (N,) reachability flag.
+    """
+    c2 = (x * x + y * y - a1 * a1 - a2 * a2) / (2 * a1 * a2)
+    reachable = np.abs(c2) <= 1 + 1e-9
+    s2 = np.sqrt(np.clip(1 - c2 * c2, 0.0, None))
+    q2 = np.stack((np.arctan2(s2, c2), np.arctan2(-s2, c2)), axis=-1)
+    q1 = np.arctan2(y, x)[:, None] - np.arctan2(a2 * np.sin(q2), a1 + a2 * np.cos(q2))
+    return wrap_angle(q1), q2, reachable
+
+
+class PlanarRR:
+    """Two revolute joints with parallel axes (e.g. the '2dof' model)."""
+    name = 'planar_rr'
+    n_joints = 2
+
+    def __init__(self, a1, a2, z0):
+        self.a1, self.a2, self.z0 = a1, a2, z0
+
+    @classmethod
+    def match(cls, fk):
+        a, twist, d, theta, offset, revolute = fk._dh_columns()
+        if len(a) != 2 or not revolute.all():
+            return None
+        if not (np.isclose(np.cos(twist[0]), 1.0) and np.isclose(np.sin(twist[1]), 0.0)):
+            return None
+        if np.isclose(a[0], 0.0) or np.isclose(a[1], 0.0):
+            return None
+        return cls(a[0], a[1], float(np.sum(d + offset)))
+
+    def branches(self, p, yaw=None, seed=None):
+        """Joint solutions (N, 2, 2) for positions p (N, 3); yaw is implied by the elbow branch."""
+        q1, q2, reachable = two_link(p[:, 0], p[:, 1], self.a1, self.a2)
+        q = np.stack((q1, q2), axis=-1)
+        valid = np.repeat(reachable[:, None], 2, axis=1)
+        return q, valid
+
+
+class SCARA:
+    """R-R-P-R arm with vertical parallel revolute axes (e.g. the 'Cobra600' model)."""
+    name = 'scara'
+    n_joints = 4
+
+    def __init__(self, a1, a2, z0, sigma, d_tool, theta3):
+        self.a1, self.a2, self.z0 = a1, a2, z0
+        self.sigma = sigma      # +1 if the quill moves along +z, -1 if along -z
+        self.d_tool = d_tool    # constant z travel after the quill (prismatic offset + j4 offsets)
+        self.theta3 = theta3
+
+    @classmethod
+    def match(cls, fk):
+        a, twist, d, theta, offset, revolute = fk._dh_columns()
+        if len(a) != 4 or list(revolute) != [True, True, False, True]:
+            return None
+        if not (np.isclose(np.cos(twist[0]), 1.0) and np.isclose(np.sin(twist[1]), 0.0)
+                and np.isclose(np.cos(twist[2]), 1.0) and np.isclose(np.sin(twist[3]), 0.0)):
+            return None
+        if not (np.isclose(a[2], 0.0) and np.isclose(a[3], 0.0)):
+            return None
+        if np.isclose(a[0], 0.0) or np.isclose(a[1], 0.0):
+            return None
+        z0 = float(d[0] + offset[0] + d[1] + offset[1])
+        sigma = float(np.sign(np.cos(twist[1])))
+        return cls(a[0], a[1], z0, sigma, float(offset[2] + d[3] + offset[3]), float(theta[2]))
+
+    def branches(self, p, yaw=None, seed=None):
+        """
+        Joint solutions (N, 2, 4) for positions p (N, 3) and tool yaw (N,).
+        When yaw is None the wrist joint keeps its seed value (or 0).
+        """
+        N = len(p)
+        q1, q2, reachable = two_link(p[:, 0], p[:, 1], self.a1, self.a2)
+        q3 = self.sigma * (p[:, 2] - self.z0) - self.d_tool
+        if yaw is None:
+            q4 = np.zeros((N, 2)) if seed is None else np.broadcast_to(np.asarray(seed)[..., 3:4], (N, 2))
+        else:
+            # tool yaw = q1 + q2 + sigma * (theta3 + q4)
+            q4 = wrap_angle(self.sigma * (np.asarray(yaw)[:, None] - q1 - q2) - self.theta3)
+        q = np.stack((q1, q2, np.repeat(q3[:, None], 2, axis=1), q4), axis=-1)
+        valid = np.repeat(reachable[:, None], 2, axis=1)
+        return q, valid
+
+
+ANALYTIC_SOLVERS = [PlanarRR, SCARA]
+
+
+def find_analytic_solver(fk):
+    """Closed-form solver matching the model's DH structure, or None."""
+    for solver in ANALYTIC_SOLVERS:
+        matched = solver.match(fk)
+        if matched is not None:
+            return matched
+    return None
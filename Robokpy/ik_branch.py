@@ -0,0 +1,93 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+
+# -------------------------
+# Configuration branches (shoulder / elbow / wrist)
+# -------------------------
+
+BRANCH_NAMES = ('shoulder', 'elbow', 'wrist')
+
+
+def elbow_joint(fk):
+    """
+    Index k of the first pair of revolute joints (k, k+1) with parallel axes,
+    i.e. the shoulder-elbow pair of the arm, or None if the arm has no such pair.
+    """
+    a, twist, d, theta, offset, revolute = fk._dh_columns()
+    for k in range(len(a) - 1):
+        if revolute[k] and revolute[k + 1] and np.isclose(np.sin(twist[k]), 0.0):
+            return k
+    return None
+
+
+def _cross_dot(u, v, w):
+    # (u x v) . w row by row, without np.cross overhead on small batches
+    return (w[:, 0] * (u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1])
+            + w[:, 1] * (u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2])
+            + w[:, 2] * (u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]))
+
+
+def branch_flags(frames, k, revolute, eps=1e-6):
+    """
+    Branch flags (N, 3) of configurations given their FK frames (N, n+1, 4, 4).
+    Each flag is +1 / -1 from a geometric sign test, or 0 when it does not apply
+    to the arm or the configuration sits on the boundary between branches:
+        shoulder - wrist point in front of (+1) or behind (-1) the shoulder, along
+                   the x axis of the frame the shoulder joint rotates in
+        elbow    - side of the shoulder->wrist line the elbow lies on, about the elbow axis
+        wrist    - sign of the wrist bend (z4 x z6) . z5 for three revolute wrist joints
+    """
+    N, n = frames.shape[0], frames.shape[1] - 1
+    flags = np.zeros((N, 3), dtype=int)
+    if k is None:
+        return flags
+
+    def sgn(v):
+        return np.where(np.abs(v) < eps, 0, np.sign(v)).astype(int)
+
+    s = frames[:, k, :3, 3]
+    e = frames[:, k + 1, :3, 3]
+    w = frames[:, min(k + 3, n), :3, 3]
+    if k >= 1:
+        flags[:, 0] = sgn(np.einsum('ij,ij->i', w - s, frames[:, k, :3, 0]))
+    flags[:, 1] = sgn(_cross_dot(e - s, w - e, frames[:, k, :3, 2]))
+    if n >= k + 5 and np.all(revolute[k + 2:k + 5]):
+        z4, z5, z6 = frames[:, k + 2, :3, 2], frames[:, k + 3, :3, 2], frames[:, k + 4, :3, 2]
+        flags[:, 2] = sgn(_cross_dot(z4, z6, z5))
+    return flags
+
+
+def parse_branch(branch):
+    """
+    Target branch as a (3,) int array; 0 means 'any'.
+    Accepts a dict such as {'elbow': 1, 'wrist': -1} or a sequence of three flags
+    (shoulder, elbow, wrist) where 0 or None leaves that flag free.
+    """
+    if isinstance(branch, dict):
+        unknown = set(branch) - set(BRANCH_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown branch flag(s) {sorted(unknown)}, expected any of {BRANCH_NAMES}")
+        values = [branch.get(name, 0) for name in BRANCH_NAMES]
+    elif type(branch) in [list, tuple, np.ndarray] and len(branch) == 3:
+        values = list(branch)
+    else:
+        raise TypeError("branch must be a dict of shoulder/elbow/wrist flags or a sequence of three flags")
+    values = [0 if v is None else v for v in values]
+    if any(v not in (-1, 0, 1) for v in values):
+        raise ValueError("branch flags must be +1, -1 or 0 (any)")
+    return np.array(values, dtype=int)
+
+
+def branch_match(flags, target):
+    """True where the flags (N, 3) agree with target (3,) on every flag both define."""
+    flags = np.atleast_2d(flags)
+    return np.all((target == 0) | (flags == 0) | (flags == target), axis=1)
@@ -0,0 +1,90 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+from collections import OrderedDict
+import numpy as np
+
+class IKCache:
+    """
+    Bounded LRU cache of IK solutions.
+    Entries are keyed on the target pose quantized to a configurable tolerance,
+    the task mask weights, the quantized seed (which selects the solution branch)
+    and the requested branch flags.
+    """
+    def __init__(self, max_size=1024, pos_tol=1e-4, rot_tol=1e-3, seed_tol=1e-1):
+        if type(max_size) is not int or max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        for name, val in (('pos_tol', pos_tol), ('rot_tol', rot_tol), ('seed_tol', seed_tol)):
+            if type(val) not in [int, float] or val <= 0:
+                raise ValueError(f"{name} must be a positive integer or float")
+        self.max_size = max_size
+        self.pos_tol = float(pos_tol)
+        self.rot_tol = float(rot_tol)
+        self.seed_tol = float(seed_tol)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _quantize(values, tol):
+        return tuple(np.round(np.asarray(values, dtype=float) / tol).astype(np.int64).tolist())
+
+    def key(self, p_desired, q_desired, mask, seed, branch=None):
+        q = np.asarray(q_desired, dtype=float)
+        # q and -q are the same rotation, keep the w >= 0 hemisphere
+        lead = q[3] if abs(q[3]) > 1e-12 else q[np.argmax(np.abs(q[:3]))]
+        if lead < 0:
+            q = -q
+        return (self._quantize(p_desired, self.pos_tol),
+                self._quantize(q, self.rot_tol),
+                self._quantize(mask, 1e-6),
+                self._quantize(seed, self.seed_tol),
+                None if branch is None else tuple(int(f) for f in branch))
+
+    def get(self, key):
+        sol = self._entries.get(key)
+        if sol is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return sol.copy()
+
+    def put(self, key, solution):
+        self._entries[key] = np.array(solution, dtype=float)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+    def __len__(self):
+        return len(self._entries)
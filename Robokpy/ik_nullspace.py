@@ -0,0 +1,106 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+
+# -------------------------
+# Secondary objectives for the IK null space
+# -------------------------
+
+OBJECTIVES = ('joint_limits', 'manipulability', 'rest_pose')
+
+
+def _cross(a, b):
+    # broadcasting cross product over the last axis; avoids np.cross overhead on small arrays
+    a0, a1, a2 = a[..., 0], a[..., 1], a[..., 2]
+    b0, b1, b2 = b[..., 0], b[..., 1], b[..., 2]
+    return np.stack((a1 * b2 - a2 * b1, a2 * b0 - a0 * b2, a0 * b1 - a1 * b0), axis=-1)
+
+
+def jacobians_batch(frames, revolute):
+    """Geometric Jacobians (N, 6, n) from FK frames (N, n+1, 4, 4)."""
+    n = frames.shape[1] - 1
+    Z = frames[:, :n, :3, 2]
+    D = frames[:, n:, :3, 3] - frames[:, :n, :3, 3]
+    J = np.empty((frames.shape[0], 6, n))
+    J[:, :3] = np.where(revolute[:, None], _cross(Z, D), Z).transpose(0, 2, 1)
+    J[:, 3:] = (Z * revolute[:, None]).transpose(0, 2, 1)
+    return J
+
+
+def jacobian_derivatives(frames, revolute):
+    """
+    Partial derivatives of the geometric Jacobian, H[:, j] = dJ/dq_j, shape (N, n, 6, n).
+    For joint j and column i (z = joint axis, p = joint origin, e = end effector):
+        revolute j < i : dz_i = z_j x z_i,  d(e - p_i) = z_j x (e - p_i)
+        revolute j >= i: dz_i = 0,          d(e - p_i) = z_j x (e - p_j)
+        prismatic j    : dz_i = 0,          d(e - p_i) = z_j if j >= i else 0
+    """
+    N, n = frames.shape[0], frames.shape[1] - 1
+    Z = frames[:, :n, :3, 2]
+    P = frames[:, :n, :3, 3]
+    D = frames[:, n:, :3, 3] - P                      # e - p_i, (N, n, 3)
+
+    zj = Z[:, :, None, :]                             # joint j on axis 1, column i on axis 2
+    zi = Z[:, None, :, :]
+    before = np.arange(n)[:, None] < np.arange(n)[None, :]   # j < i
+    rev_j = revolute[:, None, None]
+
+    dz = np.where((before & revolute[:, None])[None, :, :, None], _cross(zj, zi), 0.0)
+    dd_rev = np.where(before[None, :, :, None],
+                      _cross(zj, D[:, None, :, :]),
+                      _cross(zj, D[:, :, None, :]))
+    dd = np.where(rev_j, dd_rev, np.where(before[None, :, :, None], 0.0, np.broadcast_to(zj, dd_rev.shape)))
+
+    # linear part: revolute columns d(z_i x d_i) = dz_i x d_i + z_i x dd_i, prismatic columns dz_i
+    lin = np.where(revolute[None, None, :, None],
+                   _cross(dz, D[:, None, :, :]) + _cross(zi, dd), dz)
+    ang = dz * revolute[None, None, :, None]
+
+    H = np.empty((N, n, 6, n))
+    H[:, :, :3, :] = lin.transpose(0, 1, 3, 2)
+    H[:, :, 3:, :] = ang.transpose(0, 1, 3, 2)
+    return H
+
+
+def manipulability(J, rows=None):
+    """Yoshikawa manipulability sqrt(det(J Jᵀ)) over the selected task rows, for J of shape (N, 6, n)."""
+    Jm = J if rows is None else J[:, rows]
+    return np.sqrt(np.clip(np.linalg.det(Jm @ Jm.transpose(0, 2, 1)), 0.0, None))
+
+
+def manipulability_gradient(J, H, rows=None, log=False):
+    """
+    Gradient of the manipulability w w.r.t. the joints, shape (N, n):
+    dw/dq_j = w * trace((J Jᵀ)⁻¹ J H_jᵀ). With log=True the gradient of log(w)
+    is returned instead, which does not shrink with w near singularities.
+    """
+    if rows is not None:
+        J, H = J[:, rows], H[:, :, rows]
+    A = J @ J.transpose(0, 2, 1)
+    AiJ = np.linalg.solve(A + 1e-12 * np.eye(A.shape[-1]), J)
+    g = np.einsum('njrc,nrc->nj', H, AiJ)
+    if log:
+        return g
+    return np.sqrt(np.clip(np.linalg.det(A), 0.0, None))[:, None] * g
+
+
+def joint_limit_gradient(q, q_min, q_max):
+    """
+    Gradient of -2 * sum(((q - mid) / range)²), pulling every joint towards the middle
+    of its range. Each term is -0.5 at a limit whatever the range; its gradient there is
+    ∓2 / range, so joints with short ranges are pulled harder.
+    """
+    span = np.maximum(np.asarray(q_max, dtype=float) - q_min, 1e-9)
+    return -4.0 * (q - 0.5 * (np.asarray(q_min) + q_max)) / (span * span)
+
+
+def rest_pose_gradient(q, q_rest):
+    return -(q - q_rest)
@@ -0,0 +1,119 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# -------------------------
+# Chunked parallel IK along a path
+# -------------------------
+# A long cartesian path is cut into chunks that worker processes solve with warm-start
+# chaining, each worker holding its own copy of the solver. Chunks after the first start
+# cold (on the requested branch), so they may land on a different but equally valid
+# solution. The stitch first shifts a chunk by whole turns of its revolute joints, which
+# leaves every pose unchanged, and otherwise re-solves it from the previous chunk's last
+# solution until the two chains agree again.
+
+_worker_ik = None
+
+
+def _init_worker(ik):
+    global _worker_ik
+    _worker_ik = ik
+    _worker_ik.verbose = False
+
+
+def solve_chain(ik, targets, mask=None, want=None, q_seed=None, hold_branch=True):
+    """
+    IK along targets, each solve starting from the previous solution and held on the
+    branch want (3,) flags, 0 = free; free flags are fixed by the first solutions.
+    With hold_branch False every target is solved on its own.
+    Returns joint values (N, n) and a boolean (N,) success array.
+    """
+    q = np.zeros((len(targets), ik.model.get_num_of_joints()))
+    success = np.zeros(len(targets), dtype=bool)
+    q_prev = q_seed
+    for k, target in enumerate(targets):
+        if not hold_branch:
+            q[k] = ik.solve(target, mask=mask)
+            success[k] = ik.success
+            continue
+        q[k] = ik.solve(target, mask=mask, branch=want, q_seed=q_prev)
+        success[k] = ik.success
+        if ik.success:
+            q_prev = ik.last_solution
+            if want is None or not want.all():
+                flags = ik.branch_of(q_prev)
+                want = flags if want is None else np.where(want == 0, flags, want)
+    return q, success
+
+
+def _solve_chunk(args):
+    return solve_chain(_worker_ik, *args)
+
+
+def stitch(ik, targets, q, success, start, stop, mask=None, want=None, jump_tol=0.2):
+    """
+    Make q[start:stop] continue q[start - 1] in place. A jump of whole turns on revolute joints
+    is removed by shifting the chunk (when that keeps it inside enabled joint limits);
+    otherwise the chunk is re-solved from q[start - 1] until the re-solved chain lands within
+    jump_tol (rads / m, largest joint) of the existing solution. Returns the re-solved count.
+    """
+    if not success[start - 1]:
+        return 0
+    q_prev = q[start - 1].copy()
+    revolute = np.array([jt == 'r' for jt in ik.model.get_joint_type()])
+    turns = np.where(revolute, np.round((q_prev - q[start]) / (2 * np.pi)), 0.0)
+    if turns.any():
+        shifted = q[start:stop] + 2 * np.pi * turns
+        limits = ik.model.get_joint_limits()
+        inside = not (ik.model.joint_lim_enable and len(limits) != 0) or \
+            bool(np.all((shifted >= limits[0]) & (shifted <= limits[1])))
+        if inside and np.max(np.abs(shifted[0] - q_prev)) <= jump_tol:
+            q[start:stop] = shifted
+    for i in range(start, stop):
+        if success[i] and np.max(np.abs(q[i] - q_prev)) <= jump_tol:
+            return i - start
+        q[i] = ik.solve(targets[i], mask=mask, branch=want, q_seed=q_prev)
+        success[i] = ik.success
+        if ik.success:
+            q_prev = ik.last_solution
+    return stop - start
+
+
+def solve_parallel(ik, targets, mask=None, want=None, q_seed=None, hold_branch=True,
+                   workers=None, chunk_size=500, jump_tol=0.2):
+    """
+    solve_chain() over chunk_size pieces of targets on `workers` processes (all cores if None).
+    Chunk boundaries are checked for continuity and stitched (see stitch()).
+    Returns joint values (N, n), a boolean (N,) success array and the number of re-solved samples.
+    """
+    targets = [np.asarray(t, dtype=float) for t in targets]
+    workers = os.cpu_count() if workers is None else workers
+    starts = list(range(0, len(targets), chunk_size))
+    jobs = [(targets[s:s + chunk_size], mask, want, q_seed if s == 0 else None, hold_branch)
+            for s in starts]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker,
+                             initargs=(ik,)) as pool:
+        results = list(pool.map(_solve_chunk, jobs))
+    q = np.concatenate([r[0] for r in results])
+    success = np.concatenate([r[1] for r in results])
+
+    resolved = 0
+    if hold_branch:
+        verbose, ik.verbose = ik.verbose, False
+        try:
+            for s in starts[1:]:
+                resolved += stitch(ik, targets, q, success, s, min(s + chunk_size, len(targets)),
+                                   mask, want, jump_tol)
+        finally:
+            ik.verbose = verbose
+    return q, success, resolved
@@ -0,0 +1,134 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+from .ik_branch import elbow_joint, branch_flags
+
+class SeedRegressor:
+    """
+    Learned pose-to-configuration map used to seed the IK solver (same query interface as SeedIndex).
+    Joint space is sampled, the TCP poses are computed with batched FK and one random Fourier
+    feature ridge regression is fitted per configuration branch, since a pose has several
+    joint solutions and a single regression would average them. Inputs are the position and
+    the flattened rotation matrix; revolute joints are predicted as (sin, cos).
+    A query predicts one configuration per branch and returns the one whose FK pose is
+    closest to the target.
+    """
+    def __init__(self, W, b, x_mean, x_std, coefs, branches, revolute, model_hash=None, robot_name=None):
+        self.W = np.asarray(W, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        self.x_mean = np.asarray(x_mean, dtype=float)
+        self.x_std = np.asarray(x_std, dtype=float)
+        self.coefs = np.asarray(coefs, dtype=float)
+        self.branches = np.asarray(branches, dtype=int)
+        self.revolute = np.asarray(revolute, dtype=bool)
+        if len(self.coefs) == 0:
+            raise ValueError("seed regressor has no trained branches")
+        self.model_hash = model_hash
+        self.robot_name = robot_name
+        self.fk = None
+
+    @staticmethod
+    def _inputs(p, Rm):
+        return np.hstack((p, Rm.reshape(len(p), 9)))
+
+    def _features(self, X):
+        D = self.W.shape[1]
+        return np.cos(((X - self.x_mean) / self.x_std) @ self.W + self.b) * np.sqrt(2.0 / D)
+
+    def _decode(self, Y):
+        n_rev = int(self.revolute.sum())
+        q = np.empty(Y.shape[:-1] + (len(self.revolute),))
+        q[..., self.revolute] = np.arctan2(Y[..., :n_rev], Y[..., n_rev:2 * n_rev])
+        q[..., ~self.revolute] = Y[..., 2 * n_rev:]
+        return q
+
+    @classmethod
+    def build(cls, model, fk, n_samples=40000, n_features=2000, gamma=0.3, ridge=1e-3,
+              min_samples=200, seed=None):
+        if type(n_samples) is not int or n_samples < 1:
+            raise ValueError("n_samples must be a positive integer")
+        if type(n_features) is not int or n_features < 1:
+            raise ValueError("n_features must be a positive integer")
+        lower, upper = model.get_sampling_bounds()
+        rng = np.random.default_rng(seed)
+        configs = rng.uniform(lower, upper, size=(n_samples, len(lower)))
+        frames = fk.frames_batch(configs, rads=True)
+        revolute = fk._dh_columns()[5]
+        flags = branch_flags(frames, elbow_joint(fk), revolute)
+        X = cls._inputs(frames[:, -1, :3, 3], frames[:, -1, :3, :3])
+        Y = np.hstack((np.sin(configs[:, revolute]), np.cos(configs[:, revolute]), configs[:, ~revolute]))
+
+        x_mean, x_std = X.mean(axis=0), X.std(axis=0) + 1e-9
+        W = rng.normal(0.0, gamma, size=(X.shape[1], n_features))
+        b = rng.uniform(0.0, 2 * np.pi, size=n_features)
+        reg = cls(W, b, x_mean, x_std, np.zeros((1, n_features, Y.shape[1])), np.zeros((1, 3)), revolute)
+
+        coefs, branches = [], []
+        for key in np.unique(flags, axis=0):
+            idx = np.all(flags == key, axis=1)
+            if idx.sum() < min_samples:
+                continue
+            Phi = reg._features(X[idx])
+            A = Phi.T @ Phi
+            A[np.diag_indices_from(A)] += ridge
+            coefs.append(np.linalg.solve(A, Phi.T @ Y[idx]))
+            branches.append(key)
+        return cls(W, b, x_mean, x_std, np.array(coefs), np.array(branches), revolute,
+                   model_hash=model.model_hash(), robot_name=model.get_robot_name()).attach(fk)
+
+    def predict(self, p, Rm):
+        """Candidate configurations (N, branches, n) for positions (N, 3) and rotations (N, 3, 3)."""
+        Phi = self._features(self._inputs(np.atleast_2d(p), np.reshape(Rm, (-1, 3, 3))))
+        return self._decode(np.einsum('nd,bdo->nbo', Phi, self.coefs))
+
+    def attach(self, fk):
+        """FK used to pick the best branch in query(); set by InverseKinematics.set_seeder."""
+        self.fk = fk
+        return self
+
+    def query(self, p_desired, q_desired=None, mask=None, rot_weight=0.1):
+        """
+        Predicted configuration (rads) for the target pose. Masked-out axes are ignored
+        when choosing between branches; without q_desired the rotation is ignored.
+        """
+        if self.fk is None:
+            raise ValueError("SeedRegressor needs forward kinematics, call attach(fk) first")
+        p = np.asarray(p_desired, dtype=float)
+        mask = np.ones(6) if mask is None else np.asarray(mask, dtype=float)
+        use_rot = q_desired is not None and np.any(mask[3:] != 0)
+        Rm = R.from_quat(q_desired).as_matrix() if q_desired is not None else np.eye(3)
+        cands = self.predict(p[None], Rm[None])[0]
+        if len(cands) == 1:
+            return cands[0]
+        poses = self.fk.pose_batch(cands, rads=True)
+        dist = np.linalg.norm((poses[:, :3] - p) * mask[:3], axis=1)
+        if use_rot:
+            dot = np.clip(np.abs(poses[:, 3:] @ np.asarray(q_desired, dtype=float)), 0.0, 1.0)
+            dist = dist + rot_weight * 2.0 * np.arccos(dot)
+        return cands[np.argmin(dist)].copy()
+
+    def save(self, path):
+        np.savez(path, W=self.W, b=self.b, x_mean=self.x_mean, x_std=self.x_std, coefs=self.coefs,
+                 branches=self.branches, revolute=self.revolute,
+                 model_hash=np.array(self.model_hash or ''), robot_name=np.array(self.robot_name or ''))
+
+    @classmethod
+    def load(cls, path, model=None):
+        with np.load(path) as data:
+            model_hash = str(data['model_hash'])
+            if model is not None and model_hash and model_hash != model.model_hash():
+                raise ValueError(f"Seed regressor at {path} was trained for a different DH model than {model.get_robot_name()}")
+            return cls(data['W'], data['b'], data['x_mean'], data['x_std'], data['coefs'], data['branches'],
+                       data['revolute'], model_hash=model_hash or None, robot_name=str(data['robot_name']) or None)
+
+    def __len__(self):
+        return len(self.coefs)
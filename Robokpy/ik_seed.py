@@ -0,0 +1,83 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+class SeedIndex:
+    """
+    Pose-to-configuration lookup table used to seed the IK solver.
+    Joint space is sampled once, the TCP poses are computed with batched FK and
+    the positions are stored in a KD-tree. A query returns the stored configuration
+    whose pose is closest to the target (position distance + rot_weight * rotation angle).
+    """
+    def __init__(self, positions, quats, configs, model_hash=None, robot_name=None):
+        self.positions = np.asarray(positions, dtype=float)
+        self.quats = np.asarray(quats, dtype=float)
+        self.configs = np.asarray(configs, dtype=float)
+        if not (len(self.positions) == len(self.quats) == len(self.configs)):
+            raise ValueError("positions, quats and configs must have the same number of samples")
+        if len(self.configs) == 0:
+            raise ValueError("seed index cannot be empty")
+        self.model_hash = model_hash
+        self.robot_name = robot_name
+        self.tree = cKDTree(self.positions)
+
+    @classmethod
+    def build(cls, model, fk, n_samples=20000, seed=None):
+        if type(n_samples) is not int or n_samples < 1:
+            raise ValueError("n_samples must be a positive integer")
+        lower, upper = model.get_sampling_bounds()
+        rng = np.random.default_rng(seed)
+        configs = rng.uniform(lower, upper, size=(n_samples, len(lower)))
+        poses = fk.pose_batch(configs, rads=True)
+        return cls(poses[:, :3], poses[:, 3:], configs,
+                   model_hash=model.model_hash(), robot_name=model.get_robot_name())
+
+    def query(self, p_desired, q_desired=None, mask=None, k=16, rot_weight=0.1):
+        """
+        Return the stored configuration (rads) nearest to the target pose.
+        Masked-out position axes are ignored; orientation is ignored when q_desired
+        is None or all rotational mask entries are zero.
+        """
+        p = np.asarray(p_desired, dtype=float)
+        mask = np.ones(6) if mask is None else np.asarray(mask, dtype=float)
+        mask_p = mask[:3] != 0
+        use_rot = q_desired is not None and np.any(mask[3:] != 0)
+
+        if np.all(mask_p):
+            k = min(k if use_rot else 1, len(self.configs))
+            dist, idx = self.tree.query(p, k=k)
+            dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+        else:
+            dist = np.linalg.norm((self.positions - p)[:, mask_p], axis=1)
+            idx = np.arange(len(self.configs))
+
+        if use_rot:
+            q = np.asarray(q_desired, dtype=float)
+            dot = np.clip(np.abs(self.quats[idx] @ q), 0.0, 1.0)
+            dist = dist + rot_weight * 2.0 * np.arccos(dot)
+        return self.configs[idx[np.argmin(dist)]].copy()
+
+    def save(self, path):
+        np.savez(path, positions=self.positions, quats=self.quats, configs=self.configs,
+                 model_hash=np.array(self.model_hash or ''), robot_name=np.array(self.robot_name or ''))
+
+    @classmethod
+    def load(cls, path, model=None):
+        with np.load(path) as data:
+            model_hash = str(data['model_hash'])
+            if model is not None and model_hash and model_hash != model.model_hash():
+                raise ValueError(f"Seed index at {path} was built for a different DH model than {model.get_robot_name()}")
+            return cls(data['positions'], data['quats'], data['configs'],
+                       model_hash=model_hash or None, robot_name=str(data['robot_name']) or None)
+
+    def __len__(self):
+        return len(self.configs)
@@ -0,0 +1,348 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import math as m
+import numpy as np
+from scipy.linalg.lapack import dposv
+
+class IKWorkspace:
+    """
+    Preallocated buffers for the IK inner loop.
+    Created once per robot; FK frames, the geometric Jacobian, the pose error and
+    the damped least squares system are all written in place so that an iteration
+    allocates no new arrays.
+    """
+    def __init__(self, model, fk):
+        a, twist, d, theta, offset, revolute = fk._dh_columns()
+        n = len(a)
+        self.n = n
+        self.a = a
+        self.ca = np.cos(twist)
+        self.sa = np.sin(twist)
+        self.d = d
+        self.theta = theta
+        self.offset = offset
+        self.revolute = revolute
+        self.prismatic = ~revolute
+        self.rev_f = revolute.astype(float)
+
+        # FK
+        self.th_eff = np.zeros(n)
+        self.dz = np.zeros(n)
+        self.ct = np.zeros(n)
+        self.st = np.zeros(n)
+        self.A = np.zeros((n, 4, 4))
+        self.A[:, 2, 1] = self.sa
+        self.A[:, 2, 2] = self.ca
+        self.A[:, 3, 3] = 1.0
+        self.frames = np.zeros((n + 1, 4, 4))
+        self.frames[0] = np.eye(4)
+
+        # Jacobian
+        self.J = np.zeros((6, n))
+        self.Jw = np.zeros((6, n))
+        self.D = np.zeros((n, 3))
+        self.tmp_n = np.zeros(n)
+
+        # error and DLS system
+        self.R_des = np.eye(3)
+        self.R_err = np.zeros((3, 3))
+        self.p_des = np.zeros(3)
+        self.err = np.zeros(6)
+        self.w = np.ones(6)
+        self.w_col = self.w.reshape(6, 1)
+        self.JJt = np.zeros((6, 6), order='F')
+        self.JJt_diag = self.JJt.reshape(-1, order='A')[::7]
+        self.y = np.zeros(6)
+        self.d_theta = np.zeros(n)
+        self.d_null = np.zeros(n)
+
+        # joint weights W (diagonal) and the n×n normal equations, used when n < 6
+        self.nxn = n < 6
+        self.weighted = False
+        self.w_q = np.ones(n)
+        self.w_inv = np.ones(n)
+        self.Jws = np.zeros((6, n))
+        self.JtJ = np.zeros((n, n), order='F')
+        self.JtJ_diag = self.JtJ.reshape(-1, order='A')[::n + 1]
+
+        # SE(3) log error and its Jacobian
+        self.dp = np.zeros(3)
+        self.rho = np.zeros(3)
+        self.Jb = np.zeros((6, n))
+        self.Jr_inv = np.zeros((6, 6))
+
+    def set_joint_weights(self, weights):
+        """
+        Diagonal joint weights W for the weighted least squares step; a joint with a
+        larger weight moves less. None restores the unweighted step.
+        """
+        if weights is None:
+            self.w_q[:] = 1.0
+        else:
+            self.w_q[:] = weights
+        np.divide(1.0, self.w_q, out=self.w_inv)
+        self.weighted = not np.all(self.w_q == 1.0)
+
+    def set_target(self, p_desired, q_desired, mask):
+        """Store the target pose (quaternion [x,y,z,w]) and row weights for the next solve."""
+        self.p_des[:] = p_desired
+        x, y, z, w = q_desired
+        self.R_des[:] = ((1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)),
+                         (2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)),
+                         (2*(x*z - y*w), 2*(y*z + x*w), 1 - 2*(x*x + y*y)))
+        self.w[:] = mask
+
+    def update(self, th):
+        """Forward kinematics for joint vector th (rads / m) into self.frames."""
+        A = self.A
+        np.copyto(self.th_eff, self.theta)
+        np.copyto(self.th_eff, th, where=self.revolute)
+        np.copyto(self.dz, self.d)
+        np.copyto(self.dz, th, where=self.prismatic)
+        self.dz += self.offset
+        np.cos(self.th_eff, out=self.ct)
+        np.sin(self.th_eff, out=self.st)
+
+        A[:, 0, 0] = self.ct
+        np.multiply(self.st, self.ca, out=A[:, 0, 1])
+        np.negative(A[:, 0, 1], out=A[:, 0, 1])
+        np.multiply(self.st, self.sa, out=A[:, 0, 2])
+        np.multiply(self.a, self.ct, out=A[:, 0, 3])
+        A[:, 1, 0] = self.st
+        np.multiply(self.ct, self.ca, out=A[:, 1, 1])
+        np.multiply(self.ct, self.sa, out=A[:, 1, 2])
+        np.negative(A[:, 1, 2], out=A[:, 1, 2])
+        np.multiply(self.a, self.st, out=A[:, 1, 3])
+        A[:, 2, 3] = self.dz
+
+        for i in range(self.n):
+            np.matmul(self.frames[i], A[i], out=self.frames[i + 1])
+
+    def error(self):
+        """Weighted pose error [p_des - p, log(R_des R^T)] into self.err; returns its norm."""
+        T = self.frames[self.n]
+        err = self.err
+        np.subtract(self.p_des, T[:3, 3], out=err[:3])
+        np.matmul(self.R_des, T[:3, :3].T, out=self.R_err)
+        self._rotation_log(self.R_err, err)
+        err *= self.w
+        return m.sqrt(err.dot(err))
+
+    @staticmethod
+    def _rotation_log(Rm, out):
+        """Rotation vector of Rm written to out[3:6] via an inline unit-quaternion log."""
+        tr = Rm[0, 0] + Rm[1, 1] + Rm[2, 2]
+        # Shepperd's method, pick the numerically largest component
+        if tr > Rm[0, 0] and tr > Rm[1, 1] and tr > Rm[2, 2]:
+            s = 2.0 * m.sqrt(1.0 + tr)
+            w = 0.25 * s
+            x = (Rm[2, 1] - Rm[1, 2]) / s
+            y = (Rm[0, 2] - Rm[2, 0]) / s
+            z = (Rm[1, 0] - Rm[0, 1]) / s
+        elif Rm[0, 0] > Rm[1, 1] and Rm[0, 0] > Rm[2, 2]:
+            s = 2.0 * m.sqrt(max(1.0 + Rm[0, 0] - Rm[1, 1] - Rm[2, 2], 0.0))
+            w = (Rm[2, 1] - Rm[1, 2]) / s
+            x = 0.25 * s
+            y = (Rm[0, 1] + Rm[1, 0]) / s
+            z = (Rm[0, 2] + Rm[2, 0]) / s
+        elif Rm[1, 1] > Rm[2, 2]:
+            s = 2.0 * m.sqrt(max(1.0 + Rm[1, 1] - Rm[0, 0] - Rm[2, 2], 0.0))
+            w = (Rm[0, 2] - Rm[2, 0]) / s
+            x = (Rm[0, 1] + Rm[1, 0]) / s
+            y = 0.25 * s
+            z = (Rm[1, 2] + Rm[2, 1]) / s
+        else:
+            s = 2.0 * m.sqrt(max(1.0 + Rm[2, 2] - Rm[0, 0] - Rm[1, 1], 0.0))
+            w = (Rm[1, 0] - Rm[0, 1]) / s
+            x = (Rm[0, 2] + Rm[2, 0]) / s
+            y = (Rm[1, 2] + Rm[2, 1]) / s
+            z = 0.25 * s
+        if w < 0.0:
+            w, x, y, z = -w, -x, -y, -z
+        vn = m.sqrt(x*x + y*y + z*z)
+        if vn < 1e-12:
+            # small angle: log(q) ~ 2 * v
+            out[3], out[4], out[5] = 2.0 * x, 2.0 * y, 2.0 * z
+            return
+        k = 2.0 * m.atan2(vn, w) / vn
+        out[3], out[4], out[5] = k * x, k * y, k * z
+
+    def se3_error(self):
+        """
+        Twist error xi = log(T_des^-1 T) = [rho, phi] into self.err; returns its norm.
+        Both components are expressed in the target frame.
+        """
+        T = self.frames[self.n]
+        err = self.err
+        np.matmul(self.R_des.T, T[:3, :3], out=self.R_err)
+        np.subtract(T[:3, 3], self.p_des, out=self.dp)
+        self._rotation_log(self.R_err, err)
+        phi = err[3:]
+        # rho = V(phi)^-1 t = J_l(phi)^-1 R_des^T (p - p_des)
+        Jl_inv = so3_left_jacobian_inv(phi)
+        np.matmul(self.R_des.T, self.dp, out=self.rho)
+        np.matmul(Jl_inv, self.rho, out=err[:3])
+        return m.sqrt(err.dot(err))
+
+    def se3_jacobian(self):
+        """
+        Exact Jacobian of the se3_error() twist w.r.t. the joints: J_r(xi)^-1 J_body,
+        written row-weighted into self.Jw. Call after se3_error() and jacobian().
+        """
+        Rt = self.frames[self.n, :3, :3].T
+        np.matmul(Rt, self.J[:3], out=self.Jb[:3])
+        np.matmul(Rt, self.J[3:], out=self.Jb[3:])
+        se3_right_jacobian_inv(self.err[:3], self.err[3:], out=self.Jr_inv)
+        np.matmul(self.Jr_inv, self.Jb, out=self.Jw)
+        self.Jw *= self.w_col
+        return self.Jw
+
+    def jacobian(self):
+        """Geometric Jacobian (6×n) at the last update() into self.J and the row-weighted copy into self.Jw."""
+        n = self.n
+        F = self.frames
+        Z = F[:n, :3, 2]
+        D = self.D
+        np.subtract(F[n, :3, 3], F[:n, :3, 3], out=D)
+        J, t = self.J, self.tmp_n
+        # linear part z_i x (o_n - o_i) for revolute joints
+        np.multiply(Z[:, 1], D[:, 2], out=J[0])
+        np.multiply(Z[:, 2], D[:, 1], out=t)
+        J[0] -= t
+        np.multiply(Z[:, 2], D[:, 0], out=J[1])
+        np.multiply(Z[:, 0], D[:, 2], out=t)
+        J[1] -= t
+        np.multiply(Z[:, 0], D[:, 1], out=J[2])
+        np.multiply(Z[:, 1], D[:, 0], out=t)
+        J[2] -= t
+        # prismatic joints translate along z_i and do not rotate
+        np.copyto(J[:3], Z.T, where=self.prismatic)
+        np.multiply(Z.T, self.rev_f, out=J[3:])
+        np.multiply(J, self.w_col, out=self.Jw)
+        return self.J
+
+    def _scaled_jacobian(self):
+        # Jw W⁻¹ for the 6×6 form, Jw itself when all weights are 1
+        if not self.weighted:
+            return self.Jw
+        np.multiply(self.Jw, self.w_inv, out=self.Jws)
+        return self.Jws
+
+    def dls_step(self, damp):
+        """
+        Weighted damped least squares step, solved in place with whichever system is smaller:
+            6×6: dθ = W⁻¹Jwᵀ (Jw W⁻¹ Jwᵀ + λI)⁻¹ e
+            n×n: dθ = (Jwᵀ Jw + λW)⁻¹ Jwᵀ e        (n < 6)
+        Both give the same step.
+        """
+        Jw = self.Jw
+        if self.nxn:
+            np.matmul(Jw.T, Jw, out=self.JtJ)
+            self.JtJ_diag += damp * self.w_q
+            np.matmul(Jw.T, self.err, out=self.d_theta)
+            dposv(self.JtJ, self.d_theta, overwrite_a=1, overwrite_b=1)
+            return self.d_theta
+        Js = self._scaled_jacobian()
+        np.matmul(Js, Jw.T, out=self.JJt)
+        self.JJt_diag += damp
+        self.y[:] = self.err
+        dposv(self.JJt, self.y, overwrite_a=1, overwrite_b=1)
+        np.matmul(Js.T, self.y, out=self.d_theta)
+        return self.d_theta
+
+    def null_step(self, z, damp):
+        """
+        Project z onto the damped, W-weighted null space of Jw:
+        z - W⁻¹Jwᵀ (Jw W⁻¹ Jwᵀ + λI)⁻¹ Jw z, or z - (Jwᵀ Jw + λW)⁻¹ Jwᵀ Jw z for n < 6.
+        """
+        Jw = self.Jw
+        if self.nxn:
+            np.matmul(Jw.T, Jw, out=self.JtJ)
+            np.matmul(self.JtJ, z, out=self.d_null)
+            self.JtJ_diag += damp * self.w_q
+            dposv(self.JtJ, self.d_null, overwrite_a=1, overwrite_b=1)
+            np.subtract(z, self.d_null, out=self.d_null)
+            return self.d_null
+        Js = self._scaled_jacobian()
+        np.matmul(Js, Jw.T, out=self.JJt)
+        self.JJt_diag += damp
+        np.matmul(Jw, z, out=self.y)
+        dposv(self.JJt, self.y, overwrite_a=1, overwrite_b=1)
+        np.matmul(Js.T, self.y, out=self.d_null)
+        np.subtract(z, self.d_null, out=self.d_null)
+        return self.d_null
+
+
+# -------------------------
+# SO(3) / SE(3) helpers
+# -------------------------
+
+def _hat(v):
+    return np.array([[0.0, -v[2], v[1]],
+                     [v[2], 0.0, -v[0]],
+                     [-v[1], v[0], 0.0]])
+
+
+def _jac_inv_coeff(theta):
+    # 1/θ² - (1 + cosθ) / (2θ sinθ), series below 1e-4
+    if theta < 1e-4:
+        return 1.0 / 12.0 + theta * theta / 720.0
+    return 1.0 / (theta * theta) - (1.0 + m.cos(theta)) / (2.0 * theta * m.sin(theta))
+
+
+def so3_left_jacobian_inv(phi):
+    """J_l(phi)^-1 = I - 1/2 phi^ + c phi^ phi^."""
+    P = _hat(phi)
+    c = _jac_inv_coeff(m.sqrt(phi.dot(phi)))
+    return np.eye(3) - 0.5 * P + c * (P @ P)
+
+
+def so3_right_jacobian_inv(phi):
+    """J_r(phi)^-1 = J_l(-phi)^-1 = I + 1/2 phi^ + c phi^ phi^."""
+    P = _hat(phi)
+    c = _jac_inv_coeff(m.sqrt(phi.dot(phi)))
+    return np.eye(3) + 0.5 * P + c * (P @ P)
+
+
+def _se3_q(rho, phi):
+    """Barfoot's Q_l(rho, phi), the off-diagonal block of the SE(3) left Jacobian."""
+    th = m.sqrt(phi.dot(phi))
+    Rh, Ph = _hat(rho), _hat(phi)
+    PR, RP = Ph @ Rh, Rh @ Ph
+    PRP = PR @ Ph
+    if th < 1e-4:
+        t2 = th * th
+        c1 = 1.0 / 6.0 - t2 / 120.0
+        c2 = 1.0 / 24.0 - t2 / 720.0
+        c3 = 1.0 / 120.0 - t2 / 2520.0
+    else:
+        s, c = m.sin(th), m.cos(th)
+        c1 = (th - s) / th**3
+        c2 = (th * th + 2.0 * c - 2.0) / (2.0 * th**4)
+        c3 = (2.0 * th - 3.0 * s + th * c) / (2.0 * th**5)
+    return (0.5 * Rh + c1 * (PR + RP + PRP)
+            + c2 * (Ph @ PR + RP @ Ph - 3.0 * PRP)
+            + c3 * (PRP @ Ph + Ph @ PRP))
+
+
+def se3_right_jacobian_inv(rho, phi, out=None):
+    """
+    Inverse right Jacobian of SE(3) for xi = [rho, phi]:
+    [[Jr^-1, -Jr^-1 Q_r Jr^-1], [0, Jr^-1]] with Q_r(rho, phi) = Q_l(-rho, -phi).
+    """
+    out = np.zeros((6, 6)) if out is None else out
+    Jr_inv = so3_right_jacobian_inv(phi)
+    Q = _se3_q(-rho, -phi)
+    out[:3, :3] = Jr_inv
+    out[3:, 3:] = Jr_inv
+    out[:3, 3:] = -Jr_inv @ Q @ Jr_inv
+    out[3:, :3] = 0.0
+    return out
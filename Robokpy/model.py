@@ -8,6 +8,8 @@
 # You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
 # """
 
+import hashlib
+import json
 import numpy as np
 from .utils import validate_keys
 
@@ -62,6 +64,13 @@ class RobotModel:
 
     def get_robot_name(self):
         return self.robot_name
+
+    def model_hash(self):
+        """Stable fingerprint of the DH table, used to tag data persisted per robot."""
+        rows = [[x['joint_type'], float(x['link_length']), float(x['twist']), float(x['joint_offset']),
+                 float(x['theta']), float(x.get('offset', 0.0))] for x in self.args]
+        payload = json.dumps([rows, bool(self.link_twist_in_rads)])
+        return hashlib.sha1(payload.encode()).hexdigest()
     
     def get_num_of_joints(self):
         return len(self.args)
@@ -92,6 +101,21 @@ class RobotModel:
     def get_joint_limits(self):
         return self.joint_limits
 
+    def get_sampling_bounds(self):
+        """
+        Joint ranges used when sampling joint space: the joint limits if set and enabled
+        (the solver only enforces them then), otherwise [-pi, pi] for revolute joints and
+        [0, reach] for prismatic joints.
+        """
+        if self.joint_lim_enable and len(self.joint_limits) != 0:
+            return np.array(self.joint_limits[0], dtype=float), np.array(self.joint_limits[1], dtype=float)
+        reach = sum(abs(float(x['link_length'])) + abs(float(x['joint_offset'])) + abs(float(x.get('offset', 0.0)))
+                    for x in self.args)
+        revolute = np.array([jt == 'r' for jt in self.get_joint_type()])
+        lower = np.where(revolute, -np.pi, 0.0)
+        upper = np.where(revolute, np.pi, max(reach, 1e-3))
+        return lower, upper
+
     def check_limits(self, q, stop_on_first=True):
         if len(self.joint_limits) == 0:
             raise ValueError("Expected joint limits min,max")
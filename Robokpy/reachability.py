@@ -0,0 +1,135 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+from scipy.ndimage import binary_dilation
+
+def bounding_radius(model):
+    """
+    Radius of a sphere about the base origin that contains every reachable TCP position.
+    Each DH link moves the origin by sqrt(a^2 + d^2); prismatic travel is taken from
+    the joint limits. Without enabled limits a prismatic joint can travel any distance,
+    so the radius is infinite and the sphere rejects nothing.
+    """
+    prismatic = any(x['joint_type'] == 'p' for x in model.args)
+    if prismatic and not (model.joint_lim_enable and len(model.joint_limits) != 0):
+        return np.inf
+    lower, upper = model.get_sampling_bounds()
+    radius = 0.0
+    for j, x in enumerate(model.args):
+        a = float(x['link_length'])
+        offset = float(x.get('offset', 0.0))
+        if x['joint_type'] == 'p':
+            d = max(abs(lower[j] + offset), abs(upper[j] + offset))
+        else:
+            d = abs(float(x['joint_offset']) + offset)
+        radius += np.hypot(a, d)
+    return radius
+
+
+class ReachabilityMap:
+    """
+    Cheap test for whether TCP positions can be reached at all, used to reject
+    targets before an IK solve is launched.
+    The bounding sphere is always checked and never rejects a reachable point.
+    A voxel bitmap (build_voxels / load) tightens the test to the sampled workspace;
+    it is dilated by `dilate` voxels so points near the sampled boundary are kept.
+    The bitmap is built from random samples, so a point on a thin edge of the workspace
+    can occasionally be missed; raise n_samples or dilate if that matters.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.voxels = None
+        self.origin = None
+        self.voxel_size = None
+        self.model_hash = model.model_hash()
+        self._radius = None
+        self._radius_limits = None
+
+    @property
+    def radius(self):
+        # set_joint_limits() rebinds model.joint_limits, so identity tells us when to recompute
+        limits = (self.model.joint_limits, self.model.joint_lim_enable)
+        if self._radius is None or limits[0] is not self._radius_limits[0] or limits[1] != self._radius_limits[1]:
+            self._radius = bounding_radius(self.model)
+            self._radius_limits = limits
+        return self._radius
+
+    def build_voxels(self, fk, n_samples=200000, voxel_size=None, dilate=1, seed=None, batch=20000):
+        if type(n_samples) is not int or n_samples < 1:
+            raise ValueError("n_samples must be a positive integer")
+        radius = self.radius
+        if not np.isfinite(radius):
+            raise ValueError(f"{self.model.get_robot_name()} has prismatic joints without enabled limits, "
+                             "its workspace is unbounded")
+        if voxel_size is None:
+            voxel_size = radius / 32
+        if type(voxel_size) not in [int, float, np.float64] or voxel_size <= 0:
+            raise ValueError("voxel_size must be a positive integer or float")
+
+        n_cells = int(np.ceil(2 * radius / voxel_size)) + 1
+        self.origin = np.full(3, -radius)
+        self.voxel_size = float(voxel_size)
+        grid = np.zeros((n_cells,) * 3, dtype=bool)
+
+        lower, upper = self.model.get_sampling_bounds()
+        rng = np.random.default_rng(seed)
+        for start in range(0, n_samples, batch):
+            n = min(batch, n_samples - start)
+            configs = rng.uniform(lower, upper, size=(n, len(lower)))
+            pos = fk.compute_batch(configs, rads=True)[:, :3, 3]
+            idx = np.clip(np.floor((pos - self.origin) / self.voxel_size).astype(int), 0, n_cells - 1)
+            grid[idx[:, 0], idx[:, 1], idx[:, 2]] = True
+
+        if dilate > 0:
+            grid = binary_dilation(grid, structure=np.ones((3, 3, 3), dtype=bool), iterations=dilate)
+        self.voxels = grid
+        return self
+
+    def reachable(self, points, mask=None):
+        """
+        Boolean (N,) array, False for positions that cannot be reached.
+        Masked-out position axes are ignored; the voxel bitmap is only used when
+        all three position axes are constrained.
+        """
+        p = np.atleast_2d(np.asarray(points, dtype=float))[:, :3]
+        mask_p = np.ones(3, dtype=bool) if mask is None else np.asarray(mask[:3]) != 0
+        pm = p[:, mask_p]
+        ok = np.einsum('ij,ij->i', pm, pm) <= self.radius ** 2 + 1e-12
+        if self.voxels is not None and mask_p.all():
+            idx = np.floor((p - self.origin) / self.voxel_size).astype(int)
+            inside = np.all((idx >= 0) & (idx < self.voxels.shape[0]), axis=1)
+            hit = np.zeros(len(p), dtype=bool)
+            hit[inside] = self.voxels[idx[inside, 0], idx[inside, 1], idx[inside, 2]]
+            ok &= hit
+        return ok
+
+    def unreachable_indices(self, points, mask=None):
+        return np.flatnonzero(~self.reachable(points, mask)).tolist()
+
+    def save(self, path):
+        if self.voxels is None:
+            raise ValueError("No voxel bitmap to save, call build_voxels() first")
+        np.savez(path, bits=np.packbits(self.voxels.ravel()), shape=np.array(self.voxels.shape),
+                 origin=self.origin, voxel_size=np.array(self.voxel_size),
+                 model_hash=np.array(self.model_hash))
+
+    @classmethod
+    def load(cls, path, model):
+        with np.load(path) as data:
+            if str(data['model_hash']) != model.model_hash():
+                raise ValueError(f"Reachability map at {path} was built for a different DH model than {model.get_robot_name()}")
+            shape = tuple(int(s) for s in data['shape'])
+            bits, origin, voxel_size = data['bits'], data['origin'], float(data['voxel_size'])
+        rmap = cls(model)
+        rmap.voxels = np.unpackbits(bits, count=int(np.prod(shape))).astype(bool).reshape(shape)
+        rmap.origin = np.asarray(origin, dtype=float)
+        rmap.voxel_size = voxel_size
+        return rmap
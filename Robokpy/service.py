@@ -0,0 +1,189 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+class Histogram:
+    """Fixed-bucket histogram; values above the last edge land in an overflow bucket."""
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[np.searchsorted(self.edges, value, side='left')] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bucket edge below which a fraction q of the values lie (max for the overflow bucket)."""
+        if self.count == 0:
+            return 0.0
+        idx = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side='left'))
+        return float(self.edges[idx]) if idx < len(self.edges) else self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'edges': self.edges.tolist(),
+            'counts': self.counts.tolist(),
+        }
+
+
+class _Batcher:
+    """Collects requests of one kind and runs them as a single batch after `window` seconds."""
+    def __init__(self, run_batch, window, max_batch, executor):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor
+        self.pending = []
+        self.timer = None
+        self.latency = Histogram(np.geomspace(1e-5, 10.0, 25))
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.pending.append((item, fut, time.perf_counter()))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending:
+            batch, self.pending = self.pending, []
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        self.batch_size.record(len(batch))
+        try:
+            results = await loop.run_in_executor(self.executor, self.run_batch, [b[0] for b in batch])
+        except Exception as e:
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        done = time.perf_counter()
+        for (_, fut, t0), res in zip(batch, results):
+            self.latency.record(done - t0)
+            if fut.done():
+                continue
+            if isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
+
+
+class AsyncRobot:
+    """
+    asyncio facade over an Init_Model robot for concurrent callers:
+        q = await robot.ik(target)      # joint values in rads / m
+        pose = await robot.fk(q)        # [x, y, z, qx, qy, qz, qw]
+    Requests arriving within `window` seconds (or until max_batch are queued) are
+    coalesced into one batch and run on the executor, so the event loop is not blocked.
+    The default executor has a single worker because the kinematics objects keep state.
+    """
+    def __init__(self, robot, window=2e-3, max_batch=64, executor=None):
+        if type(window) not in [int, float] or window < 0:
+            raise ValueError("window must be a non-negative integer or float")
+        if type(max_batch) is not int or max_batch < 1:
+            raise ValueError("max_batch must be a positive integer")
+        self.robot = robot
+        self._own_executor = executor is None
+        self.executor = ThreadPoolExecutor(max_workers=1) if executor is None else executor
+        self._fk = _Batcher(self._fk_batch, window, max_batch, self.executor)
+        self._ik = _Batcher(self._ik_batch, window, max_batch, self.executor)
+
+    async def fk(self, joint_vars, rads=True):
+        q = np.asarray(joint_vars, dtype=float)
+        n = self.robot.model.get_num_of_joints()
+        if q.shape != (n,):
+            raise ValueError(f"Expected {n} joint values but got shape {q.shape}")
+        if not rads:
+            revolute = np.array([jt == 'r' for jt in self.robot.model.get_joint_type()])
+            q = np.where(revolute, np.deg2rad(q), q)
+        return await self._fk.submit(q)
+
+    async def ik(self, target, mask=None, **solve_kwargs):
+        """Joint values (rads / m) reaching target; raises ValueError when the solve fails."""
+        return await self._ik.submit((np.asarray(target, dtype=float), mask, solve_kwargs))
+
+    def _fk_batch(self, items):
+        return list(self.robot.fk.pose_batch(np.array(items), rads=True))
+
+    # solve options solve_vectorized() understands; other options go through solve()
+    _VECTORIZED_OPTIONS = {'tol', 'max_iter', 'rpy_deg'}
+
+    def _ik_batch(self, items):
+        # requests with the same solve options and mask share one call: solve_vectorized
+        # when it supports the options, else the solve_batch loop. Targets the vectorized
+        # solve leaves unconverged are retried by solve() with its seeding and precheck.
+        results = [None] * len(items)
+        groups = {}
+        for k, (target, mask, kwargs) in enumerate(items):
+            key = None if mask is None else tuple(np.asarray(mask, dtype=float).ravel())
+            groups.setdefault((repr(sorted(kwargs.items())), key), []).append(k)
+        for idx in groups.values():
+            mask, kwargs = items[idx[0]][1], items[idx[0]][2]
+            targets = [items[k][0] for k in idx]
+            try:
+                if set(kwargs) <= self._VECTORIZED_OPTIONS:
+                    q, success = self.robot.ik.solve_vectorized(targets, mask=mask, **kwargs)
+                    reasons = list(self.robot.ik.batch_exit_reasons)
+                    retry = np.flatnonzero(~success)
+                    if len(retry):
+                        q_r, s_r = self.robot.ik.solve_batch([targets[j] for j in retry], masks=mask, **kwargs)
+                        q[retry], success[retry] = q_r, s_r
+                        for j, reason in zip(retry, self.robot.ik.batch_exit_reasons):
+                            reasons[j] = reason
+                else:
+                    q, success = self.robot.ik.solve_batch(targets, masks=mask, **kwargs)
+                    reasons = self.robot.ik.batch_exit_reasons
+            except Exception as e:
+                for k in idx:
+                    results[k] = e
+                continue
+            for j, k in enumerate(idx):
+                results[k] = q[j] if success[j] else \
+                    ValueError(f"IK failed for target {items[k][0].tolist()}: {reasons[j]}")
+        return results
+
+    def metrics(self):
+        """Per-request latency (s) and batch size histograms for the fk and ik queues."""
+        return {name: {'latency': b.latency.as_dict(), 'batch_size': b.batch_size.as_dict()}
+                for name, b in (('fk', self._fk), ('ik', self._ik))}
+
+    def close(self):
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
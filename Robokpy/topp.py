@@ -0,0 +1,137 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+
+# -------------------------
+# Time-optimal path parameterization
+# -------------------------
+# A geometric path q(s), s in [0, 1], is timed by choosing x(s) = ṡ² on a grid.
+# With q' = dq/ds and q'' = d²q/ds² the joint rates are
+#     q̇ = q' ṡ,    q̈ = q' u + q'' x,    u = s̈ = dx / (2 ds)
+# so joint velocity limits bound x, and joint acceleration limits bound u by
+# lines in x. The fastest timing follows the largest x allowed by a forward pass
+# (maximum acceleration) and a backward pass (maximum deceleration).
+
+
+def _accel_bounds(dq, ddq, amax, eps):
+    """
+    Per grid point and joint, u_min = A_lo + B x and u_max = A_hi + B x from
+    |q' u + q'' x| <= amax. Joints with q' ~ 0 do not bound u (A = ∓inf).
+    """
+    moving = np.abs(dq) > eps
+    inv = np.divide(1.0, dq, out=np.zeros_like(dq), where=moving)
+    B = np.where(moving, -ddq * inv, 0.0)
+    A_hi = np.where(moving, np.abs(amax * inv), np.inf)
+    return -A_hi, A_hi, B
+
+
+def max_velocity_curve(dq, ddq, vmax, amax, eps=1e-9, x_cap=1e12, n_bisect=60):
+    """
+    Largest x = ṡ² (N,) at each grid point for which the joint velocity limits hold and
+    some path acceleration u satisfies every joint acceleration limit.
+    """
+    x_vel = np.min(np.where(np.abs(dq) > eps, (vmax / np.maximum(np.abs(dq), eps)) ** 2, np.inf), axis=1)
+    # joints standing still on the path still accelerate with q'' x
+    x_still = np.min(np.where((np.abs(dq) <= eps) & (np.abs(ddq) > eps),
+                              amax / np.maximum(np.abs(ddq), eps), np.inf), axis=1)
+    x_hi = np.minimum(np.minimum(x_vel, x_still), x_cap)
+
+    A_lo, A_hi, B = _accel_bounds(dq, ddq, amax, eps)
+    ok = _feasible(A_lo, A_hi, B, x_hi)
+    if not ok.all():
+        # the feasible x form an interval starting at 0, bisect its upper end
+        A_lo, A_hi, B = A_lo[~ok], A_hi[~ok], B[~ok]
+        lo, hi = np.zeros(len(B)), x_hi[~ok]
+        for _ in range(n_bisect):
+            mid = 0.5 * (lo + hi)
+            good = _feasible(A_lo, A_hi, B, mid)
+            lo = np.where(good, mid, lo)
+            hi = np.where(good, hi, mid)
+        x_hi[~ok] = lo
+    return x_hi
+
+
+def _feasible(A_lo, A_hi, B, x):
+    xb = x[:, None]
+    return np.max(A_lo + B * xb, axis=1) <= np.min(A_hi + B * xb, axis=1) + 1e-12
+
+
+def time_optimal(dq, ddq, vmax, amax, s=None, eps=1e-9):
+    """
+    Minimum-time timing of a path sampled at N grid points, starting and ending at rest.
+    dq, ddq: (N, dof) first and second derivatives of the joint path w.r.t. s
+    vmax, amax: (dof,) joint velocity and acceleration limits
+    s: (N,) increasing path parameter, uniform on [0, 1] if None
+    Returns the time stamps (N,) and x = ṡ² (N,) at the grid points.
+    """
+    dq = np.asarray(dq, dtype=float)
+    ddq = np.asarray(ddq, dtype=float)
+    N = len(dq)
+    vmax = np.broadcast_to(np.asarray(vmax, dtype=float), (dq.shape[1],))
+    amax = np.broadcast_to(np.asarray(amax, dtype=float), (dq.shape[1],))
+    if np.any(vmax <= 0) or np.any(amax <= 0):
+        raise ValueError("velocity and acceleration limits must be positive")
+    s = np.linspace(0.0, 1.0, N) if s is None else np.asarray(s, dtype=float)
+    ds = np.diff(s)
+
+    x_max = max_velocity_curve(dq, ddq, vmax, amax, eps)
+    A_lo, A_hi, B = _accel_bounds(dq, ddq, amax, eps)
+
+    # forward pass: accelerate as hard as the limits allow
+    x = np.empty(N)
+    x[0] = 0.0
+    for k in range(N - 1):
+        u = min((A_hi[k] + B[k] * x[k]).min(), 1e300)
+        x[k + 1] = min(x_max[k + 1], max(x[k] + 2.0 * ds[k] * u, 0.0))
+    # backward pass: brake as hard as the limits allow into every later point
+    x[-1] = 0.0
+    for k in range(N - 1, 0, -1):
+        u = max((A_lo[k] + B[k] * x[k]).max(), -1e300)
+        x[k - 1] = min(x[k - 1], max(x[k] - 2.0 * ds[k - 1] * u, 0.0))
+
+    # constant path acceleration between grid points: dt = 2 ds / (ṡ_k + ṡ_k+1)
+    sd = np.sqrt(x)
+    dt = 2.0 * ds / np.maximum(sd[:-1] + sd[1:], 1e-300)
+    return np.concatenate(([0.0], np.cumsum(dt))), x
+
+
+def retime(q, vmax, amax, corner_angle=0.2):
+    """
+    Minimum-time timing of joint samples q (N, dof) along their path, at rest at both ends.
+    The path is parameterized by joint-space arc length; repeated samples are dropped.
+    Where the direction turns by more than corner_angle (rads) between two steps the
+    path has a corner, which can only be passed at rest, so the path is split there and
+    each piece is timed on its own.
+    Returns the kept samples (M, dof), their times (M,) and joint velocities (M, dof).
+    """
+    q = np.asarray(q, dtype=float)
+    step = np.linalg.norm(np.diff(q, axis=0), axis=1)
+    moving = step > 1e-12
+    q = q[np.concatenate(([True], moving))]
+    step = step[moving]
+    if len(q) < 2:
+        raise ValueError("path has no length to time")
+    s = np.concatenate(([0.0], np.cumsum(step)))
+
+    u = np.diff(q, axis=0) / step[:, None]
+    turn = np.arccos(np.clip(np.einsum('ij,ij->i', u[:-1], u[1:]), -1.0, 1.0))
+    cuts = np.concatenate(([0], np.flatnonzero(turn > corner_angle) + 1, [len(q) - 1]))
+
+    t = np.zeros(len(q))
+    qd = np.zeros_like(q)
+    for i0, i1 in zip(cuts[:-1], cuts[1:]):
+        piece = slice(i0, i1 + 1)
+        dq = np.gradient(q[piece], s[piece], axis=0)
+        ddq = np.gradient(dq, s[piece], axis=0)
+        t_piece, x = time_optimal(dq, ddq, vmax, amax, s=s[piece])
+        t[piece] = t[i0] + t_piece
+        qd[piece] = dq * np.sqrt(x)[:, None]
+    return q, t, qd
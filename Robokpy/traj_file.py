@@ -0,0 +1,118 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import json
+import struct
+import numpy as np
+from .traj_poly import Trajectory
+
+# -------------------------
+# Binary trajectory file
+# -------------------------
+# Layout (little-endian):
+#     8 bytes   magic b'RKTRAJ\0\0'
+#     uint32    format version
+#     uint32    header length in bytes
+#     header    UTF-8 JSON: metadata and {name: {dtype, shape, offset}} for every array
+#     arrays    C-ordered, each starting on a 64-byte boundary; offsets count from the
+#               first boundary after the header
+# Sample arrays are stored one row per sample (N, dof), so a chunk of samples is one
+# contiguous read. npz archives cannot be memory-mapped, hence the raw layout.
+
+MAGIC = b'RKTRAJ\0\0'
+FORMAT_VERSION = 1
+_ALIGN = 64
+
+
+def _aligned(n):
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def write_trajectory_file(path, arrays, meta):
+    """Write the named arrays and JSON-serializable metadata to path."""
+    arrays = {name: np.ascontiguousarray(a, dtype='<f8') for name, a in arrays.items() if a is not None}
+    table, offset = {}, 0
+    for name, a in arrays.items():
+        table[name] = {'dtype': a.dtype.str, 'shape': list(a.shape), 'offset': offset}
+        offset = _aligned(offset + a.nbytes)
+    header = json.dumps(dict(meta, version=FORMAT_VERSION, arrays=table)).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<II', FORMAT_VERSION, len(header)) + header)
+        for name, a in arrays.items():
+            f.seek(data_start + table[name]['offset'])
+            a.tofile(f)
+
+
+class TrajectoryFile:
+    """
+    Trajectory file opened for replay. Arrays are memory-mapped read-only (mmap=True), so
+    opening costs the header only and samples are paged in as they are read:
+        t (N,), q, qd, qdd, jerk (N, dof), velocities (waypoint velocities),
+        coeffs (dof, segments, order+1), breakpoints (segments+1,)
+    Missing arrays are None. Metadata is in self.header (robot_name, model_hash, ...).
+    """
+    def __init__(self, path, mmap=True):
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a trajectory file")
+            version, header_len = struct.unpack('<II', f.read(8))
+            if version > FORMAT_VERSION:
+                raise ValueError(f"{path} has trajectory format version {version}, "
+                                 f"this version reads up to {FORMAT_VERSION}")
+            self.header = json.loads(f.read(header_len).decode())
+        data_start = _aligned(len(MAGIC) + 8 + header_len)
+        self.path = path
+        self.version = version
+        self.arrays = {}
+        for name, spec in self.header['arrays'].items():
+            shape = tuple(spec['shape'])
+            if mmap and int(np.prod(shape)) > 0:
+                a = np.memmap(path, dtype=spec['dtype'], mode='r', offset=data_start + spec['offset'], shape=shape)
+            else:
+                a = np.fromfile(path, dtype=spec['dtype'], count=int(np.prod(shape)),
+                                offset=data_start + spec['offset']).reshape(shape)
+            self.arrays[name] = a
+
+    def __getattr__(self, name):
+        if name in ('t', 'q', 'qd', 'qdd', 'jerk', 'velocities', 'coeffs', 'breakpoints'):
+            return self.__dict__.get('arrays', {}).get(name)
+        raise AttributeError(name)
+
+    @property
+    def model_hash(self):
+        return self.header.get('model_hash')
+
+    @property
+    def robot_name(self):
+        return self.header.get('robot_name')
+
+    def __len__(self):
+        return len(self.t)
+
+    def iter_chunks(self, chunk_size=256):
+        """
+        Generator of (t, q, qd, qdd) chunks as iter_samples() yields them, q of shape
+        (dof, <= chunk_size), read straight from the file.
+        """
+        if type(chunk_size) is not int or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        for start in range(0, len(self), chunk_size):
+            rows = slice(start, start + chunk_size)
+            yield (self.t[rows], self.q[rows].T,
+                   None if self.qd is None else self.qd[rows].T,
+                   None if self.qdd is None else self.qdd[rows].T)
+
+    def as_trajectory(self):
+        """Trajectory over the stored segments, its samples left memory-mapped."""
+        if self.coeffs is None:
+            raise ValueError(f"{self.path} has no segment coefficients")
+        return Trajectory([self.q], self.coeffs, self.breakpoints, times=self.t)
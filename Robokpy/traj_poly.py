@@ -0,0 +1,282 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+from scipy.special import comb
+import numpy as np
+
+# -------------------------
+# Piecewise polynomial coefficients
+# -------------------------
+# Coefficients have shape (dims, segments, order+1), lowest power first, and are
+# expressed in local segment time tau = t - time_points[i], tau in [0, T_i].
+
+
+def _segments(waypoints, time_points, velocities):
+    q = np.atleast_2d(np.asarray(waypoints, dtype=float))
+    t = np.asarray(time_points, dtype=float)
+    if q.shape[1] != len(t):
+        raise ValueError(f"Expected {q.shape[1]} time points but got {len(t)}")
+    v = np.zeros_like(q) if velocities is None else np.broadcast_to(np.asarray(velocities, dtype=float), q.shape)
+    T = np.diff(t)
+    # zero-length segments hold their start value instead of dividing by zero
+    hold = T <= 0
+    T = np.where(hold, 1.0, T)
+    return q, v, T, hold
+
+
+def cubic_coeffs(waypoints, time_points, velocities=None):
+    """
+    Cubic coefficients (dims, segments, 4) through waypoints (dims, n) at time_points (n,)
+    with the given waypoint velocities (zeros if None). Closed form per segment,
+    with T the duration and dq = q1 - q0:
+        a0 = q0, a1 = v0, a2 = (3 dq - (2 v0 + v1) T) / T², a3 = (-2 dq + (v0 + v1) T) / T³
+    """
+    q, v, T, hold = _segments(waypoints, time_points, velocities)
+    q0, q1, v0, v1 = q[:, :-1], q[:, 1:], v[:, :-1], v[:, 1:]
+    dq = q1 - q0
+    c = np.empty(q0.shape + (4,))
+    c[..., 0] = q0
+    c[..., 1] = v0
+    c[..., 2] = (3 * dq - (2 * v0 + v1) * T) / T**2
+    c[..., 3] = (-2 * dq + (v0 + v1) * T) / T**3
+    c[:, hold, 1:] = 0.0
+    return c
+
+
+def quintic_coeffs(waypoints, time_points, velocities=None, accelerations=None):
+    """
+    Quintic coefficients (dims, segments, 6) through waypoints (dims, n) at time_points (n,)
+    with the given waypoint velocities and accelerations (zeros if None). Closed form per segment:
+        a0 = q0, a1 = v0, a2 = acc0 / 2
+        a3 = (20 dq - (8 v1 + 12 v0) T - (3 acc0 - acc1) T²) / (2 T³)
+        a4 = (-30 dq + (14 v1 + 16 v0) T + (3 acc0 - 2 acc1) T²) / (2 T⁴)
+        a5 = (12 dq - 6 (v1 + v0) T - (acc1 - acc0) T²) / (2 T⁵)
+    """
+    q, v, T, hold = _segments(waypoints, time_points, velocities)
+    acc = np.zeros_like(q) if accelerations is None else np.broadcast_to(np.asarray(accelerations, dtype=float), q.shape)
+    q0, q1, v0, v1 = q[:, :-1], q[:, 1:], v[:, :-1], v[:, 1:]
+    ac0, ac1 = acc[:, :-1], acc[:, 1:]
+    dq = q1 - q0
+    T2 = T * T
+    c = np.empty(q0.shape + (6,))
+    c[..., 0] = q0
+    c[..., 1] = v0
+    c[..., 2] = 0.5 * ac0
+    c[..., 3] = (20 * dq - (8 * v1 + 12 * v0) * T - (3 * ac0 - ac1) * T2) / (2 * T2 * T)
+    c[..., 4] = (-30 * dq + (14 * v1 + 16 * v0) * T + (3 * ac0 - 2 * ac1) * T2) / (2 * T2 * T2)
+    c[..., 5] = (12 * dq - 6 * (v1 + v0) * T - (ac1 - ac0) * T2) / (2 * T2 * T2 * T)
+    c[:, hold, 1:] = 0.0
+    return c
+
+
+def segment_index(time_points, t):
+    """Segment of every sample time; a time on a knot belongs to the segment it ends."""
+    t_knots = np.asarray(time_points, dtype=float)
+    idx = np.searchsorted(t_knots, t, side='left') - 1
+    return np.clip(idx, 0, len(t_knots) - 2)
+
+
+def evaluate(coeffs, time_points, t, out=None):
+    """
+    Position, velocity, acceleration and jerk of the piecewise polynomial at times t,
+    returned as one array (4, dims, len(t)) (written into out if given).
+    Each sample is mapped to its segment with searchsorted and all four derivatives are
+    accumulated in a single Horner pass over the coefficients, for every dimension at once.
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    t = np.asarray(t, dtype=float)
+    dims, order = coeffs.shape[0], coeffs.shape[2] - 1
+    seg = segment_index(time_points, t)
+    tau = t - np.asarray(time_points, dtype=float)[seg]
+    c = coeffs[:, seg, :]                                 # (dims, N, order+1)
+
+    if out is None:
+        out = np.empty((4, dims, len(t)))
+    out[...] = 0.0
+    q, qd, qdd, qddd = out
+    for k in range(order, -1, -1):
+        # p^(j) / j! accumulates as d_j = d_j * tau + d_{j-1}
+        qddd *= tau
+        qddd += qdd
+        qdd *= tau
+        qdd += qd
+        qd *= tau
+        qd += q
+        q *= tau
+        q += c[..., k]
+    qdd *= 2.0
+    qddd *= 6.0
+    return out
+
+
+def iter_samples(coeffs, time_points, period, chunk_size=256):
+    """
+    Generator of (t, q, qd, qdd) chunks sampled every `period` seconds from t = time_points[0],
+    at most chunk_size samples per chunk. The final sample is clamped to the last knot,
+    so the trajectory always ends on its final waypoint.
+    """
+    t0, t_end = float(time_points[0]), float(time_points[-1])
+    n_total = int(np.ceil((t_end - t0) / period - 1e-9)) + 1
+    for start in range(0, n_total, chunk_size):
+        k = np.arange(start, min(start + chunk_size, n_total))
+        t = np.minimum(t0 + k * period, t_end)
+        q, qd, qdd, _ = evaluate(coeffs, time_points, t)
+        yield t, q, qd, qdd
+
+
+def adaptive_times(coeffs, time_points, tol, error=None, max_depth=16, checks=(0.25, 0.5, 0.75)):
+    """
+    Sample times (N,) on which straight lines between consecutive samples stay within tol
+    of the piecewise polynomial. Starting from the knots, every interval is checked at the
+    `checks` fractions and the ones off by more than tol are halved, all intervals of a
+    round at once, for at most max_depth rounds.
+    error(q_true, q_line) maps two (M, dims) arrays to (M,) errors; the default is the
+    largest absolute difference over the dims.
+    """
+    t_knots = np.asarray(time_points, dtype=float)
+    if error is None:
+        def error(q_true, q_line):
+            return np.max(np.abs(q_true - q_line), axis=1)
+    checks = np.asarray(checks, dtype=float)
+    lo, hi = t_knots[:-1], t_knots[1:]
+    keep = hi > lo
+    lo, hi = lo[keep], hi[keep]
+    accepted = [t_knots[[0, -1]]]
+    for _ in range(max_depth):
+        if len(lo) == 0:
+            break
+        q = evaluate(coeffs, t_knots, np.concatenate((lo, hi, (lo[:, None] + (hi - lo)[:, None] * checks).ravel())))[0]
+        m = len(lo)
+        q_lo, q_hi, q_chk = q[:, :m], q[:, m:2 * m], q[:, 2 * m:].reshape(len(q), m, len(checks))
+        q_line = q_lo[..., None] + (q_hi - q_lo)[..., None] * checks
+        err = error(q_chk.reshape(len(q), -1).T, q_line.reshape(len(q), -1).T).reshape(m, len(checks))
+        bad = err.max(axis=1) > tol
+        accepted.append(lo[~bad])
+        mid = 0.5 * (lo[bad] + hi[bad])
+        lo, hi = np.concatenate((lo[bad], mid)), np.concatenate((mid, hi[bad]))
+    accepted.append(lo)
+    return np.unique(np.concatenate(accepted))
+
+
+def hermite_coeffs(samples, times):
+    """
+    Cubic Hermite coefficients (dims, n-1, 4) through sampled values (dims, n) at times (n,),
+    with finite-difference velocities (central inside, one-sided at the ends).
+    """
+    q = np.atleast_2d(np.asarray(samples, dtype=float))
+    t = np.asarray(times, dtype=float)
+    dt = np.diff(t)
+    slope = np.divide(np.diff(q, axis=1), dt, out=np.zeros((q.shape[0], len(dt))), where=dt > 0)
+    v = np.empty_like(q)
+    v[:, 0] = slope[:, 0]
+    v[:, -1] = slope[:, -1]
+    v[:, 1:-1] = 0.5 * (slope[:, :-1] + slope[:, 1:])
+    return cubic_coeffs(q, t, v)
+
+
+def derivative_coeffs(coeffs, order):
+    """Coefficients of the order-th derivative, same layout with order fewer columns."""
+    c = np.asarray(coeffs, dtype=float)
+    for _ in range(order):
+        if c.shape[-1] == 1:
+            return np.zeros_like(c)
+        c = c[..., 1:] * np.arange(1, c.shape[-1])
+    return c
+
+
+def shift_coeffs(coeffs, delta):
+    """Coefficients of p(tau + delta) for the polynomials p in coeffs (..., order+1)."""
+    c = np.asarray(coeffs, dtype=float)
+    out = np.zeros_like(c)
+    for k in range(c.shape[-1]):
+        # c_k (tau + delta)^k = sum_j C(k, j) delta^(k-j) c_k tau^j
+        for j in range(k + 1):
+            out[..., j] += comb(k, j, exact=True) * delta ** (k - j) * c[..., k]
+    return out
+
+
+class Trajectory(list):
+    """
+    Planned joint trajectory. Behaves as the list [joint_samples (N, dof)] returned by earlier
+    versions, and also keeps the piecewise polynomial it was sampled from:
+        coeffs      (dof, segments, order+1), local segment time, lowest power first
+        breakpoints (segments+1,) segment start / end times in seconds
+    so it can be evaluated at any time and derivative order without re-planning:
+        traj.at(0.25)             # (dof,) joint values
+        traj.at(t_array, order=1) # (len(t), dof) joint velocities
+    Times outside [breakpoints[0], breakpoints[-1]] are clamped to the ends.
+    """
+    def __init__(self, samples, coeffs, breakpoints, times=None):
+        super().__init__(samples)
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        if self.coeffs.shape[1] != len(self.breakpoints) - 1:
+            raise ValueError(f"Expected {self.coeffs.shape[1] + 1} breakpoints but got {len(self.breakpoints)}")
+        self.times = None if times is None else np.asarray(times, dtype=float)
+
+    @property
+    def duration(self):
+        return float(self.breakpoints[-1] - self.breakpoints[0])
+
+    @property
+    def dof(self):
+        return self.coeffs.shape[0]
+
+    def at(self, t, order=0):
+        """Joint values (order=0) or their order-th time derivative at t (seconds)."""
+        if type(order) is not int or order < 0:
+            raise ValueError("order must be a non-negative integer")
+        scalar = np.ndim(t) == 0
+        t = np.clip(np.atleast_1d(np.asarray(t, dtype=float)), self.breakpoints[0], self.breakpoints[-1])
+        c = derivative_coeffs(self.coeffs, order)
+        seg = segment_index(self.breakpoints, t)
+        tau = t - self.breakpoints[seg]
+        cs = c[:, seg, :]
+        q = cs[..., -1].copy()
+        for k in range(c.shape[-1] - 2, -1, -1):
+            q *= tau
+            q += cs[..., k]
+        return q[:, 0] if scalar else q.T
+
+    def sample(self, period):
+        """Times and joint values (N, dof) every `period` seconds, ending on the last breakpoint."""
+        if type(period) not in [int, float] or period <= 0:
+            raise ValueError("period must be a positive integer or float")
+        n = int(np.ceil(self.duration / period - 1e-9)) + 1
+        t = np.minimum(self.breakpoints[0] + np.arange(n) * period, self.breakpoints[-1])
+        return t, self.at(t)
+
+    def sample_adaptive(self, tol, error=None, max_depth=16):
+        """
+        Times and joint values (N, dof) with as few samples as keep straight lines between
+        them within tol of the trajectory (see adaptive_times for error).
+        """
+        if type(tol) not in [int, float] or tol <= 0:
+            raise ValueError("tol must be a positive integer or float")
+        t = adaptive_times(self.coeffs, self.breakpoints, tol, error, max_depth)
+        return t, self.at(t)
+
+    def slice(self, t_start, t_end):
+        """Part of the trajectory between t_start and t_end, keeping absolute times."""
+        t0 = max(float(t_start), self.breakpoints[0])
+        t1 = min(float(t_end), self.breakpoints[-1])
+        if t1 <= t0:
+            raise ValueError(f"Empty slice [{t_start}, {t_end}] of a trajectory over "
+                             f"[{self.breakpoints[0]}, {self.breakpoints[-1]}]")
+        bp = self.breakpoints
+        i0 = min(int(np.searchsorted(bp, t0, side='right')) - 1, len(bp) - 2)
+        i1 = int(segment_index(bp, t1))
+        coeffs = self.coeffs[:, i0:i1 + 1].copy()
+        coeffs[:, 0] = shift_coeffs(coeffs[:, 0], t0 - bp[i0])
+        breakpoints = np.concatenate(([t0], bp[i0 + 1:i1 + 1], [t1]))
+        if self.times is None:
+            return Trajectory([], coeffs, breakpoints)
+        times = self.times[(self.times >= t0) & (self.times <= t1)]
+        return Trajectory([self.at(times)], coeffs, breakpoints, times)
@@ -0,0 +1,123 @@
+# """
+# Author: Silas Udofia
+# Date: 2024-08-02
+# GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+# """
+
+import numpy as np
+
+# -------------------------
+# Limit-based point-to-point profiles
+# -------------------------
+# Every move between two waypoints is a straight line in joint space,
+#     q(t) = q0 + (q1 - q0) s(t),  s: 0 -> 1 at rest at both ends,
+# so all joints start and finish together. The per-joint limits become limits on s
+# (vmax / |dq| and so on, the smallest over the joints) and s(t) is the minimum-time
+# trapezoidal or 7-segment jerk-limited profile under them. Both are piecewise
+# polynomials, returned in the cubic coefficient layout of traj_poly.
+
+
+def _integrate(durations, jerks, accels=None):
+    """
+    Cubic rows (segments, 4) of s(t) in local segment time for constant jerk per segment,
+    starting at rest. With accels given, the acceleration is set at each segment start.
+    """
+    rows = np.zeros((len(durations), 4))
+    p = v = a = 0.0
+    for i, (T, j) in enumerate(zip(durations, jerks)):
+        if accels is not None:
+            a = accels[i]
+        rows[i] = p, v, a / 2.0, j / 6.0
+        p += v * T + a * T**2 / 2.0 + j * T**3 / 6.0
+        v += a * T + j * T**2 / 2.0
+        a += j * T
+    return rows
+
+
+def trap_profile(vmax, amax):
+    """
+    Minimum-time trapezoidal s(t) from 0 to 1 under |ṡ| <= vmax, |s̈| <= amax.
+    Returns the segment durations (3,) and cubic rows (3, 4); the cruise phase has zero
+    length when vmax is not reached (triangular profile).
+    """
+    if vmax * vmax / amax >= 1.0:
+        Ta, Tc = np.sqrt(1.0 / amax), 0.0
+    else:
+        Ta, Tc = vmax / amax, 1.0 / vmax - vmax / amax
+    durations = np.array([Ta, Tc, Ta])
+    return durations, _integrate(durations, np.zeros(3), accels=(amax, 0.0, -amax))
+
+
+def scurve_profile(vmax, amax, jmax):
+    """
+    Minimum-time 7-segment jerk-limited s(t) from 0 to 1 under |ṡ| <= vmax, |s̈| <= amax,
+    |s⃛| <= jmax. Returns the segment durations (7,) and cubic rows (7, 4); phases that are
+    not needed (constant acceleration, cruise) have zero length.
+    """
+    def accel_phase(v):
+        # jerk time and total time to reach velocity v from rest
+        if v * jmax >= amax * amax:
+            return amax / jmax, v / amax + amax / jmax
+        Tj = np.sqrt(v / jmax)
+        return Tj, 2.0 * Tj
+
+    V = vmax
+    Tj, Ta = accel_phase(V)
+    if V * Ta > 1.0:
+        # vmax is not reached: the peak velocity covers the distance with no cruise
+        V = 0.5 * (-amax**2 / jmax + np.sqrt(amax**4 / jmax**2 + 4.0 * amax))
+        if V * jmax < amax * amax:
+            V = np.cbrt(jmax / 4.0)
+        Tj, Ta = accel_phase(V)
+    Tv = max(1.0 / V - Ta, 0.0)
+    Tc = max(Ta - 2.0 * Tj, 0.0)
+    durations = np.array([Tj, Tc, Tj, Tv, Tj, Tc, Tj])
+    jerks = jmax * np.array([1.0, 0.0, -1.0, 0.0, -1.0, 0.0, 1.0])
+    return durations, _integrate(durations, jerks)
+
+
+def profile_coeffs(waypoints, vmax, amax, jmax=None, profile='trap'):
+    """
+    Synchronized point-to-point profiles through joint waypoints (dof, n), at rest on every
+    waypoint, under per-joint limits vmax, amax (and jmax for 'scurve'), scalars or (dof,).
+    Returns cubic coefficients (dof, segments, 4), their breakpoints (segments+1,) and the
+    time the motion reaches each waypoint (n,).
+    """
+    assert profile in ('trap', 'scurve'), "profile must be 'trap' or 'scurve'"
+    q = np.atleast_2d(np.asarray(waypoints, dtype=float))
+    dof = q.shape[0]
+    vmax = np.broadcast_to(np.asarray(vmax, dtype=float), (dof,))
+    amax = np.broadcast_to(np.asarray(amax, dtype=float), (dof,))
+    if profile == 'scurve':
+        if jmax is None:
+            raise ValueError("an 'scurve' profile needs jerk limits")
+        jmax = np.broadcast_to(np.asarray(jmax, dtype=float), (dof,))
+
+    coeffs, breakpoints, time_points = [], [0.0], [0.0]
+    for i in range(q.shape[1] - 1):
+        dq = q[:, i + 1] - q[:, i]
+        moving = np.abs(dq) > 1e-12
+        if not moving.any():
+            time_points.append(time_points[-1])
+            continue
+        # the slowest joint sets each limit on s
+        span = np.abs(dq[moving])
+        if profile == 'trap':
+            durations, rows = trap_profile(np.min(vmax[moving] / span), np.min(amax[moving] / span))
+        else:
+            durations, rows = scurve_profile(np.min(vmax[moving] / span), np.min(amax[moving] / span),
+                                             np.min(jmax[moving] / span))
+        keep = durations > 1e-12 * durations.sum()
+        c = dq[:, None, None] * rows[keep]
+        c[..., 0] += q[:, i, None]
+        coeffs.append(c)
+        breakpoints.extend(breakpoints[-1] + np.cumsum(durations[keep]))
+        time_points.append(breakpoints[-1])
+
+    if not coeffs:
+        raise ValueError("waypoints do not move, nothing to profile")
+    return np.concatenate(coeffs, axis=1), np.array(breakpoints), np.array(time_points)
@@ -9,8 +9,15 @@
 # """
 
 import numpy as np
-from scipy.interpolate import make_interp_spline
+from scipy.interpolate import make_interp_spline, PPoly
 from scipy.spatial.transform import Rotation as R, Slerp
+from .ik_branch import parse_branch
+from .ik_pipeline import solve_chain, solve_parallel
+from .topp import retime
+from .traj_profile import profile_coeffs
+from .traj_file import write_trajectory_file, TrajectoryFile
+from .traj_poly import (cubic_coeffs, quintic_coeffs, hermite_coeffs, evaluate, iter_samples,
+                        adaptive_times, Trajectory)
 
 class TrajectoryPlanner:
     def __init__(self, model, fk, ik, jacobian):
@@ -67,7 +74,24 @@ class TrajectoryPlanner:
         self.jq_jerk = None
 
         self.t_traj = 1.0
+        self.segments = None  # (coeffs, breakpoints) of the last joint-space plan
         self.traj_method = None
+        self.ik_mode = 'solve'
+        self.branch = 'auto'
+        self.profile_limits = None  # (vmax, amax, jmax) of the 'trap' / 'scurve' types
+        self.ik_workers = 1
+        self.ik_chunk_size = 500
+        self.ik_jump_tol = 0.2
+        self.stitched = 0
+        self.waypoint_success = None  # (N,) success flags of the last solve_waypoints()
+        self.sample_tol = None  # adaptive sampling tolerance, None for n_samples per segment
+        self.sample_space = 'js'
+        self.hybrid_tol = 1e-3
+        self.hybrid_rot_tol = 1e-2
+        self.hybrid_knots = 2
+        self.hybrid_max_depth = 10
+        self.hybrid_ik_solves = 0
+        self.hybrid_unrefined = []  # (t0, t1) knot intervals whose midpoint IK failed
 
     def set_traj_time(self, t_period):
         if type(t_period) not in [int, float]:
@@ -82,19 +106,178 @@ class TrajectoryPlanner:
             raise TypeError(f"Expected a list of cartesian waypoints but got {type(waypoints)}")
         print(f"Calculating required joint angles for trajectory...")
         try:
-            joint_angles = [self.ik.solve(waypoints[i], mask=xyz_mask) for i in range(len(waypoints))]
+            joint_angles = self.solve_waypoints(waypoints, xyz_mask=xyz_mask)
             self.model.jnt_configs = [joint_angles]
             return [joint_angles]
         except ValueError as e:
             print(e)
 
+    def set_branch(self, branch='auto'):
+        """
+        Configuration branch kept by every IK solve of a trajectory:
+            'auto' - the branch of the first solved waypoint (default)
+            None   - no constraint, each waypoint is solved independently
+            dict / sequence of shoulder, elbow, wrist flags (see InverseKinematics.branch_of)
+        """
+        if branch is not None and branch != 'auto':
+            parse_branch(branch)
+        self.branch = branch
+
+    def set_ik_workers(self, workers=1, chunk_size=500, jump_tol=0.2):
+        """
+        Solve long task-space paths on worker processes: paths longer than chunk_size
+        are cut into chunks solved in parallel with warm starts inside each chunk.
+        Chunk boundaries where the solution jumps by more than jump_tol (rads / m) are
+        re-solved from the previous chunk (the count is kept in self.stitched).
+        workers=None uses every core; 1 (default) solves serially.
+        """
+        if workers is not None and (type(workers) is not int or workers < 1):
+            raise ValueError("workers must be a positive integer or None")
+        if type(chunk_size) is not int or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        if type(jump_tol) not in [int, float] or jump_tol <= 0:
+            raise ValueError("jump_tol must be a positive integer or float")
+        self.ik_workers = workers
+        self.ik_chunk_size = chunk_size
+        self.ik_jump_tol = jump_tol
+
+    def solve_waypoints(self, targets, xyz_mask=None):
+        """
+        IK for a sequence of cartesian targets. Unless the branch is None, every solve
+        starts from the previous solution and is held on the same configuration branch,
+        so consecutive joint vectors do not jump between elbow / wrist solutions.
+        Long sequences are split over worker processes (see set_ik_workers).
+        """
+        hold = self.branch is not None
+        want = None if self.branch in (None, 'auto') else parse_branch(self.branch)
+        self.stitched = 0
+        if self.ik_workers == 1 or len(targets) <= self.ik_chunk_size:
+            q, self.waypoint_success = solve_chain(self.ik, targets, xyz_mask, want, hold_branch=hold)
+            return list(q)
+        q_seed = None
+        if hold and self.branch == 'auto':
+            # fix the branch once so every chunk holds the same one
+            q_seed = self.ik.solve(targets[0], mask=xyz_mask)
+            if self.ik.success:
+                q_seed = self.ik.last_solution
+                want = self.ik.branch_of(q_seed)
+            else:
+                q_seed = None
+        q, self.waypoint_success, self.stitched = solve_parallel(self.ik, targets, xyz_mask, want, q_seed, hold,
+                                             self.ik_workers, self.ik_chunk_size, self.ik_jump_tol)
+        return list(q)
+
+    def check_reachable(self, waypoints, xyz_mask=None):
+        """
+        Run the IK reachability precheck on every cartesian waypoint and raise a
+        ValueError listing all unreachable ones before any IK is attempted.
+        """
+        points = np.array([np.asarray(w, dtype=float)[:3] for w in waypoints])
+        bad = self.ik.get_reachability().unreachable_indices(points, xyz_mask)
+        if bad:
+            listing = ", ".join(f"{i}: {points[i].tolist()}" for i in bad)
+            raise ValueError(f"{len(bad)} waypoint(s) outside the reachable workspace of {self.model.robot_name} -> {listing}")
+
+    def set_ik_mode(self, mode='solve'):
+        """
+        Select how task-space trajectories are converted to joint space:
+            'solve' - full iterative IK solve on every interpolated pose (default)
+            'track' - resolved-rate tracking from the previous joint state using the
+                      planned Cartesian velocities, with a corrective step only on drift
+        """
+        assert mode in ('solve', 'track'), "ik mode must be 'solve' or 'track'"
+        self.ik_mode = mode
+
+    def set_hybrid_tolerance(self, tol=1e-3, rot_tol=1e-2, knots=2, max_depth=10):
+        """
+        Settings of the 'ts-hybrid' method: IK runs on the waypoints and `knots` evenly spaced
+        poses inside every segment, joints are interpolated between them, and knots are added
+        (for at most max_depth rounds) where the end effector leaves the cartesian path by more
+        than tol (m) in position or rot_tol (rads) in orientation.
+        """
+        for name, val in (('tol', tol), ('rot_tol', rot_tol)):
+            if type(val) not in [int, float] or val <= 0:
+                raise ValueError(f"{name} must be a positive integer or float")
+        if type(knots) is not int or knots < 0:
+            raise ValueError("knots must be a non-negative integer")
+        if type(max_depth) is not int or max_depth < 0:
+            raise ValueError("max_depth must be a non-negative integer")
+        self.hybrid_tol = tol
+        self.hybrid_rot_tol = rot_tol
+        self.hybrid_knots = knots
+        self.hybrid_max_depth = max_depth
+
+    def track_joint_angles(self, poses, xyz_mask=None):
+        """Resolved-rate IK along the interpolated poses of the last task-space plan."""
+        velocities = np.column_stack((self.vel_x, self.vel_y, self.vel_z))
+        print(f"Tracking required joint angles for trajectory...")
+        joint_angles = self.ik.track(poses, velocities, self.t_fine, mask=xyz_mask)
+        self.model.jnt_configs = [joint_angles]
+        return [joint_angles]
+
     def traj_type(self, tr_type='qu'):
         """
-        Set the trajectory polynomial method ('cubic' or 'quintic').
+        Set the trajectory polynomial method ('cubic' or 'quintic'), or a limit-based
+        point-to-point profile ('trap' trapezoidal, 'scurve' jerk-limited) timed from
+        set_profile_limits() instead of the trajectory time.
         """
-        assert tr_type in ('cu', 'qu', 'spl'), "trajectory type must be 'cu (cubic)', 'qu (quintic)' or spl (spline)"
+        assert tr_type in ('cu', 'qu', 'spl', 'trap', 'scurve'), \
+            "trajectory type must be 'cu (cubic)', 'qu (quintic)', spl (spline), 'trap' or 'scurve'"
         self.tr_type = tr_type
 
+    def set_profile_limits(self, vmax, amax, jmax=None):
+        """
+        Per-joint velocity, acceleration and jerk limits (rads / m per s, s², s³) of the
+        'trap' and 'scurve' trajectory types, scalars or one value per joint.
+        jmax is only needed by 'scurve'.
+        """
+        n = self.model.get_num_of_joints()
+        limits = []
+        for name, value in (('vmax', vmax), ('amax', amax), ('jmax', jmax)):
+            if value is None and name == 'jmax':
+                limits.append(None)
+                continue
+            if type(value) not in [int, float, np.ndarray, list, tuple]:
+                raise TypeError(f"{name} must be of type int, float, list or ndarray")
+            value = np.broadcast_to(np.asarray(value, dtype=float), (n,)) if np.ndim(value) == 0 \
+                else np.asarray(value, dtype=float)
+            if value.shape != (n,):
+                raise ValueError(f"Expected {n} values for {name} but got {value.size}")
+            if not np.all(value > 0):
+                raise ValueError(f"{name} must be positive")
+            limits.append(value)
+        self.profile_limits = tuple(limits)
+
+    def set_adaptive_sampling(self, tol=None, space='js'):
+        """
+        Sample planned trajectories adaptively instead of n_samples per segment: samples are
+        only added where straight lines between them would be off the trajectory by more than tol.
+            'js'  - tol is the largest joint error (rads / m)
+            'tcp' - tol is the end-effector position deviation through FK (m)
+        Task-space plans always sample the cartesian path with tol in m, before IK.
+        tol=None goes back to fixed sampling. Spline ('spl') plans are not supported.
+        """
+        assert space in ('js', 'tcp'), "space must be 'js' or 'tcp'"
+        if tol is not None and (type(tol) not in [int, float] or tol <= 0):
+            raise ValueError("tol must be a positive integer or float")
+        self.sample_tol = tol
+        self.sample_space = space
+
+    def _check_spline_sampling(self):
+        if self.sample_tol is not None:
+            raise ValueError("adaptive sampling is not supported for 'spl' trajectories, "
+                             "use set_adaptive_sampling(None) or another trajectory type")
+
+    def sampling_error(self, cartesian=False):
+        """Error function of adaptive sampling (see traj_poly.adaptive_times), None for the default."""
+        if cartesian:
+            return lambda p_true, p_line: np.linalg.norm(p_true - p_line, axis=1)
+        if self.sample_space == 'tcp':
+            def tcp_error(q_true, q_line):
+                return np.linalg.norm(self.fk.pose_batch(q_true)[:, :3] - self.fk.pose_batch(q_line)[:, :3], axis=1)
+            return tcp_error
+        return None
+
     def cubic_segment(self, q0, q1, v0=0, v1=0, t0=0, t1=1):
         """
         Compute cubic polynomial coefficients for one trajectory segment.
@@ -113,29 +296,20 @@ class TrajectoryPlanner:
     def cubic_trajectory_nd(self, waypoints, time_points, velocities=None):
         """
         Multi-DOF cubic polynomial trajectory generator.
-        Returns coefficients for each dimension and segment.
-        """
-        waypoints = np.array(waypoints)
-        m, n = waypoints.shape
-        velocities = np.zeros_like(waypoints) if velocities is None else np.array(velocities)
-
-        coeffs = [[] for _ in range(m)]
-        for d in range(m):
-            for i in range(n - 1):
-                a = self.cubic_segment(
-                    waypoints[d, i], waypoints[d, i+1],
-                    velocities[d, i], velocities[d, i+1],
-                    t0=time_points[i], t1=time_points[i+1]
-                )
-                coeffs[d].append(a)
-        return coeffs
+        Returns coefficients (dims, segments, 4) in local segment time t - time_points[i].
+        Earlier versions returned nested lists in absolute time; evaluate segment i with
+        eval_cubic(coeffs[d, i], t, t0=time_points[i]).
+        """
+        return cubic_coeffs(waypoints, time_points, velocities)
 
-    def eval_cubic(self, coeffs, t):
+    def eval_cubic(self, coeffs, t, t0=0.0):
         """
-        Given coefficients a0..a3 for q(t) = a0 + a1*t + a2*t^2 + a3*t^3
+        Given coefficients a0..a3 for q(t) = a0 + a1*τ + a2*τ^2 + a3*τ^3 in local time
+        τ = t - t0 (t0 is the segment start for cubic_trajectory_nd coefficients)
         Returns q, qd, qdd arrays for times t.
         """
         a0, a1, a2, a3 = coeffs
+        t = t - t0
         q   = a0 + a1*t + a2*t**2 + a3*t**3
         qd  = a1 + 2*a2*t + 3*a3*t**2
         qdd = 2*a2 + 6*a3*t
@@ -161,68 +335,51 @@ class TrajectoryPlanner:
     def quintic_trajectory_nd(self, waypoints, time_points, velocities=None):
         """
         Multi-DOF quintic polynomial trajectory generator.
-        Returns coefficients for each dimension and segment.
+        Returns coefficients (dims, segments, 6) in local segment time t - time_points[i].
+        Earlier versions returned nested lists in absolute time; evaluate segment i with
+        eval_quintic(coeffs[d, i], t, t0=time_points[i]).
         """
-        waypoints = np.array(waypoints)
-        m, n = waypoints.shape
-        velocities = np.zeros_like(waypoints) if velocities is None else np.array(velocities)
-        
-        coeffs = [[] for _ in range(m)]
-        for d in range(m):  # each joint
-            for i in range(n - 1):  # each segment
-                a = self.quintic_segment(
-                    waypoints[d, i], waypoints[d, i+1],
-                    velocities[d, i], velocities[d, i+1],
-                    t0=time_points[i], t1=time_points[i+1]
-                )
-                coeffs[d].append(a)
-        return coeffs
+        return quintic_coeffs(waypoints, time_points, velocities)
     
-    def eval_quintic(self, coeffs, t):
+    def eval_quintic(self, coeffs, t, t0=0.0):
         """
         Given coefficients a0..a5 for:
-        q(t) = a0 + a1 t + a2 t^2 + a3 t^3 + a4 t^4 + a5 t^5
+        q(t) = a0 + a1 τ + a2 τ^2 + a3 τ^3 + a4 τ^4 + a5 τ^5,  τ = t - t0
+        (t0 is the segment start for quintic_trajectory_nd coefficients)
         Returns q, qd, qdd as arrays for times t.
         """
         a0,a1,a2,a3,a4,a5 = coeffs
+        t = t - t0
         q   = a0 + a1*t + a2*t**2 + a3*t**3 + a4*t**4 + a5*t**5
         qd  = a1 + 2*a2*t + 3*a3*t**2 + 4*a4*t**3 + 5*a5*t**4
         qdd = 2*a2 + 6*a3*t + 12*a4*t**2 + 20*a5*t**3
         return q, qd, qdd
 
 
-    def evaluate_full_trajectory(self, coeffs, time_points, n_samples=100):
+    def evaluate_full_trajectory(self, coeffs, time_points, n_samples=100, jerk=False, breakpoints=None,
+                                 cartesian=False):
         """
         Evaluate multi-segment trajectory for all dimensions.
-        Returns time, q, qd, qdd arrays.
+        Every segment gets n_samples points, sharing the knot with the segment before it,
+        unless adaptive sampling is on (see set_adaptive_sampling); cartesian marks
+        coeffs of a cartesian position path.
+        breakpoints: segment times of coeffs when they differ from time_points (profiles
+        have several segments per waypoint interval, which is still sampled n_samples times).
+        Returns time, q, qd, qdd arrays, plus the jerk when jerk=True.
         """
-        m = len(coeffs)
-        # polynomial method
-        tr_type = getattr(self, 'tr_type', 'qu')  # default to quintic
-
-        t_full, q_full, qd_full, qdd_full = [], [[] for _ in range(m)], [[] for _ in range(m)], [[] for _ in range(m)]
-        
-        for i in range(len(time_points) - 1):
-            t0, t1 = time_points[i], time_points[i+1]
-            t_seg = np.linspace(t0, t1, n_samples)
-            if i > 0:
-                t_seg = t_seg[1:]
-            t_full.extend(t_seg)
+        time_points = np.asarray(time_points, dtype=float)
+        breakpoints = time_points if breakpoints is None else breakpoints
+        if self.sample_tol is not None:
+            t_full = adaptive_times(coeffs, breakpoints, self.sample_tol, self.sampling_error(cartesian))
+        else:
+            s = np.linspace(0.0, 1.0, n_samples)
+            grid = time_points[:-1, None] + np.diff(time_points)[:, None] * s
+            t_full = np.concatenate((grid[0], grid[1:, 1:].ravel()))
 
-            if tr_type == 'cu':
-                for d in range(m):
-                    q, qd, qdd = self.eval_cubic(coeffs[d][i], t_seg)
-                    q_full[d].extend(q)
-                    qd_full[d].extend(qd)
-                    qdd_full[d].extend(qdd)
-            else:
-                for d in range(m):
-                    q, qd, qdd = self.eval_quintic(coeffs[d][i], t_seg)
-                    q_full[d].extend(q)
-                    qd_full[d].extend(qd)
-                    qdd_full[d].extend(qdd)
-        
-        return np.array(t_full), np.array(q_full), np.array(qd_full), np.array(qdd_full)
+        q, qd, qdd, qddd = evaluate(coeffs, breakpoints, t_full)
+        if jerk:
+            return t_full, q, qd, qdd, qddd
+        return t_full, q, qd, qdd
 
     def compute_velocities_ts(self, waypoints, start_vel=None, end_vel=None, pause_time=0.001):
         """
@@ -384,6 +541,16 @@ class TrajectoryPlanner:
 
         return q
     
+    @staticmethod
+    def spline_segments(splines, t_start, t_end):
+        """Polynomial pieces (coeffs, breakpoints) of B-splines over [t_start, t_end]."""
+        pieces = [PPoly.from_spline(spl) for spl in splines]
+        x = pieces[0].x
+        keep = (x[:-1] >= t_start - 1e-12) & (x[1:] <= t_end + 1e-12) & (np.diff(x) > 0)
+        coeffs = np.array([pp.c[::-1, keep].T for pp in pieces])
+        idx = np.flatnonzero(keep)
+        return coeffs, np.append(x[idx], x[idx[-1] + 1])
+
     def q_spline_js(self, joint_angles, time_step=100):
         """
         Generate smooth quintic spline trajectory from waypoints.
@@ -407,6 +574,7 @@ class TrajectoryPlanner:
         jq_vel = np.array([traj(t_fine, 1) for traj in trajectories])
         jq_acc = np.array([traj(t_fine, 2) for traj in trajectories])
         jq_jerk = np.array([traj(t_fine, 3) for traj in trajectories])
+        self.segments = self.spline_segments(trajectories, t[0], t[-1])
 
         self.t_fine = t_fine
 
@@ -443,7 +611,7 @@ class TrajectoryPlanner:
                 T = np.concatenate([pos, rot])
                 targets.append(T)
 
-            joint_angles = [self.ik.solve(targets[i], mask=xyz_mask) for i in range(len(targets))]
+            joint_angles = self.solve_waypoints(targets, xyz_mask=xyz_mask)
 
             jnt_conf = np.array(joint_angles).T
             time_points, velocities, = self.compute_velocities_js(waypoints=jnt_conf)
@@ -457,34 +625,52 @@ class TrajectoryPlanner:
                     time_points=time_points,
                     velocities=velocities
                 )
-                eval_func = self.eval_cubic 
-                t, jq, jqd, jqdd = self.evaluate_full_trajectory(coeffs, time_points=time_points, n_samples=n_samples)
+                t, jq, jqd, jqdd, jqddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                         n_samples=n_samples, jerk=True)
                 
                 self.t_fine = t
                 self.jq = jq
                 self.jq_vel = jqd
                 self.jq_acc = jqdd
-                self.jq_jerk = None
+                self.jq_jerk = jqddd
+                self.segments = (coeffs, time_points)
 
                 joint_trajectory = np.transpose(jq)
                 return [joint_trajectory]
             elif tr_type == 'spl':
+                self._check_spline_sampling()
                 joint_trajectory = self.q_spline_js(joint_angles=joint_angles, time_step=n_samples)
                 return [joint_trajectory]
+            elif tr_type in ('trap', 'scurve'):
+                coeffs, breakpoints, time_points = self.profile_segments(jnt_conf)
+                t, jq, jqd, jqdd, jqddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                         n_samples=n_samples, jerk=True,
+                                                                         breakpoints=breakpoints)
+
+                self.t_fine = t
+                self.jq = jq
+                self.jq_vel = jqd
+                self.jq_acc = jqdd
+                self.jq_jerk = jqddd
+                self.segments = (coeffs, breakpoints)
+
+                joint_trajectory = np.transpose(jq)
+                return [joint_trajectory]
             else:
                 coeffs = self.quintic_trajectory_nd(
                     waypoints=jnt_conf,
                     time_points=time_points,
                     velocities=velocities
                 )  
-                eval_func = self.eval_quintic
-                t, jq, jqd, jqdd = self.evaluate_full_trajectory(coeffs, time_points=time_points, n_samples=n_samples)
+                t, jq, jqd, jqdd, jqddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                         n_samples=n_samples, jerk=True)
                 
                 self.t_fine = t
                 self.jq = jq
                 self.jq_vel = jqd
                 self.jq_acc = jqdd
-                self.jq_jerk = None
+                self.jq_jerk = jqddd
+                self.segments = (coeffs, time_points)
                 
                 joint_trajectory = np.transpose(jq)
                 return [joint_trajectory]
@@ -516,6 +702,8 @@ class TrajectoryPlanner:
 
         # polynomial method
         tr_type = getattr(self, 'tr_type', 'qu')  # default to quintic
+        if tr_type in ('trap', 'scurve'):
+            raise ValueError(f"trajectory type '{tr_type}' is a joint-space profile, use traj_method='js'")
 
         if tr_type == 'cu':
             coeffs = self.cubic_trajectory_nd(
@@ -523,8 +711,9 @@ class TrajectoryPlanner:
                 time_points=time_points,
                 velocities=velocities
             )
-            eval_func = self.eval_cubic 
-            t, q, qd, qdd = self.evaluate_full_trajectory(coeffs, time_points=time_points, n_samples=n_samples)
+            t, q, qd, qdd, qddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                 n_samples=n_samples, jerk=True,
+                                                                 cartesian=True)
             
             positions = np.transpose(q)
             self.t_fine = t
@@ -541,7 +730,12 @@ class TrajectoryPlanner:
             self.acc_y = qdd[1]
             self.acc_z = qdd[2]
 
+            self.jerk_x = qddd[0]
+            self.jerk_y = qddd[1]
+            self.jerk_z = qddd[2]
+
         elif tr_type == 'spl':
+            self._check_spline_sampling()
             q = self.q_spline(way_points, time_step=n_samples)
             positions = np.array(q)
         else:
@@ -550,8 +744,9 @@ class TrajectoryPlanner:
                 time_points=time_points,
                 velocities=velocities
             )  
-            eval_func = self.eval_quintic
-            t, q, qd, qdd = self.evaluate_full_trajectory(coeffs, time_points=time_points, n_samples=n_samples)
+            t, q, qd, qdd, qddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                 n_samples=n_samples, jerk=True,
+                                                                 cartesian=True)
            
             positions = np.transpose(q)
             self.t_fine = t
@@ -567,6 +762,10 @@ class TrajectoryPlanner:
             self.acc_x = qdd[0]
             self.acc_y = qdd[1]
             self.acc_z = qdd[2]
+
+            self.jerk_x = qddd[0]
+            self.jerk_y = qddd[1]
+            self.jerk_z = qddd[2]
         
         # Convert Euler angles to quaternions
         quats = R.from_euler('xyz', euler_angles).as_quat(canonical=False)
@@ -580,7 +779,11 @@ class TrajectoryPlanner:
         slerp = Slerp(key_times, rotations_quart)
 
         # Interpolation times
-        times = np.linspace(0, len(wayp)-1, len(positions))
+        if self.sample_tol is not None:
+            # adaptive samples are not evenly spread, place them by their time
+            times = np.interp(self.t_fine, time_points, key_times)
+        else:
+            times = np.linspace(0, len(wayp)-1, len(positions))
 
         interp_rots_quart = slerp(times).as_quat(canonical=False)
         self.interp_rots_quart = interp_rots_quart
@@ -590,10 +793,112 @@ class TrajectoryPlanner:
             T = np.concatenate([pos, rot])
             poses.append(T)
         
-        joint_angles = self.wayp_to_joint_angle(poses, xyz_mask=xyz_mask)
+        if self.ik_mode == 'track':
+            joint_angles = self.track_joint_angles(poses, xyz_mask=xyz_mask)
+        else:
+            joint_angles = self.wayp_to_joint_angle(poses, xyz_mask=xyz_mask)
         self.trajectory = joint_angles
         return joint_angles
     
+    def create_traj_hybrid(self, way_points, xyz_mask=None, n_samples=100):
+        """
+        Task-space trajectory with IK on a sparse set of knots only. The cartesian path is
+        planned as in create_traj_taskspace; joints are joined between the IK knots by cubic
+        Hermite segments, and the resulting end-effector path is checked with batched FK at
+        eighths of every knot interval. Intervals off the cartesian path by more than
+        the tolerances get a knot in the middle, solved from the interpolated joints
+        (see set_hybrid_tolerance). The number of IK solves is kept in self.hybrid_ik_solves.
+        Midpoint knots are held on the branch of the initial knots; an interval whose midpoint
+        fails to solve is left unrefined and listed in self.hybrid_unrefined.
+        """
+        tr_type = getattr(self, 'tr_type', 'qu')
+        if tr_type not in ('cu', 'qu'):
+            raise ValueError(f"'ts-hybrid' plans the cartesian path with 'cu' or 'qu', not '{tr_type}'")
+        waypoints = np.array(way_points, dtype=float).T
+        time_points, velocities = self.compute_velocities_ts(waypoints=waypoints)
+        self.velocities = velocities
+        nd = self.cubic_trajectory_nd if tr_type == 'cu' else self.quintic_trajectory_nd
+        coeffs = nd(waypoints[:3], time_points, velocities)
+        euler = waypoints[3:6].T / 180 * np.pi if self.model.euler_in_deg else waypoints[3:6].T
+        slerp = Slerp(time_points, R.from_euler('xyz', euler))
+
+        mask = np.ones(6) if xyz_mask is None else np.asarray(xyz_mask, dtype=float)
+        check_rot = bool(mask[3:].any())
+
+        def targets(t):
+            return np.column_stack((evaluate(coeffs, time_points, t)[0].T, slerp(t).as_quat()))
+
+        s = np.linspace(0.0, 1.0, self.hybrid_knots + 2)
+        knots = np.unique(time_points[:-1, None] + np.diff(time_points)[:, None] * s)
+        q_knots = np.array(self.solve_waypoints(targets(knots), xyz_mask=xyz_mask))
+        solves = len(knots)
+        if not self.waypoint_success.all():
+            failed = knots[~self.waypoint_success]
+            raise ValueError(f"IK failed on {len(failed)} knot(s) of the path at t = {np.round(failed, 4).tolist()}")
+        want = None
+        if self.branch is not None:
+            flags = self.ik.branch_of(q_knots[0])
+            want = flags if self.branch == 'auto' else np.where(parse_branch(self.branch) == 0, flags,
+                                                                 parse_branch(self.branch))
+        unrefined = []
+
+        checks = np.arange(1, 8) / 8.0
+        verbose, self.ik.verbose = self.ik.verbose, False
+        try:
+            for depth in range(self.hybrid_max_depth + 1):
+                c = hermite_coeffs(q_knots.T, knots)
+                t_chk = (knots[:-1, None] + np.diff(knots)[:, None] * checks).ravel()
+                path = targets(t_chk)
+                T = self.fk.compute_batch(evaluate(c, knots, t_chk)[0].T)
+                err_p = np.linalg.norm((T[:, :3, 3] - path[:, :3]) * mask[:3], axis=1)
+                bad = err_p > self.hybrid_tol
+                if check_rot:
+                    err_r = (R.from_matrix(T[:, :3, :3]).inv() * R.from_quat(path[:, 3:])).magnitude()
+                    bad |= err_r > self.hybrid_rot_tol
+                bad = bad.reshape(-1, len(checks)).any(axis=1)
+                bad &= ~np.isin(knots[:-1], [t0 for t0, _ in unrefined])
+                if not bad.any() or depth == self.hybrid_max_depth:
+                    break
+                t_new = 0.5 * (knots[:-1] + knots[1:])[bad]
+                seeds = evaluate(c, knots, t_new)[0].T
+                q_new, ok = [], np.zeros(len(t_new), dtype=bool)
+                for k, (pose, seed) in enumerate(zip(targets(t_new), seeds)):
+                    q_new.append(self.ik.solve(pose, mask=xyz_mask, branch=want, q_seed=seed))
+                    ok[k] = self.ik.success
+                solves += len(t_new)
+                # a failed solve is not a configuration on the path, never use it as a knot
+                unrefined.extend(zip(knots[:-1][bad][~ok].tolist(), knots[1:][bad][~ok].tolist()))
+                t_new, q_new = t_new[ok], np.array(q_new).reshape(len(t_new), -1)[ok]
+                order = np.argsort(np.concatenate((knots, t_new)), kind='stable')
+                knots = np.concatenate((knots, t_new))[order]
+                q_knots = np.concatenate((q_knots, q_new))[order]
+        finally:
+            self.ik.verbose = verbose
+        self.hybrid_ik_solves = solves
+        self.hybrid_unrefined = unrefined
+        if unrefined:
+            print(f"Warning!: IK failed inside {len(unrefined)} knot interval(s), "
+                  f"left unrefined: {[tuple(round(x, 4) for x in iv) for iv in unrefined]}")
+
+        # cartesian path for plotting, joints from the knot interpolation (no further IK)
+        t, q, qd, qdd, qddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                             n_samples=n_samples, jerk=True,
+                                                             cartesian=True)
+        self.t_fine = t
+        self.pos_x, self.pos_y, self.pos_z = q
+        self.vel_x, self.vel_y, self.vel_z = qd
+        self.acc_x, self.acc_y, self.acc_z = qdd
+        self.jerk_x, self.jerk_y, self.jerk_z = qddd
+        self.interp_rots_quart = slerp(t).as_quat(canonical=False)
+
+        c = hermite_coeffs(q_knots.T, knots)
+        jq, jqd, jqdd, jqddd = evaluate(c, knots, t)
+        self.jq, self.jq_vel, self.jq_acc, self.jq_jerk = jq, jqd, jqdd, jqddd
+        self.segments = (c, knots)
+        joint_angles = [np.transpose(jq)]
+        self.model.jnt_configs = joint_angles
+        return joint_angles
+
     def interp_rots_as_eular(self):
         eular = R.from_quat(self.interp_rots_quart).as_euler('xyz', degrees=False)
         roll = [eular[i][2] for i in range(len(eular))]
@@ -604,6 +909,20 @@ class TrajectoryPlanner:
         self.pitch = pitch
         self.yaw = yaw
     
+    def as_trajectory(self, samples):
+        """
+        Wrap the joint samples [array (N, dof)] of the last plan in a Trajectory.
+        Joint-space and 'ts-hybrid' plans keep their polynomial segments; task-space plans
+        are sampled through IK, so their joint samples are joined by cubic Hermite segments.
+        """
+        if samples is None:
+            return None
+        if self.traj_method == 'ts':
+            q = np.asarray(samples[0], dtype=float)
+            return Trajectory(samples, hermite_coeffs(q.T, self.t_fine), self.t_fine, times=self.t_fine)
+        coeffs, breakpoints = self.segments
+        return Trajectory(samples, coeffs, breakpoints, times=self.t_fine)
+
     def create_trajectory(self, waypoints, traj_method='ts', xyz_mask=None, n_samples=100):
 
         if type(waypoints) not in [np.ndarray, list]:
@@ -616,58 +935,97 @@ class TrajectoryPlanner:
         if len(waypoints) < 2:
             raise ValueError(f"Too few target poses for robot :{self.model.robot_name}: expected a sequence start and end goal poses")
         self.traj_method = traj_method
+        if traj_method in ('js', 'ts', 'ts-hybrid') and self.ik.reach_check:
+            self.check_reachable(waypoints, xyz_mask)
         if traj_method == 'js':
-            joint_traj = self.create_traj_jointspace(waypoints=waypoints, xyz_mask=xyz_mask, n_samples=n_samples)
+            joint_traj = self.as_trajectory(
+                self.create_traj_jointspace(waypoints=waypoints, xyz_mask=xyz_mask, n_samples=n_samples))
             self.trajectory = joint_traj
             self.model.jnt_configs = joint_traj
             if self.model.joint_lim_enable:
                 self.model.check_limits(joint_traj)
             return joint_traj
         elif traj_method == 'ts':
-            ts_traj = self.create_traj_taskspace(way_points=waypoints, xyz_mask=xyz_mask, n_samples=n_samples)
+            ts_traj = self.as_trajectory(
+                self.create_traj_taskspace(way_points=waypoints, xyz_mask=xyz_mask, n_samples=n_samples))
             self.trajectory = ts_traj
             self.model.jnt_configs = ts_traj
             if self.model.joint_lim_enable:
                 self.model.check_limits(ts_traj)
             return ts_traj
+        elif traj_method == 'ts-hybrid':
+            hybrid_traj = self.as_trajectory(
+                self.create_traj_hybrid(way_points=waypoints, xyz_mask=xyz_mask, n_samples=n_samples))
+            self.trajectory = hybrid_traj
+            self.model.jnt_configs = hybrid_traj
+            if self.model.joint_lim_enable:
+                self.model.check_limits(hybrid_traj)
+            return hybrid_traj
         else:
             raise ValueError(f"Unsupported trajectory method: {traj_method}")
         
+    def joint_poses_to_rads(self, joint_poses, rads=False):
+        """Joint waypoints (n, dof) in rads / m; revolute values are converted from degrees unless rads."""
+        q = np.array(joint_poses, dtype=float)
+        if not rads:
+            revolute = np.array([jt == 'r' for jt in self.model.get_joint_type()])
+            q[:, revolute] = q[:, revolute] / 180 * np.pi
+        return q
+
+    def profile_segments(self, jnt_conf):
+        """
+        Synchronized 'trap' / 'scurve' profile through joint waypoints jnt_conf (dof, n) in rads / m.
+        Returns (coeffs (dof, segments, 4), breakpoints (segments+1,), waypoint times (n,)).
+        """
+        if self.profile_limits is None:
+            raise ValueError(f"trajectory type '{self.tr_type}' needs joint limits, call set_profile_limits() first")
+        vmax, amax, jmax = self.profile_limits
+        return profile_coeffs(jnt_conf, vmax, amax, jmax, profile=self.tr_type)
+
+    def joint_segments(self, jnt_conf):
+        """
+        Timing and polynomial coefficients through joint waypoints jnt_conf (dof, n) in rads / m.
+        Returns (coeffs (dof, segments, order+1), breakpoints (segments+1,)) for the current type;
+        'cu' / 'qu' have one segment per waypoint interval.
+        """
+        tr_type = getattr(self, 'tr_type', 'qu')
+        if tr_type in ('trap', 'scurve'):
+            coeffs, breakpoints, _ = self.profile_segments(jnt_conf)
+            return coeffs, breakpoints
+        if tr_type not in ('cu', 'qu'):
+            raise ValueError(f"trajectory type '{tr_type}' has no polynomial segments, use 'cu', 'qu', 'trap' or 'scurve'")
+        time_points, velocities = self.compute_velocities_js(waypoints=jnt_conf)
+        if tr_type == 'cu':
+            return self.cubic_trajectory_nd(jnt_conf, time_points, velocities), time_points
+        return self.quintic_trajectory_nd(jnt_conf, time_points, velocities), time_points
+
+    def stream_joint_control(self, joint_poses, period=0.002, chunk_size=256, rads=False):
+        """
+        Generator version of joint_control() for long programs: yields (t, q, qd, qdd)
+        chunks sampled every `period` seconds, q of shape (dof, <= chunk_size), evaluated
+        straight from the segment coefficients. Nothing is stored on the planner, so memory
+        stays constant however long the program runs; feed the chunks to a driver loop or
+        file writer. The last sample lands exactly on the final waypoint.
+        """
+        if type(joint_poses) not in [np.ndarray, list]:
+            raise TypeError(f"Expected a list of joint configurations but got {type(joint_poses)}")
+        if type(period) not in [int, float] or period <= 0:
+            raise ValueError("period must be a positive integer or float")
+        if type(chunk_size) is not int or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        jnt_conf = self.joint_poses_to_rads(joint_poses, rads).T
+        coeffs, time_points = self.joint_segments(jnt_conf)
+        return iter_samples(coeffs, time_points, period, chunk_size)
+
     def joint_control(self, joint_poses, n_samples=100, rads=False):
         if type(joint_poses) not in [np.ndarray, list]:
             raise TypeError(f"Expected a list of joint configurations but got {type(joint_poses)}")
         if type(n_samples) not in [int]:
             raise TypeError(f"n_samples must be of type int")
         
-        rads_to_deg = []
-
         self.traj_method = "js"
 
-        j_type = self.model.get_joint_type()
-        joint_p = []
-
-        if rads:
-            for i in range(len(joint_poses)):
-                for j in range(len(joint_poses[i])):
-                    if j_type[j] == "r":
-                        rads_to_deg.append((joint_poses[i][j] / np.pi)*180)
-                    elif j_type[j] == "p":
-                        rads_to_deg.append(joint_poses[i][j])
-            rads_to_deg_split = np.split(np.array(rads_to_deg), len(joint_poses))
-            _joint_poses = rads_to_deg_split
-           
-        else:
-            _joint_poses = joint_poses
-            
-        for a in range(len(_joint_poses)):
-            for b in range(len(_joint_poses[a])):
-                if j_type[b] == "r":
-                    joint_p.append((_joint_poses[a][b] / 180) * np.pi)
-                elif j_type[b] == "p":
-                    joint_p.append(_joint_poses[a][b])
-
-        joint_p_split = np.split(np.array(joint_p), len(_joint_poses))
-
+        joint_p_split = list(self.joint_poses_to_rads(joint_poses, rads))
         jnt_conf = np.array(joint_p_split).T
         time_points, velocities, = self.compute_velocities_js(waypoints=jnt_conf)
         self.velocities = velocities
@@ -681,41 +1039,138 @@ class TrajectoryPlanner:
                 time_points=time_points,
                 velocities=velocities
             )
-            eval_func = self.eval_cubic 
-            t, jq, jqd, jqdd = self.evaluate_full_trajectory(coeffs, time_points=time_points, n_samples=n_samples)
+            t, jq, jqd, jqdd, jqddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                     n_samples=n_samples, jerk=True)
             
             self.t_fine = t
             self.jq = jq
             self.jq_vel = jqd
             self.jq_acc = jqdd
-            self.jq_jerk = None
+            self.jq_jerk = jqddd
+            self.segments = (coeffs, time_points)
             joint_trajectory = np.transpose(jq)
 
         elif tr_type == 'spl':
+            self._check_spline_sampling()
             joint_trajectory = self.q_spline_js(joint_angles=joint_p_split, time_step=n_samples)
+        elif tr_type in ('trap', 'scurve'):
+            coeffs, breakpoints, time_points = self.profile_segments(jnt_conf)
+            t, jq, jqd, jqdd, jqddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                     n_samples=n_samples, jerk=True,
+                                                                     breakpoints=breakpoints)
+
+            self.t_fine = t
+            self.jq = jq
+            self.jq_vel = jqd
+            self.jq_acc = jqdd
+            self.jq_jerk = jqddd
+            self.segments = (coeffs, breakpoints)
+            joint_trajectory = np.transpose(jq)
         else:
             coeffs = self.quintic_trajectory_nd(
                 waypoints=jnt_conf,
                 time_points=time_points,
                 velocities=velocities
             )  
-            eval_func = self.eval_quintic
-            t, jq, jqd, jqdd = self.evaluate_full_trajectory(coeffs, time_points=time_points, n_samples=n_samples)
+            t, jq, jqd, jqdd, jqddd = self.evaluate_full_trajectory(coeffs, time_points=time_points,
+                                                                     n_samples=n_samples, jerk=True)
             
             self.t_fine = t
             self.jq = jq
             self.jq_vel = jqd
             self.jq_acc = jqdd
-            self.jq_jerk = None
+            self.jq_jerk = jqddd
+            self.segments = (coeffs, time_points)
             joint_trajectory = np.transpose(jq)
 
-        self.model.jnt_configs = [joint_trajectory]
-        self.trajectory = [joint_trajectory]
+        trajectory = self.as_trajectory([joint_trajectory])
+        self.model.jnt_configs = trajectory
+        self.trajectory = trajectory
         if self.model.joint_lim_enable:
-            self.model.check_limits([joint_trajectory])
+            self.model.check_limits(trajectory)
 
-        return [joint_trajectory]
+        return trajectory
     
+    def time_optimal(self, path, vmax, amax, n_grid=2000, space='js', xyz_mask=None):
+        """
+        Re-time a geometric path for minimum time under joint velocity (vmax) and
+        acceleration (amax) limits, starting and ending at rest. path is:
+            Trajectory    - resampled on n_grid points evenly spaced in joint-space arc length
+            (N, dof) array of joint samples (rads / m) along the path (space='js')
+            (N, 6 / 7) cartesian poses (space='ts'), converted to joint samples by IK
+        Returns a Trajectory through the same joint positions on the optimal timing;
+        the motion comes to rest at corners of the joint path (see topp.retime).
+        """
+        assert space in ('js', 'ts'), "space must be 'js' or 'ts'"
+        if type(n_grid) is not int or n_grid < 2:
+            raise ValueError("n_grid must be an integer of at least 2")
+        dof = self.model.get_num_of_joints()
+        vmax = np.broadcast_to(np.asarray(vmax, dtype=float), (dof,))
+        amax = np.broadcast_to(np.asarray(amax, dtype=float), (dof,))
+
+        if isinstance(path, Trajectory):
+            # arc length of a dense sampling, then n_grid points evenly spaced along it;
+            # the breakpoints are kept on the grid so corners at waypoints are hit exactly
+            t_dense = np.linspace(path.breakpoints[0], path.breakpoints[-1], 4 * n_grid)
+            q_dense = path.at(t_dense)
+            arc = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(q_dense, axis=0), axis=1))))
+            t_grid = np.union1d(np.interp(np.linspace(0.0, arc[-1], n_grid), arc, t_dense), path.breakpoints)
+            q = path.at(t_grid)
+        else:
+            if type(path) not in [np.ndarray, list]:
+                raise TypeError(f"Expected a Trajectory, joint samples or cartesian poses but got {type(path)}")
+            if space == 'ts':
+                if self.ik.reach_check:
+                    self.check_reachable(path, xyz_mask)
+                path = self.solve_waypoints(path, xyz_mask=xyz_mask)
+            q = np.asarray(path, dtype=float)
+            if q.ndim != 2 or q.shape[1] != dof:
+                raise ValueError(f"Expected joint samples of shape (N, {dof}) but got {q.shape}")
+
+        q, t, velocities = retime(q, vmax, amax)
+        traj = Trajectory([q], cubic_coeffs(q.T, t, velocities.T), t, times=t)
+
+        self.traj_method = 'js'
+        # waypoint velocities belong to the previous plan
+        self.velocities = None
+        self.t_fine = t
+        self.jq = q.T
+        self.jq_vel = velocities.T
+        self.jq_acc = traj.at(t, order=2).T
+        self.jq_jerk = traj.at(t, order=3).T
+        self.segments = (traj.coeffs, t)
+        self.trajectory = traj
+        self.model.jnt_configs = traj
+        return traj
+
+    def save_trajectory(self, path):
+        """
+        Save the last plan to a binary trajectory file (see traj_file): sample times, joint
+        q / qd / qdd / jerk, waypoint velocities, segment coefficients and the model hash.
+        """
+        traj = getattr(self, 'trajectory', None)
+        if not isinstance(traj, Trajectory):
+            raise ValueError("No planned trajectory to save, plan one first")
+        t = traj.times if traj.times is not None else self.t_fine
+        q = np.asarray(traj[0], dtype=float) if len(traj) else traj.at(t)
+        write_trajectory_file(path, {
+            't': t, 'q': q, 'qd': traj.at(t, order=1), 'qdd': traj.at(t, order=2), 'jerk': traj.at(t, order=3),
+            'velocities': self.velocities, 'coeffs': traj.coeffs, 'breakpoints': traj.breakpoints,
+        }, {
+            'robot_name': self.model.get_robot_name(), 'model_hash': self.model.model_hash(),
+            'traj_method': self.traj_method, 'tr_type': getattr(self, 'tr_type', 'qu'),
+        })
+
+    def load_trajectory(self, path, mmap=True):
+        """
+        Open a trajectory file saved for this robot. With mmap the arrays stay on disk and
+        are read as they are used, e.g. streamed with TrajectoryFile.iter_chunks().
+        """
+        traj_file = TrajectoryFile(path, mmap=mmap)
+        if traj_file.model_hash != self.model.model_hash():
+            raise ValueError(f"Trajectory at {path} was planned for a different DH model than {self.model.get_robot_name()}")
+        return traj_file
+
     @staticmethod
     def create_circle_traj(radius, cent, num_p=50):
         if type(radius) not in [int, float]:
@@ -0,0 +1,51 @@
+"""
+Author: Silas Udofia
+Date: 2024-08-02
+GitHub: https://github.com/Silas-U/RoboKpy/tree/main
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at: http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import time
+import numpy as np
+from Robokpy import Init_Model
+from Model import DHModel
+
+
+# Models whose DH twist column is given in radians
+TWIST_IN_RADS = {'Cobra600': True, '6dof': True}
+
+N_TARGETS = 100
+METHODS = ['dls', 'se3']
+TOLERANCES = [1e-3, 1e-6]
+
+
+def benchmark(name, method, tol, targets, robot):
+    solved, iterations = 0, 0
+    start = time.perf_counter()
+    for target in targets:
+        robot.ik.solve(target, tol=tol, method=method)
+        solved += robot.ik.success
+        iterations += robot.ik.iterations
+    elapsed = (time.perf_counter() - start) / len(targets)
+    print(f"{name:12s} {method:>4s} {tol:8.0e} {100 * solved / len(targets):8.1f}% "
+          f"{iterations / len(targets):10.1f} {elapsed * 1e3:10.3f}")
+
+
+rng = np.random.default_rng(0)
+print(f"{'Model':12s} {'IK':>4s} {'tol':>8s} {'success':>9s} {'mean iter':>10s} {'ms/solve':>10s}")
+
+for name in DHModel.list_models():
+    robot = Init_Model(DHModel.get_model(name), robot_name=name, twist_in_rads=TWIST_IN_RADS.get(name, False))
+    robot.ik.verbose = False
+
+    # Random reachable targets: FK of random joint configurations
+    lower, upper = robot.model.get_sampling_bounds()
+    q_samples = rng.uniform(lower, upper, size=(N_TARGETS, len(lower)))
+    targets = robot.fk.pose_batch(q_samples)
+
+    for tol in TOLERANCES:
+        for method in METHODS:
+            benchmark(name, method, tol, targets, robot)
@@ -50,6 +50,18 @@ class TestForwardKinematics(unittest.TestCase):
         self.assertEqual(len(joint_states_rad), 6)
         self.assertEqual(len(joint_states_deg), 6)
 
+    def test_compute_batch_matches_compute(self):
+        q = np.array([[0.1, -0.4, 0.7, 0.2, -0.3, 0.5], [1.0, 0.2, -0.6, 0.0, 0.9, -1.2]])
+        T = self.rb.fk.compute_batch(q, rads=True)
+        self.assertEqual(T.shape, (2, 4, 4))
+        for k in range(2):
+            self.rb.fk.compute(q[k], rads=True)
+            self.assertTrue(np.allclose(T[k], self.rb.fk.get_htm()))
+
+    def test_pose_batch_shape(self):
+        poses = self.rb.fk.pose_batch(np.zeros((3, 6)))
+        self.assertEqual(poses.shape, (3, 7))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -29,6 +29,213 @@ class TestInverseKinematics(unittest.TestCase):
         target = self.rb.fk.get_target()
         result = self.rb.ik.solve(target, tol=1e-12, max_iter=2)
         self.assertEqual(len(result), self.rb.model.num_of_joints)
+        self.assertEqual(self.rb.ik.exit_reason, 'max_iter')
+
+    def test_exit_reason_converged(self):
+        self.rb.fk.compute([10.0, 20.0, -30.0, 5.0, 15.0, 0.0])
+        self.rb.ik.solve(self.rb.fk.get_target())
+        self.assertEqual(self.rb.ik.exit_reason, 'converged')
+        self.assertLess(self.rb.ik.final_error, 1e-3)
+
+    def test_unreachable_target_stalls_early(self):
+        self.rb.ik.reach_check = False
+        target = [5.0, 5.0, 5.0, 0.0, 0.0, 0.0]
+        self.rb.ik.solve(target, max_iter=500)
+        self.assertFalse(self.rb.ik.success)
+        self.assertIn(self.rb.ik.exit_reason, ('stalled', 'small_step'))
+        self.assertLess(self.rb.ik.iterations, 500)
+
+    def test_se3_method_converges(self):
+        self.rb.fk.compute([10.0, 20.0, -30.0, 5.0, 15.0, 0.0])
+        target = self.rb.fk.get_target()
+        result = self.rb.ik.solve(target, tol=1e-8, method='se3')
+        self.assertTrue(self.rb.ik.success)
+        self.rb.fk.compute(result, rads=True)
+        self.assertTrue(np.allclose(self.rb.fk.get_target()[:3], target[:3], atol=1e-6))
+
+    def test_se3_needs_fewer_iterations(self):
+        self.rb.fk.compute([40.0, -30.0, 60.0, 20.0, -45.0, 30.0])
+        target = self.rb.fk.get_target()
+        self.rb.ik.solve(target, tol=1e-6, method='dls')
+        dls_iters = self.rb.ik.iterations
+        self.rb.ik.solve(target, tol=1e-6, method='se3')
+        self.assertTrue(self.rb.ik.success)
+        self.assertLess(self.rb.ik.iterations, dls_iters)
+
+    def test_broyden_method_converges(self):
+        self.rb.fk.compute([10.0, 20.0, -30.0, 5.0, 15.0, 0.0])
+        target = self.rb.fk.get_target()
+        result = self.rb.ik.solve(target, tol=1e-6, method='broyden')
+        self.assertTrue(self.rb.ik.success)
+        self.rb.fk.compute(result, rads=True)
+        self.assertTrue(np.allclose(self.rb.fk.get_target()[:3], target[:3], atol=1e-5))
+
+    def test_broyden_reuses_jacobian_along_sequence(self):
+        self.rb.ik.verbose = False
+        q = np.array([0.2, 0.3, -0.4, 0.1, 0.5, 0.0]) + np.outer(np.linspace(0, 0.05, 10), np.ones(6))
+        poses = self.rb.fk.pose_batch(q)
+        self.rb.ik.solve(poses[0], tol=1e-6, method='broyden', q_seed=q[0])
+        evals = 0
+        for pose in poses[1:]:
+            self.rb.ik.solve(pose, tol=1e-6, method='broyden', q_seed=self.rb.ik.last_solution)
+            self.assertTrue(self.rb.ik.success)
+            evals += self.rb.ik.jacobian_evals
+        self.assertLess(evals, len(poses) - 1)
+
+    def test_broyden_reuse_needs_same_mask_weights(self):
+        # a Jacobian reused across different row weights is scaled wrong for the new solve
+        self.rb.ik.verbose = False
+        self.rb.ik.use_analytic = False
+        q = np.array([0.2, 0.3, -0.4, 0.1, 0.5, 0.0])
+        poses = self.rb.fk.pose_batch(np.array([q, q + 0.01]))
+        weighted = [1, 1, 1, 0.05, 0.05, 0.05]
+        self.rb.ik.solve(poses[1], mask=weighted, tol=1e-6, method='broyden', q_seed=q)
+        fresh = self.rb.ik.jacobian_evals
+        self.rb.ik.solve(poses[0], tol=1e-6, method='broyden', q_seed=q - 0.01)
+        self.rb.ik.solve(poses[1], mask=weighted, tol=1e-6, method='broyden', q_seed=self.rb.ik.last_solution)
+        self.assertTrue(self.rb.ik.success)
+        self.assertLessEqual(self.rb.ik.jacobian_evals, fresh + 1)
+
+    def test_broyden_updates_with_short_stall_window(self):
+        self.rb.ik.verbose = False
+        q = np.array([0.2, 0.3, -0.4, 0.1, 0.5, 0.0])
+        pose = self.rb.fk.pose_batch((q + 0.1)[None])[0]
+        self.rb.ik.solve(pose, tol=1e-6, method='dls', q_seed=q)
+        dls_evals = self.rb.ik.jacobian_evals
+        self.rb.ik.solve(pose, tol=1e-6, method='broyden', q_seed=q, stall_window=1)
+        self.assertTrue(self.rb.ik.success)
+        self.assertLess(self.rb.ik.jacobian_evals, dls_evals)
+
+    def test_invalid_method(self):
+        with self.assertRaises(AssertionError):
+            self.rb.ik.set_method('newton')
+
+    def test_invalid_stall_window(self):
+        with self.assertRaises(ValueError):
+            self.rb.ik.solve([0.5, 0.1, 0.4, 0.0, 0.0, 0.0], stall_window=0)
+
+    def test_unreachable_target_rejected(self):
+        self.rb.ik.solve([5.0, 5.0, 5.0, 0.0, 0.0, 0.0])
+        self.assertFalse(self.rb.ik.success)
+        self.assertEqual(self.rb.ik.exit_reason, 'unreachable')
+        self.assertEqual(self.rb.ik.iterations, 0)
+
+    def test_time_budget(self):
+        self.rb.ik.reach_check = False
+        target = [5.0, 5.0, 5.0, 0.0, 0.0, 0.0]
+        self.rb.ik.solve(target, max_iter=100000, stall_window=100000, time_budget=0.0)
+        self.assertEqual(self.rb.ik.exit_reason, 'deadline')
+        self.assertEqual(self.rb.ik.iterations, 0)
+
+    def test_track_follows_line(self):
+        self.rb.model.set_eular_in_deg(True)
+        N = 50
+        t = np.linspace(0.0, 1.0, N)
+        start = np.array([0.3, -0.1, 0.4])
+        end = np.array([0.3, 0.1, 0.4])
+        pos = start + np.outer(t, end - start)
+        vel = np.tile(end - start, (N, 1))
+        quat = np.tile([1.0, 0.0, 0.0, 0.0], (N, 1))
+        q = self.rb.ik.track(np.hstack((pos, quat)), vel, t)
+        self.assertEqual(q.shape, (N, self.rb.model.num_of_joints))
+        reached = self.rb.fk.pose_batch(q)
+        self.assertLess(np.abs(reached[:, :3] - pos).max(), 1e-3)
+        self.assertLess(self.rb.ik.track_corrections, N)
+
+
+class TestInverseKinematicsLimits(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("2dof")
+        self.rb = Init_Model(robot_model, robot_name="2dof", use_jnt_lim=True)
+        self.mask = [1, 1, 1, 0, 0, 0]
+
+    def test_solution_respects_limits(self):
+        self.rb.model.set_joint_limits({"min": {"j1": -np.pi, "j2": 0.0}, "max": {"j1": np.pi, "j2": np.pi}})
+        self.rb.fk.compute([0.3, -0.8], rads=True)
+        target = self.rb.fk.get_target()
+        self.rb.ik.initial_guess([0.3, -0.5], rads=True)
+        result = self.rb.ik.solve(target, mask=self.mask)
+        self.assertTrue(self.rb.ik.success)
+        self.assertGreaterEqual(result[1], 0.0)
+        self.rb.fk.compute(result, rads=True)
+        self.assertTrue(np.allclose(self.rb.fk.get_tcp()[:2], target[:2], atol=1e-3))
+
+    def test_seed_on_active_bound(self):
+        # the seed is clipped onto j2's lower limit, a stretched arm where the step vanishes
+        self.rb.ik.verbose = False
+        self.rb.ik.use_analytic = False
+        self.rb.model.set_joint_limits({"min": {"j1": -np.pi, "j2": 0.0}, "max": {"j1": np.pi, "j2": np.pi}})
+        self.rb.fk.compute([0.3, -0.8], rads=True)
+        target = self.rb.fk.get_target()
+        self.rb.ik.initial_guess([0.3, -0.5], rads=True)
+        result = self.rb.ik.solve(target, mask=self.mask)
+        self.assertTrue(self.rb.ik.success)
+        self.assertTrue(np.allclose(result, [-0.5, 0.8], atol=1e-2))
+
+    def test_failed_solve_returns_best_iterate(self):
+        self.rb.ik.verbose = False
+        self.rb.ik.reach_check = False
+        result = self.rb.ik.solve([5.0, 5.0, 0.0, 0.0, 0.0, 0.0], mask=self.mask)
+        self.assertFalse(self.rb.ik.success)
+        self.rb.fk.compute(result, rads=True)
+        reached = np.array(self.rb.fk.get_tcp()[:3])
+        self.assertAlmostEqual(np.linalg.norm(reached - [5.0, 5.0, 0.0]), self.rb.ik.final_error, places=6)
+        self.assertFalse(np.allclose(result, 0.0))
+
+    def test_reports_active_joints(self):
+        # j2 is pinned by its limits, j1 alone has to reach the target
+        self.rb.model.set_joint_limits({"min": {"j1": -np.pi, "j2": 0.5}, "max": {"j1": np.pi, "j2": 0.5}})
+        self.rb.fk.compute([0.2, 0.5], rads=True)
+        target = self.rb.fk.get_target()
+        result = self.rb.ik.solve(target, mask=self.mask)
+        self.assertTrue(self.rb.ik.success)
+        self.assertAlmostEqual(result[0], 0.2, places=3)
+        self.assertAlmostEqual(result[1], 0.5)
+        self.assertEqual(self.rb.ik.active_joints, ["j2"])
+
+
+class TestRedundantIK(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("iiwa7")
+        self.rb = Init_Model(robot_model, robot_name="iiwa7")
+        self.rb.ik.verbose = False
+        self.q = np.array([0.3, 0.5, 0.2, -1.0, 0.3, 0.4, 0.1])
+        self.target = self.rb.fk.pose_batch(self.q[None])[0]
+
+    def test_solve_7dof(self):
+        result = self.rb.ik.solve(self.target)
+        self.assertTrue(self.rb.ik.success)
+        self.assertEqual(len(result), 7)
+        pose = self.rb.fk.pose_batch(np.array(result)[None])[0]
+        self.assertTrue(np.allclose(pose[:3], self.target[:3], atol=1e-3))
+
+    def test_joint_weights_shift_motion(self):
+        mask = [1, 1, 1, 0, 0, 0]
+        self.rb.ik.solve(self.target, mask=mask)
+        free = abs(self.rb.ik.last_solution[0])
+        self.rb.ik.set_joint_weights([100, 1, 1, 1, 1, 1, 1])
+        self.rb.ik.solve(self.target, mask=mask)
+        self.assertTrue(self.rb.ik.success)
+        self.assertLess(abs(self.rb.ik.last_solution[0]), 0.5 * free)
+
+    def test_invalid_joint_weights(self):
+        with self.assertRaises(ValueError):
+            self.rb.ik.set_joint_weights([1, 1, 1])
+        with self.assertRaises(ValueError):
+            self.rb.ik.set_joint_weights([1, 1, 1, 0, 1, 1, 1])
+        with self.assertRaises(TypeError):
+            self.rb.ik.set_joint_weights(1.0)
+
+    def test_solve_vectorized(self):
+        lower, upper = self.rb.model.get_sampling_bounds()
+        configs = np.random.default_rng(0).uniform(lower, upper, size=(20, 7))
+        targets = self.rb.fk.pose_batch(configs)
+        q, success = self.rb.ik.solve_vectorized(targets)
+        self.assertEqual(q.shape, (20, 7))
+        self.assertGreaterEqual(success.sum(), 18)
+        poses = self.rb.fk.pose_batch(q[success])
+        self.assertTrue(np.allclose(poses[:, :3], targets[success, :3], atol=1e-3))
+        self.assertEqual(len(self.rb.ik.batch_exit_reasons), 20)
 
 
 if __name__ == "__main__":
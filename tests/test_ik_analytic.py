@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from Robokpy import Init_Model
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestAnalyticIK(unittest.TestCase):
+    def setUp(self):
+        self.planar = Init_Model(DHModel.get_model("2dof"), robot_name="2dof")
+        self.scara = Init_Model(DHModel.get_model("Cobra600"), robot_name="Cobra600", twist_in_rads=True)
+
+    def test_structure_detection(self):
+        self.assertEqual(self.planar.ik.analytic_solver().name, "planar_rr")
+        self.assertEqual(self.scara.ik.analytic_solver().name, "scara")
+        puma = Init_Model(DHModel.get_model("Puma560"), robot_name="Puma560")
+        self.assertIsNone(puma.ik.analytic_solver())
+        with self.assertRaises(ValueError):
+            puma.ik.solve_analytic([[0.3, 0.1, 0.2, 0, 0, 0]])
+
+    def test_planar_both_branches_batch(self):
+        q_true = np.array([[0.3, 0.8], [-1.2, -0.5], [2.0, 1.4]])
+        targets = self.planar.fk.pose_batch(q_true)
+        q, valid = self.planar.ik.solve_analytic(targets)
+        self.assertEqual(q.shape, (3, 2, 2))
+        self.assertTrue(valid.all())
+        for b in range(2):
+            reached = self.planar.fk.pose_batch(q[:, b])
+            self.assertTrue(np.allclose(reached[:, :3], targets[:, :3]))
+        self.assertTrue(np.all(q[:, 0, 1] >= 0) and np.all(q[:, 1, 1] <= 0))
+
+    def test_unreachable_flagged(self):
+        q, valid = self.planar.ik.solve_analytic([[2.0, 0.0, 0.2, 0, 0, 0]])
+        self.assertFalse(valid.any())
+
+    def test_scara_full_pose(self):
+        q_true = np.array([[0.4, -0.9, 0.1, 0.7], [-1.0, 1.5, 0.25, -2.0]])
+        targets = self.scara.fk.pose_batch(q_true)
+        q, valid = self.scara.ik.solve_analytic(targets)
+        self.assertTrue(valid.all())
+        for b in range(2):
+            reached = self.scara.fk.compute_batch(q[:, b])
+            expected = self.scara.fk.compute_batch(q_true)
+            self.assertTrue(np.allclose(reached, expected))
+
+    def test_solve_uses_closed_form(self):
+        self.scara.fk.compute([0.4, -0.9, 0.1, 0.7], rads=True)
+        target = self.scara.fk.get_target()
+        result = self.scara.ik.solve(target)
+        self.assertTrue(self.scara.ik.success)
+        self.assertEqual(self.scara.ik.iterations, 0)
+        self.assertTrue(np.allclose(result, [0.4, -0.9, 0.1, 0.7]))
+
+    def test_branch_closest_to_seed(self):
+        self.planar.fk.compute([0.3, 0.8], rads=True)
+        target = self.planar.fk.get_target()
+        self.planar.ik.initial_guess([1.0, -0.7], rads=True)
+        result = self.planar.ik.solve(target, mask=[1, 1, 1, 0, 0, 0])
+        self.assertLess(result[1], 0)
+
+    def test_disable_closed_form(self):
+        self.planar.ik.use_analytic = False
+        self.planar.fk.compute([0.3, 0.8], rads=True)
+        self.planar.ik.solve(self.planar.fk.get_target(), mask=[1, 1, 1, 0, 0, 0])
+        self.assertGreater(self.planar.ik.iterations, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import contextlib
+import unittest
+import numpy as np
+from Robokpy import Init_Model
+from Robokpy.ik_branch import parse_branch, branch_match
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+ELBOW_UP = [0, 0.7854, 3.1416, 0, 0.7854, 0]
+ELBOW_DOWN = [0, -0.8335, 0.0940, 0, -0.8312, 0]
+
+
+class TestBranchFlags(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("Puma560")
+        self.rb = Init_Model(robot_model, robot_name="Puma560", twist_in_rads=False)
+        self.rb.ik.verbose = False
+
+    def test_elbow_up_down_differ(self):
+        up = self.rb.ik.branch_of(ELBOW_UP)
+        down = self.rb.ik.branch_of(ELBOW_DOWN)
+        self.assertEqual(up.shape, (3,))
+        self.assertEqual(up[1], -down[1])
+
+    def test_batch_shape(self):
+        flags = self.rb.ik.branch_of(np.array([ELBOW_UP, ELBOW_DOWN]))
+        self.assertEqual(flags.shape, (2, 3))
+        self.assertTrue(np.all(np.isin(flags, (-1, 0, 1))))
+
+    def test_flags_not_defined_without_elbow(self):
+        rb = Init_Model(DHModel.get_model("Cylindrical"), robot_name="Cylindrical", twist_in_rads=False)
+        self.assertTrue(np.all(rb.ik.branch_of([0.3, 0.1, 0.2, 0.1]) == 0))
+
+    def test_parse_branch(self):
+        self.assertTrue(np.array_equal(parse_branch({'elbow': -1}), [0, -1, 0]))
+        self.assertTrue(np.array_equal(parse_branch([1, None, -1]), [1, 0, -1]))
+        with self.assertRaises(ValueError):
+            parse_branch({'knee': 1})
+        with self.assertRaises(ValueError):
+            parse_branch([2, 0, 0])
+        with self.assertRaises(TypeError):
+            parse_branch('up')
+
+    def test_branch_match_free_flags(self):
+        flags = np.array([[1, -1, 1], [1, 1, 0]])
+        self.assertTrue(np.array_equal(branch_match(flags, np.array([0, -1, 0])), [True, False]))
+        self.assertTrue(np.array_equal(branch_match(flags, np.array([1, 1, -1])), [False, True]))
+
+    def test_solve_on_requested_branch(self):
+        pose = self.rb.fk.pose_batch(np.array([ELBOW_UP]))[0]
+        for config in (ELBOW_UP, ELBOW_DOWN):
+            want = self.rb.ik.branch_of(config)
+            q = self.rb.ik.solve(pose, tol=1e-6, method='se3', branch=want)
+            self.assertTrue(self.rb.ik.success)
+            self.assertTrue(np.array_equal(self.rb.ik.branch_of(q), want))
+            self.assertTrue(np.allclose(self.rb.fk.pose_batch(np.array([q]))[0, :3], pose[:3], atol=1e-5))
+
+
+class TestBranchTrajectory(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("UR10")
+        self.rb = Init_Model(robot_model, robot_name="UR10", twist_in_rads=False)
+        self.rb.ik.verbose = False
+        self.rb.model.set_eular_in_deg(True)
+        self.waypoints = [[0.20, -0.10, 0.15, 180, 0, -90], [0.20, -0.10, 0.07, 180, 0, -30],
+                          [0.20, 0.10, 0.15, 180, 0, -90]]
+
+    def plan(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            traj = self.rb.traj.create_trajectory(self.waypoints, traj_method='ts', n_samples=50)
+        return np.asarray(traj[0])
+
+    def test_branch_kept_along_trajectory(self):
+        q = self.plan()
+        flags = self.rb.ik.branch_of(q)
+        self.assertTrue(np.all(branch_match(flags, flags[0])))
+        self.assertLess(np.abs(np.diff(q, axis=0)).max(), 0.5)
+
+    def test_fixed_branch(self):
+        self.rb.traj.set_branch({'elbow': -1})
+        q = self.plan()
+        self.assertTrue(np.all(self.rb.ik.branch_of(q)[:, 1] == -1))
+
+    def test_invalid_branch(self):
+        with self.assertRaises(ValueError):
+            self.rb.traj.set_branch({'elbow': 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from Robokpy import Init_Model
+from Robokpy.ik_cache import IKCache
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestIKCache(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("Puma561")
+        self.rb = Init_Model(robot_model, robot_name="Puma561", twist_in_rads=False)
+        self.rb.fk.compute([10.0, 20.0, -30.0, 5.0, 15.0, 0.0])
+        self.target = self.rb.fk.get_target()
+
+    def test_repeated_target_hits(self):
+        self.rb.ik.enable_cache(max_size=8)
+        first = self.rb.ik.solve(self.target)
+        second = self.rb.ik.solve(self.target)
+        stats = self.rb.ik.cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_rate'], 0.5)
+        self.assertTrue(np.allclose(first, second))
+
+    def test_hit_within_tolerance(self):
+        self.rb.ik.enable_cache(pos_tol=1e-3)
+        self.rb.ik.solve(self.target)
+        nudged = np.array(self.target)
+        nudged[0] += 1e-5
+        self.rb.ik.solve(nudged)
+        self.assertEqual(self.rb.ik.cache.hits, 1)
+
+    def test_mask_is_part_of_key(self):
+        self.rb.ik.enable_cache()
+        self.rb.ik.solve(self.target)
+        self.rb.ik.solve(self.target, mask=[1, 1, 1, 0, 0, 0])
+        self.assertEqual(self.rb.ik.cache.hits, 0)
+
+    def test_mask_weights_and_branch_in_key(self):
+        cache = IKCache()
+        key = cache.key([0, 0, 0], [0, 0, 0, 1], [1] * 6, [0] * 6)
+        self.assertNotEqual(key, cache.key([0, 0, 0], [0, 0, 0, 1], [1, 1, 1, 0.5, 0.5, 0.5], [0] * 6))
+        self.assertNotEqual(key, cache.key([0, 0, 0], [0, 0, 0, 1], [1] * 6, [0] * 6, np.array([1, 0, 0])))
+        self.assertEqual(key, cache.key([0, 0, 0], [0, 0, 0, 1], np.ones(6), [0] * 6))
+
+    def test_lru_eviction(self):
+        cache = IKCache(max_size=2)
+        keys = [cache.key([i, 0, 0], [0, 0, 0, 1], [1] * 6, [0] * 6) for i in range(3)]
+        for k in keys:
+            cache.put(k, np.zeros(6))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_quaternion_sign_ignored(self):
+        cache = IKCache()
+        k1 = cache.key([0, 0, 0], [0, 0, 0.6, 0.8], [1] * 6, [0] * 6)
+        k2 = cache.key([0, 0, 0], [0, 0, -0.6, -0.8], [1] * 6, [0] * 6)
+        self.assertEqual(k1, k2)
+
+    def test_stats_without_cache(self):
+        with self.assertRaises(ValueError):
+            self.rb.ik.cache_stats()
+
+
+if __name__ == "__main__":
+    unittest.main()
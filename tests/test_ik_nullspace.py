@@ -0,0 +1,101 @@
+import unittest
+import numpy as np
+from Robokpy import Init_Model
+from Robokpy.ik_nullspace import (jacobians_batch, jacobian_derivatives, manipulability,
+                                  manipulability_gradient, joint_limit_gradient, rest_pose_gradient)
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestNullSpaceHelpers(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("UR10")
+        self.rb = Init_Model(robot_model, robot_name="UR10", twist_in_rads=False)
+        self.revolute = self.rb.fk._dh_columns()[5]
+        self.q = np.random.default_rng(0).uniform(-2, 2, size=(3, 6))
+
+    def jac(self, q):
+        return jacobians_batch(self.rb.fk.frames_batch(q), self.revolute)
+
+    def test_jacobian_matches_workspace(self):
+        ws = self.rb.ik.get_workspace()
+        ws.update(self.q[0])
+        ws.jacobian()
+        self.assertTrue(np.allclose(self.jac(self.q[:1])[0], ws.J))
+
+    def test_jacobian_derivatives_finite_difference(self):
+        H = jacobian_derivatives(self.rb.fk.frames_batch(self.q), self.revolute)
+        self.assertEqual(H.shape, (3, 6, 6, 6))
+        h = 1e-6
+        for j in range(6):
+            dq = np.zeros(6)
+            dq[j] = h
+            numeric = (self.jac(self.q + dq) - self.jac(self.q - dq)) / (2 * h)
+            self.assertTrue(np.allclose(H[:, j], numeric, atol=1e-7))
+
+    def test_manipulability_gradient_finite_difference(self):
+        rows = [0, 1, 2]
+        frames = self.rb.fk.frames_batch(self.q)
+        grad = manipulability_gradient(self.jac(self.q), jacobian_derivatives(frames, self.revolute), rows)
+        h = 1e-6
+        for j in range(6):
+            dq = np.zeros(6)
+            dq[j] = h
+            numeric = (manipulability(self.jac(self.q + dq), rows) - manipulability(self.jac(self.q - dq), rows)) / (2 * h)
+            self.assertTrue(np.allclose(grad[:, j], numeric, atol=1e-7))
+
+    def test_joint_limit_and_rest_gradients(self):
+        g = joint_limit_gradient(np.array([0.9, -0.9, 0.0]), -np.ones(3), np.ones(3))
+        self.assertLess(g[0], 0.0)
+        self.assertGreater(g[1], 0.0)
+        self.assertEqual(g[2], 0.0)
+        self.assertTrue(np.allclose(rest_pose_gradient(np.ones(3), np.zeros(3)), -np.ones(3)))
+
+
+class TestNullSpaceObjectives(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("UR10")
+        self.rb = Init_Model(robot_model, robot_name="UR10", twist_in_rads=False)
+        self.rb.ik.verbose = False
+        self.mask = [1, 1, 1, 0, 0, 0]
+        self.targets = self.rb.fk.pose_batch(np.random.default_rng(4).uniform(-1.8, 1.8, size=(8, 6)))
+
+    def solve_all(self):
+        sols = []
+        for target in self.targets:
+            sols.append(self.rb.ik.solve(target, mask=self.mask, tol=1e-4))
+            self.assertTrue(self.rb.ik.success)
+        sols = np.array(sols)
+        self.assertLess(np.abs(self.rb.fk.pose_batch(sols)[:, :3] - self.targets[:, :3]).max(), 1e-4)
+        return sols
+
+    def test_manipulability_objective(self):
+        base = self.rb.ik.manipulability(self.solve_all(), mask=self.mask).mean()
+        self.rb.ik.add_objective('manipulability')
+        improved = self.rb.ik.manipulability(self.solve_all(), mask=self.mask).mean()
+        self.assertGreater(improved, base)
+
+    def test_rest_pose_objective(self):
+        rest = np.zeros(6)
+        base = np.linalg.norm(self.solve_all() - rest, axis=1).mean()
+        self.rb.ik.add_objective('rest_pose', rest_pose=rest)
+        improved = np.linalg.norm(self.solve_all() - rest, axis=1).mean()
+        self.assertLess(improved, base)
+
+    def test_full_mask_ignores_objectives(self):
+        base = [self.rb.ik.solve(target) for target in self.targets]
+        self.rb.ik.add_objective('joint_limits')
+        self.assertTrue(np.allclose([self.rb.ik.solve(target) for target in self.targets], base))
+
+    def test_invalid_objectives(self):
+        with self.assertRaises(AssertionError):
+            self.rb.ik.add_objective('comfort')
+        with self.assertRaises(ValueError):
+            self.rb.ik.add_objective('rest_pose')
+        with self.assertRaises(ValueError):
+            self.rb.ik.add_objective('joint_limits', weight=-1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
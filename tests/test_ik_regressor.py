@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from Robokpy import Init_Model, SeedRegressor
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestSeedRegressor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        robot_model = DHModel.get_model("UR10")
+        cls.rb = Init_Model(robot_model, robot_name="UR10", twist_in_rads=False)
+        cls.reg = SeedRegressor.build(cls.rb.model, cls.rb.fk, n_samples=8000, n_features=600, seed=0)
+        lower, upper = cls.rb.model.get_sampling_bounds()
+        cls.configs = np.random.default_rng(1).uniform(lower, upper, size=(30, 6))
+        cls.targets = cls.rb.fk.pose_batch(cls.configs, rads=True)
+
+    def tearDown(self):
+        self.rb.ik.set_seeder(None)
+
+    def test_build_shapes(self):
+        self.assertGreater(len(self.reg), 1)
+        self.assertEqual(self.reg.branches.shape, (len(self.reg), 3))
+        cands = self.reg.predict(self.targets[:4, :3], np.tile(np.eye(3), (4, 1, 1)))
+        self.assertEqual(cands.shape, (4, len(self.reg), 6))
+
+    def test_seed_closer_than_zero(self):
+        def err(q, target):
+            return np.linalg.norm(self.rb.fk.pose_batch(q[None], rads=True)[0, :3] - target[:3])
+        seeded = [err(self.reg.query(t[:3], t[3:]), t) for t in self.targets]
+        zero = [err(np.zeros(6), t) for t in self.targets]
+        self.assertLess(np.median(seeded), 0.5 * np.median(zero))
+
+    def test_solve_uses_fewer_iterations(self):
+        def iterations():
+            its = []
+            for t in self.targets:
+                self.rb.ik.solve(t)
+                its.append(self.rb.ik.iterations if self.rb.ik.success else 500)
+            return np.median(its)
+        cold = iterations()
+        self.rb.ik.set_seeder(self.reg)
+        self.assertLess(iterations(), cold)
+
+    def test_save_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ur10_regressor.npz")
+            self.reg.save(path)
+            loaded = SeedRegressor.load(path, model=self.rb.model)
+            self.assertEqual(loaded.robot_name, "UR10")
+            self.rb.ik.set_seeder(loaded)
+            t = self.targets[0]
+            self.assertTrue(np.allclose(loaded.query(t[:3], t[3:]), self.reg.query(t[:3], t[3:])))
+
+            other = Init_Model(DHModel.get_model("Puma560"), robot_name="Puma560")
+            with self.assertRaises(ValueError):
+                SeedRegressor.load(path, model=other.model)
+
+    def test_query_needs_fk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ur10_regressor.npz")
+            self.reg.save(path)
+            loaded = SeedRegressor.load(path)
+        with self.assertRaises(ValueError):
+            loaded.query(self.targets[0, :3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from Robokpy import Init_Model, SeedIndex
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestSeedIndex(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("UR10")
+        self.rb = Init_Model(robot_model, robot_name="UR10", twist_in_rads=False)
+        self.index = SeedIndex.build(self.rb.model, self.rb.fk, n_samples=500, seed=0)
+
+    def test_build_shapes(self):
+        self.assertEqual(len(self.index), 500)
+        self.assertEqual(self.index.configs.shape, (500, 6))
+        self.assertEqual(self.index.quats.shape, (500, 4))
+
+    def test_query_returns_stored_config(self):
+        pose = self.rb.fk.pose_batch(self.index.configs[42:43])[0]
+        q = self.index.query(pose[:3], pose[3:])
+        self.assertTrue(np.allclose(q, self.index.configs[42]))
+
+    def test_query_position_mask(self):
+        pose = self.rb.fk.pose_batch(self.index.configs[7:8])[0]
+        q = self.index.query(pose[:3], mask=[1, 1, 0, 0, 0, 0])
+        self.assertEqual(len(q), 6)
+
+    def test_save_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ur10_seeds.npz")
+            self.index.save(path)
+            loaded = SeedIndex.load(path, model=self.rb.model)
+            self.assertTrue(np.allclose(loaded.configs, self.index.configs))
+            self.assertEqual(loaded.robot_name, "UR10")
+
+            other = Init_Model(DHModel.get_model("Puma560"), robot_name="Puma560")
+            with self.assertRaises(ValueError):
+                SeedIndex.load(path, model=other.model)
+
+    def test_solve_uses_seeder(self):
+        self.rb.ik.set_seeder(self.index)
+        target = self.rb.fk.pose_batch(self.index.configs[3:4])[0]
+        result = self.rb.ik.solve(target)
+        self.assertTrue(self.rb.ik.success)
+        self.assertEqual(len(result), 6)
+
+    def test_invalid_seeder(self):
+        with self.assertRaises(TypeError):
+            self.rb.ik.set_seeder(object())
+
+
+if __name__ == "__main__":
+    unittest.main()
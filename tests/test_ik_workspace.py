@@ -0,0 +1,79 @@
+import io
+import sys
+import unittest
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+from Robokpy import Init_Model
+from Robokpy.ik_workspace import IKWorkspace
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestIKWorkspace(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("Cobra600")
+        self.rb = Init_Model(robot_model, robot_name="Cobra600", twist_in_rads=True)
+        self.ws = IKWorkspace(self.rb.model, self.rb.fk)
+        self.q = np.array([0.3, -0.7, 0.12, 1.1])
+
+    def test_update_matches_fk(self):
+        self.ws.update(self.q)
+        self.rb.fk.compute(self.q, rads=True)
+        self.assertTrue(np.allclose(self.ws.frames[-1], self.rb.fk.get_htm()))
+
+    def test_jacobian_matches(self):
+        self.ws.update(self.q)
+        J = self.ws.jacobian()
+        self.rb.fk.compute(self.q, rads=True)
+        self.assertTrue(np.allclose(J, self.rb.jac.compute()))
+
+    def test_error_matches_rotvec(self):
+        self.ws.update(self.q)
+        T = self.ws.frames[-1]
+        q_des = R.from_rotvec([0.2, -0.1, 0.4]).as_quat()
+        p_des = T[:3, 3] + [0.01, 0.0, -0.02]
+        self.ws.set_target(p_des, q_des, np.ones(6))
+        norm = self.ws.error()
+        expected_rot = (R.from_quat(q_des) * R.from_matrix(T[:3, :3]).inv()).as_rotvec()
+        self.assertTrue(np.allclose(self.ws.err[:3], [0.01, 0.0, -0.02]))
+        self.assertTrue(np.allclose(self.ws.err[3:], expected_rot))
+        self.assertAlmostEqual(norm, np.linalg.norm(self.ws.err))
+
+    def test_nxn_step_matches_6x6(self):
+        self.ws.set_joint_weights([1.0, 2.0, 3.0, 4.0])
+        self.ws.set_target(np.array([0.3, 0.2, 0.3]), np.array([0.0, 0.0, 0.0, 1.0]), np.ones(6))
+        self.ws.update(self.q)
+        self.ws.error()
+        self.ws.jacobian()
+        self.assertTrue(self.ws.nxn)
+        step, null = self.ws.dls_step(1e-2).copy(), self.ws.null_step(np.ones(4), 1e-9).copy()
+        self.ws.nxn = False
+        self.assertTrue(np.allclose(self.ws.dls_step(1e-2), step))
+        self.assertTrue(np.allclose(self.ws.null_step(np.ones(4), 1e-9), null))
+
+    def test_workspace_reused_across_calls(self):
+        self.rb.ik.verbose = False
+        self.rb.fk.compute(self.q, rads=True)
+        target = self.rb.fk.get_target()
+        self.rb.ik.solve(target, mask=[1, 1, 1, 0, 0, 0])
+        ws = self.rb.ik.workspace
+        self.rb.ik.solve(target, mask=[1, 1, 1, 0, 0, 0])
+        self.assertIs(self.rb.ik.workspace, ws)
+
+    def test_quiet_solve(self):
+        self.rb.ik.verbose = False
+        self.rb.fk.compute(self.q, rads=True)
+        target = self.rb.fk.get_target()
+        captured = io.StringIO()
+        sys.stdout = captured
+        try:
+            self.rb.ik.solve(target, mask=[1, 1, 1, 0, 0, 0])
+        finally:
+            sys.stdout = sys.__stdout__
+        self.assertTrue(self.rb.ik.success)
+        self.assertEqual(captured.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
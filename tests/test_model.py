@@ -56,6 +56,27 @@ class TestRobotModel(unittest.TestCase):
         self.assertTrue(np.allclose(jl[0], expected_limits[0]))
         self.assertTrue(np.allclose(jl[1], expected_limits[1]))
 
+    def test_sampling_bounds(self):
+        lower, upper = self.robot.get_sampling_bounds()
+        self.assertAlmostEqual(lower[0], -np.pi)
+        self.assertAlmostEqual(upper[0], np.pi)
+        self.assertEqual(lower[1], 0.0)
+        self.assertGreater(upper[1], 0.0)
+
+        limits = {"min": {"j1": 0, "j2": 0}, "max": {"j1": 1.0, "j2": 0.5}}
+        self.robot.set_joint_limits(limits)
+        self.robot.joint_lim_enable = False
+        self.assertAlmostEqual(self.robot.get_sampling_bounds()[1][0], np.pi)
+        self.robot.joint_lim_enable = True
+        self.assertAlmostEqual(self.robot.get_sampling_bounds()[1][0], 1.0)
+
+    def test_model_hash(self):
+        same = RobotModel(self.dh_args, robot_name="Other")
+        self.assertEqual(self.robot.model_hash(), same.model_hash())
+        changed = [dict(x) for x in self.dh_args]
+        changed[0]["link_length"] = 0.6
+        self.assertNotEqual(self.robot.model_hash(), RobotModel(changed, robot_name="TestBot").model_hash())
+
     def test_set_joint_limits_mismatch(self):
         with self.assertRaises(ValueError):
             self.robot.set_joint_limits([(0, np.pi)])  # wrong length
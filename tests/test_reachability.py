@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from Robokpy import Init_Model, ReachabilityMap
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestReachabilityMap(unittest.TestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("Puma561")
+        self.rb = Init_Model(robot_model, robot_name="Puma561", twist_in_rads=False)
+        self.rmap = ReachabilityMap(self.rb.model)
+        lower, upper = self.rb.model.get_sampling_bounds()
+        configs = np.random.default_rng(3).uniform(lower, upper, size=(2000, 6))
+        self.points = self.rb.fk.pose_batch(configs)[:, :3]
+
+    def test_sphere_keeps_reachable_points(self):
+        self.assertTrue(self.rmap.reachable(self.points).all())
+
+    def test_sphere_rejects_far_points(self):
+        far = np.array([[self.rmap.radius * 1.01, 0.0, 0.0], [0.0, 0.0, 10.0]])
+        self.assertEqual(self.rmap.unreachable_indices(far), [0, 1])
+
+    def test_mask_ignores_free_axes(self):
+        point = [0.1, 0.1, 10.0]
+        self.assertFalse(self.rmap.reachable(point)[0])
+        self.assertTrue(self.rmap.reachable(point, mask=[1, 1, 0, 0, 0, 0])[0])
+
+    def test_unlimited_prismatic_not_rejected(self):
+        rb = Init_Model(DHModel.get_model("Cylindrical"), robot_name="Cylindrical", twist_in_rads=False)
+        rb.ik.verbose = False
+        target = rb.fk.pose_batch(np.array([[0.3, 2.5, 2.5, 0.3]]))[0]
+        self.assertTrue(np.isinf(rb.ik.get_reachability().radius))
+        rb.ik.solve(target, mask=[1, 1, 1, 0, 0, 0])
+        self.assertTrue(rb.ik.success)
+        with self.assertRaises(ValueError):
+            ReachabilityMap(rb.model).build_voxels(rb.fk, n_samples=100)
+
+    def test_voxels_tighten_sphere(self):
+        self.rmap.build_voxels(self.rb.fk, n_samples=50000, dilate=2, seed=0)
+        self.assertTrue(self.rmap.reachable(self.points).all())
+        inside = np.random.default_rng(1).uniform(-1, 1, size=(5000, 3)) * self.rmap.radius
+        inside = inside[np.linalg.norm(inside, axis=1) < self.rmap.radius]
+        self.assertGreater((~self.rmap.reachable(inside)).sum(), 0)
+
+    def test_save_load_roundtrip(self):
+        self.rmap.build_voxels(self.rb.fk, n_samples=5000, seed=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "puma_reach.npz")
+            self.rmap.save(path)
+            loaded = ReachabilityMap.load(path, self.rb.model)
+        self.assertTrue(np.array_equal(loaded.voxels, self.rmap.voxels))
+        self.assertTrue(np.array_equal(loaded.reachable(self.points), self.rmap.reachable(self.points)))
+
+    def test_load_rejects_other_model(self):
+        self.rmap.build_voxels(self.rb.fk, n_samples=1000, seed=0)
+        other = Init_Model(DHModel.get_model("UR10"), robot_name="UR10", twist_in_rads=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "puma_reach.npz")
+            self.rmap.save(path)
+            with self.assertRaises(ValueError):
+                ReachabilityMap.load(path, other.model)
+
+    def test_save_without_voxels(self):
+        with self.assertRaises(ValueError):
+            self.rmap.save("unused.npz")
+
+
+if __name__ == "__main__":
+    unittest.main()
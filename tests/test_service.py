@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+import numpy as np
+from Robokpy import Init_Model, AsyncRobot
+from Robokpy.service import Histogram
+from Robokpy.ik_branch import branch_match
+from Model import DHModel
+import matplotlib
+matplotlib.use("Agg")
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        h = Histogram([1, 2, 4, 8])
+        for v in [0.5, 1.5, 1.5, 3.0, 20.0]:
+            h.record(v)
+        d = h.as_dict()
+        self.assertEqual(d['count'], 5)
+        self.assertEqual(d['counts'], [1, 2, 1, 0, 1])
+        self.assertEqual(h.quantile(0.5), 2.0)
+        self.assertEqual(h.quantile(1.0), 20.0)
+
+
+class TestAsyncRobot(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        robot_model = DHModel.get_model("UR10")
+        self.rb = Init_Model(robot_model, robot_name="UR10", twist_in_rads=False)
+        self.rb.ik.verbose = False
+        self.q = np.random.default_rng(0).uniform(-1.5, 1.5, size=(20, 6))
+
+    async def test_fk_requests_coalesce(self):
+        async with AsyncRobot(self.rb, window=0.01) as robot:
+            poses = await asyncio.gather(*(robot.fk(q) for q in self.q))
+            metrics = robot.metrics()['fk']
+        self.assertTrue(np.allclose(poses, self.rb.fk.pose_batch(self.q)))
+        self.assertEqual(metrics['batch_size']['count'], 1)
+        self.assertEqual(metrics['batch_size']['max'], 20)
+        self.assertEqual(metrics['latency']['count'], 20)
+
+    async def test_max_batch_splits(self):
+        async with AsyncRobot(self.rb, window=0.01, max_batch=8) as robot:
+            await asyncio.gather(*(robot.fk(q) for q in self.q))
+            self.assertEqual(robot.metrics()['fk']['batch_size']['count'], 3)
+
+    async def test_fk_degrees(self):
+        async with AsyncRobot(self.rb) as robot:
+            pose = await robot.fk(np.rad2deg(self.q[0]), rads=False)
+        self.assertTrue(np.allclose(pose, self.rb.fk.pose_batch(self.q[:1])[0]))
+
+    async def test_ik_roundtrip(self):
+        targets = self.rb.fk.pose_batch(np.array([[0.1, -0.5, 0.8, 0.2, 0.3, 0.1], [0.2, -0.4, 0.6, 0.1, 0.2, 0.0]]))
+        async with AsyncRobot(self.rb) as robot:
+            sols = await asyncio.gather(*(robot.ik(t, tol=1e-6) for t in targets))
+        reached = self.rb.fk.pose_batch(np.array(sols))
+        self.assertTrue(np.allclose(reached[:, :3], targets[:, :3], atol=1e-5))
+
+    async def test_ik_groups_solve_options(self):
+        targets = self.rb.fk.pose_batch(self.q[:6])
+        branches = [self.rb.ik.branch_of(q) for q in self.q[:6]]
+        async with AsyncRobot(self.rb) as robot:
+            sols = await asyncio.gather(*(robot.ik(t, tol=1e-6, branch=b) for t, b in zip(targets, branches)),
+                                        return_exceptions=True)
+        for sol, t, b in zip(sols, targets, branches):
+            self.assertNotIsInstance(sol, Exception)
+            direct = self.rb.ik.solve(t, tol=1e-6, branch=b)
+            self.assertTrue(self.rb.ik.success)
+            self.assertTrue(np.allclose(sol, direct, atol=1e-4))
+            self.assertTrue(branch_match(self.rb.ik.branch_of(sol), b)[0])
+
+    async def test_ik_plain_requests_vectorized(self):
+        targets = self.rb.fk.pose_batch(0.3 * self.q[:8])
+        calls = []
+        solve_vectorized = self.rb.ik.solve_vectorized
+        self.rb.ik.solve_vectorized = lambda *a, **kw: calls.append(len(a[0])) or solve_vectorized(*a, **kw)
+        async with AsyncRobot(self.rb, window=0.01) as robot:
+            sols = await asyncio.gather(*(robot.ik(t, tol=1e-3) for t in targets))
+        self.assertEqual(calls, [8])
+        reached = self.rb.fk.pose_batch(np.array(sols))
+        self.assertTrue(np.allclose(reached[:, :3], targets[:, :3], atol=1e-3))
+
+    async def test_ik_failure_raises(self):
+        async with AsyncRobot(self.rb) as robot:
+            with self.assertRaises(ValueError):
+                await robot.ik([5.0, 5.0, 5.0, 0.0, 0.0, 0.0])
+
+    async def test_fk_bad_shape(self):
+        async with AsyncRobot(self.rb) as robot:
+            with self.assertRaises(ValueError):
+                await robot.fk([0.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 from Robokpy.trajectory import TrajectoryPlanner
@@ -5,6 +7,7 @@ from Robokpy.model import RobotModel
 from Robokpy.fk import ForwardKinematics
 from Robokpy.ik import InverseKinematics
 from Robokpy.jacobian import Jacobian
+from Robokpy.traj_poly import Trajectory
 
 
 class TestTrajectoryPlanner(unittest.TestCase):
@@ -36,6 +39,225 @@ class TestTrajectoryPlanner(unittest.TestCase):
         q, qd, qdd = self.tp.eval_quintic(coeff, t=0.5)
         self.assertTrue(isinstance(q, float))
 
+    def test_eval_segment_in_absolute_time(self):
+        waypoints = np.array([[0.0, 1.0, 0.5]])
+        time_points = np.array([2.0, 3.0, 5.0])
+        for nd, ev in ((self.tp.cubic_trajectory_nd, self.tp.eval_cubic),
+                       (self.tp.quintic_trajectory_nd, self.tp.eval_quintic)):
+            coeffs = nd(waypoints, time_points)
+            q0, _, _ = ev(coeffs[0, 1], 3.0, t0=time_points[1])
+            q1, _, _ = ev(coeffs[0, 1], 5.0, t0=time_points[1])
+            self.assertAlmostEqual(q0, 1.0)
+            self.assertAlmostEqual(q1, 0.5)
+
+    def test_batched_coefficients_match_segments(self):
+        rng = np.random.default_rng(0)
+        waypoints = rng.normal(size=(3, 8))
+        velocities = rng.normal(size=(3, 8))
+        time_points = np.cumsum(rng.uniform(0.1, 1.0, 8))
+        for nd, segment, order in ((self.tp.cubic_trajectory_nd, self.tp.cubic_segment, 4),
+                                   (self.tp.quintic_trajectory_nd, self.tp.quintic_segment, 6)):
+            coeffs = nd(waypoints, time_points, velocities)
+            self.assertEqual(coeffs.shape, (3, 7, order))
+            for d in range(3):
+                for i in range(7):
+                    T = time_points[i + 1] - time_points[i]
+                    expected = segment(waypoints[d, i], waypoints[d, i + 1], velocities[d, i],
+                                       velocities[d, i + 1], t0=0, t1=T)
+                    self.assertTrue(np.allclose(coeffs[d, i], expected))
+
+    def test_zero_length_segment_holds(self):
+        coeffs = self.tp.quintic_trajectory_nd([[0.0, 1.0, 1.0, 2.0]], [0.0, 1.0, 1.0, 2.0])
+        self.assertTrue(np.all(np.isfinite(coeffs)))
+        self.assertTrue(np.allclose(coeffs[0, 1], [1.0, 0, 0, 0, 0, 0]))
+
+    def test_evaluate_matches_polynomial_derivatives(self):
+        rng = np.random.default_rng(1)
+        time_points = np.array([0.0, 0.5, 1.5, 2.0])
+        coeffs = self.tp.quintic_trajectory_nd(rng.normal(size=(2, 4)), time_points, rng.normal(size=(2, 4)))
+        t, q, qd, qdd, qddd = self.tp.evaluate_full_trajectory(coeffs, time_points, n_samples=7, jerk=True)
+        self.assertEqual(len(t), 3 * 7 - 2)
+        self.assertEqual(qddd.shape, q.shape)
+        for k, tk in enumerate(t):
+            i = min(max(np.searchsorted(time_points, tk, side='left') - 1, 0), 2)
+            for d in range(2):
+                p = np.polynomial.Polynomial(coeffs[d, i])
+                tau = tk - time_points[i]
+                self.assertAlmostEqual(q[d, k], p(tau))
+                self.assertAlmostEqual(qd[d, k], p.deriv(1)(tau))
+                self.assertAlmostEqual(qdd[d, k], p.deriv(2)(tau))
+                self.assertAlmostEqual(qddd[d, k], p.deriv(3)(tau))
+
+    def test_stream_joint_control(self):
+        poses = [[0, 0], [30, 20], [60, -20]]
+        self.tp.traj_type('qu')
+        self.tp.joint_control(poses, n_samples=20)
+        chunks = list(self.tp.stream_joint_control(poses, period=0.01, chunk_size=64))
+        self.assertTrue(all(len(t) <= 64 for t, q, qd, qdd in chunks))
+        t = np.concatenate([c[0] for c in chunks])
+        q = np.concatenate([c[1] for c in chunks], axis=1)
+        self.assertEqual(q.shape, (2, len(t)))
+        self.assertTrue(np.allclose(np.diff(t[:-1]), 0.01))
+        self.assertAlmostEqual(t[-1], self.tp.t_fine[-1])
+        self.assertTrue(np.allclose(q[:, [0, -1]], self.tp.jq[:, [0, -1]]))
+
+    def test_stream_needs_polynomial_type(self):
+        self.tp.traj_type('spl')
+        with self.assertRaises(ValueError):
+            next(self.tp.stream_joint_control([[0, 0], [30, 20]]))
+
+    def test_joint_control_returns_trajectory(self):
+        self.tp.traj_type('qu')
+        traj = self.tp.joint_control([[0, 0], [30, 20], [60, -20]], n_samples=20)
+        self.assertIsInstance(traj, Trajectory)
+        self.assertEqual(traj[0].shape, (39, 2))
+        self.assertAlmostEqual(traj.duration, self.tp.t_fine[-1])
+        self.assertTrue(np.allclose(traj.at(self.tp.t_fine), traj[0]))
+        self.assertTrue(np.allclose(traj.at(self.tp.t_fine, order=1), self.tp.jq_vel.T))
+        self.assertTrue(np.allclose(traj.at(self.tp.t_fine, order=3), self.tp.jq_jerk.T))
+        self.assertEqual(traj.at(1.0).shape, (2,))
+        self.assertTrue(np.allclose(traj.at(-1.0), traj[0][0]))
+
+    def test_trajectory_slice(self):
+        self.tp.traj_type('cu')
+        traj = self.tp.joint_control([[0, 0], [30, 20], [60, -20]], n_samples=20)
+        part = traj.slice(0.7, 3.9)
+        self.assertAlmostEqual(part.duration, 3.2)
+        t = np.linspace(0.7, 3.9, 11)
+        self.assertTrue(np.allclose(part.at(t), traj.at(t)))
+        self.assertTrue(np.allclose(part.at(t, order=2), traj.at(t, order=2)))
+        with self.assertRaises(ValueError):
+            traj.slice(3.0, 1.0)
+
+    def test_time_optimal_respects_limits(self):
+        self.tp.traj_type('qu')
+        plan = self.tp.joint_control([[0, 0], [60, 30], [90, -30]], n_samples=20)
+        vmax, amax = np.array([1.0, 1.5]), np.array([2.0, 3.0])
+        self.assertIsNotNone(self.tp.get_waypoint_velocities())
+        traj = self.tp.time_optimal(plan, vmax, amax, n_grid=1000)
+        self.assertIsInstance(traj, Trajectory)
+        self.assertIsNone(self.tp.get_waypoint_velocities())
+        self.assertLess(traj.duration, plan.duration)
+        self.assertTrue(np.allclose(traj.at(traj.breakpoints[[0, -1]]), plan.at(plan.breakpoints[[0, -1]])))
+        self.assertTrue(np.allclose(traj.at(traj.breakpoints[[0, -1]], order=1), 0.0))
+        t = np.linspace(0.0, traj.duration, 5000)
+        self.assertLessEqual(np.max(np.abs(traj.at(t, order=1)) / vmax), 1.01)
+        qd = self.tp.jq_vel.T
+        acc = np.diff(qd, axis=0) / np.diff(self.tp.t_fine)[:, None]
+        self.assertLessEqual(np.max(np.abs(acc) / amax), 1.05)
+
+    def test_time_optimal_joint_samples(self):
+        q = np.column_stack((np.linspace(0, 1, 200), np.sin(np.linspace(0, 2, 200))))
+        traj = self.tp.time_optimal(q, 1.0, 2.0)
+        self.assertTrue(np.allclose(traj.at(traj.duration), q[-1]))
+        with self.assertRaises(ValueError):
+            self.tp.time_optimal(q, 1.0, 0.0)
+        with self.assertRaises(ValueError):
+            self.tp.time_optimal(q[:, :1], 1.0, 2.0)
+
+    def test_profile_types_respect_limits(self):
+        poses = [[0, 0], [90, 20], [90, 20], [-30, 25]]
+        vmax, amax, jmax = np.array([1.0, 2.0]), np.array([2.0, 1.0]), 10.0
+        self.tp.set_profile_limits(vmax, amax, jmax)
+        q = np.radians(poses)
+        for tr_type, jerk_limited in (('trap', False), ('scurve', True)):
+            self.tp.traj_type(tr_type)
+            traj = self.tp.joint_control(poses, n_samples=30)
+            _, _, time_points = self.tp.profile_segments(q.T)
+            self.assertTrue(np.allclose(traj.at(time_points), q))
+            self.assertTrue(np.allclose(traj.at(time_points, order=1), 0.0))
+            t = np.linspace(0.0, traj.duration, 20001)
+            self.assertLessEqual(np.max(np.abs(traj.at(t, order=1)) / vmax), 1 + 1e-9)
+            self.assertLessEqual(np.max(np.abs(traj.at(t, order=2)) / amax), 1 + 1e-9)
+            if jerk_limited:
+                self.assertLessEqual(np.max(np.abs(traj.at(t, order=3)) / jmax), 1 + 1e-9)
+            # joints move together on a straight line between waypoints
+            s = (traj.at(t[t <= time_points[1]]) - q[0]) / (q[1] - q[0])
+            self.assertTrue(np.allclose(s[:, 0], s[:, 1]))
+
+    def test_profile_needs_limits(self):
+        self.tp.traj_type('scurve')
+        with self.assertRaises(ValueError):
+            self.tp.joint_control([[0, 0], [30, 20]])
+        self.tp.set_profile_limits(1.0, 2.0)
+        with self.assertRaises(ValueError):
+            self.tp.joint_control([[0, 0], [30, 20]])
+        with self.assertRaises(ValueError):
+            self.tp.set_profile_limits([1.0, 2.0, 3.0], 2.0)
+        self.tp.traj_type('trap')
+        chunks = list(self.tp.stream_joint_control([[0, 0], [30, 20]], period=0.01))
+        self.assertTrue(np.allclose(chunks[-1][1][:, -1], np.radians([30, 20])))
+
+    def test_adaptive_sampling_within_tolerance(self):
+        poses = [[0, 0], [10, -5], [90, 60], [95, 60]]
+        self.tp.traj_type('qu')
+        fixed = self.tp.joint_control(poses, n_samples=40)
+        self.tp.set_adaptive_sampling(1e-3)
+        traj = self.tp.joint_control(poses)
+        t = self.tp.t_fine
+        self.assertLess(len(t), len(fixed[0]))
+        self.assertTrue(np.all(np.isin(traj.breakpoints, t)))
+        t_dense = np.linspace(0.0, traj.duration, 20001)
+        line = np.column_stack([np.interp(t_dense, t, q) for q in traj.at(t).T])
+        self.assertLessEqual(np.abs(line - traj.at(t_dense)).max(), 1e-3)
+
+        self.tp.set_adaptive_sampling(1e-3, space='tcp')
+        self.tp.joint_control(poses)
+        p_dense = self.fk.pose_batch(np.column_stack([np.interp(t_dense, self.tp.t_fine, q) for q in self.tp.jq]))[:, :3]
+        self.assertLessEqual(np.linalg.norm(p_dense - self.fk.pose_batch(traj.at(t_dense))[:, :3], axis=1).max(), 1e-3)
+        with self.assertRaises(ValueError):
+            self.tp.set_adaptive_sampling(0)
+
+        loop = poses[:3] + poses[:1]  # 'spl' plans are periodic
+        self.tp.traj_type('spl')
+        with self.assertRaisesRegex(ValueError, 'adaptive'):
+            self.tp.joint_control(loop)
+        self.tp.set_adaptive_sampling(None)
+        self.tp.joint_control(loop, n_samples=40)
+
+    def test_trajectory_sample_adaptive(self):
+        self.tp.traj_type('cu')
+        traj = self.tp.joint_control([[0, 0], [30, 20], [60, -20]], n_samples=20)
+        t, q = traj.sample_adaptive(1e-2)
+        self.assertEqual(q.shape, (len(t), 2))
+        self.assertTrue(np.all(np.diff(t) > 0))
+        self.assertGreater(len(traj.sample_adaptive(1e-4)[0]), len(t))
+        with self.assertRaises(ValueError):
+            traj.sample_adaptive(-1.0)
+
+    def test_save_load_trajectory_file(self):
+        self.tp.traj_type('qu')
+        traj = self.tp.joint_control([[0, 0], [30, 20], [60, -20]], n_samples=20)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "program.rktraj")
+            self.tp.save_trajectory(path)
+            loaded = self.tp.load_trajectory(path)
+            self.assertIsInstance(loaded.q, np.memmap)
+            self.assertEqual(loaded.robot_name, "TestBot")
+            self.assertTrue(np.array_equal(loaded.t, self.tp.t_fine))
+            self.assertTrue(np.array_equal(loaded.q, traj[0]))
+            self.assertTrue(np.allclose(loaded.qdd, self.tp.jq_acc.T))
+            self.assertTrue(np.array_equal(loaded.velocities, self.tp.velocities))
+            replay = loaded.as_trajectory()
+            self.assertTrue(np.allclose(replay.at(1.3, order=1), traj.at(1.3, order=1)))
+            chunks = list(loaded.iter_chunks(16))
+            self.assertTrue(np.array_equal(np.concatenate([c[1] for c in chunks], axis=1), self.tp.jq))
+            self.assertTrue(np.array_equal(self.tp.load_trajectory(path, mmap=False).q, traj[0]))
+
+            other = RobotModel([dict(arg, link_length=0.5) for arg in self.dh_args], robot_name="Other")
+            planner = TrajectoryPlanner(other, self.fk, self.ik, self.jac)
+            with self.assertRaises(ValueError):
+                planner.load_trajectory(path)
+            with self.assertRaises(ValueError):
+                planner.save_trajectory(path)
+
+            junk = os.path.join(tmp, "junk.rktraj")
+            with open(junk, "wb") as f:
+                f.write(b"not a trajectory")
+            with self.assertRaises(ValueError):
+                self.tp.load_trajectory(junk)
+            del loaded, replay, chunks
+
     def test_compute_velocities_ts(self):
         waypoints = np.array([
             [0.2, 0.3, 0.4],
@@ -77,6 +299,7 @@ class TestTrajectoryPlanner(unittest.TestCase):
         out = traj[0]
         self.assertEqual(out.shape[1], 2)  # 6 DOF
         self.assertGreater(out.shape[0], len(waypoints))  # interpolated samples
+        self.assertEqual(self.tp.jq_jerk.shape, self.tp.jq.shape)
 
     def test_spline_js(self):
         joint_angles = [
@@ -105,6 +328,86 @@ class TestTrajectoryPlanner(unittest.TestCase):
         self.assertEqual(q.shape, (100, 3))
         self.assertTrue(np.all(np.isfinite(q)))
 
+    def test_invalid_ik_mode(self):
+        with self.assertRaises(AssertionError):
+            self.tp.set_ik_mode('jacobian')
+
+    def test_taskspace_track_mode(self):
+        self.tp.set_ik_mode('track')
+        waypoints = [[0.6, 0.2, 0.2, 0, 0, 0], [0.5, 0.3, 0.2, 0, 0, 0]]
+        traj = self.tp.create_trajectory(waypoints, traj_method='ts', n_samples=50, xyz_mask=[1, 1, 0, 0, 0, 0])
+        q = np.asarray(traj[0])
+        self.assertEqual(q.shape[1], 2)
+        reached = self.fk.pose_batch(q)
+        target = np.column_stack((self.tp.pos_x, self.tp.pos_y))
+        self.assertLess(np.abs(reached[:, :2] - target).max(), 1e-3)
+
+    def test_parallel_waypoints_match_serial(self):
+        s = np.linspace(0.0, 1.0, 120)
+        targets = np.column_stack((0.6 - 0.3 * s, 0.1 + 0.4 * s, np.full_like(s, 0.2), np.zeros((120, 3))))
+        mask = [1, 1, 0, 0, 0, 0]
+        self.ik.verbose = False
+        serial = np.array(self.tp.solve_waypoints(targets, xyz_mask=mask))
+        self.tp.set_ik_workers(2, chunk_size=40)
+        parallel = np.array(self.tp.solve_waypoints(targets, xyz_mask=mask))
+        self.assertEqual(parallel.shape, serial.shape)
+        self.assertLess(np.abs(parallel - serial).max(), 1e-2)
+        self.assertLess(np.abs(np.diff(parallel, axis=0)).max(), 0.1)
+        with self.assertRaises(ValueError):
+            self.tp.set_ik_workers(0)
+
+    def test_hybrid_taskspace(self):
+        waypoints = [[0.6, 0.2, 0.2, 0, 0, 0], [0.3, 0.4, 0.2, 0, 0, 0], [0.0, 0.6, 0.2, 0, 0, 0]]
+        mask = [1, 1, 0, 0, 0, 0]
+        self.ik.verbose = False
+        self.tp.traj_type('qu')
+        self.tp.set_hybrid_tolerance(tol=1e-3, knots=1)
+        traj = self.tp.create_trajectory(waypoints, traj_method='ts-hybrid', n_samples=100, xyz_mask=mask)
+        self.assertIsInstance(traj, Trajectory)
+        self.assertEqual(traj[0].shape, (199, 2))
+        self.assertLess(self.tp.hybrid_ik_solves, 50)
+        reached = self.fk.pose_batch(traj[0])[:, :2]
+        target = np.column_stack((self.tp.pos_x, self.tp.pos_y))
+        self.assertLess(np.linalg.norm(reached - target, axis=1).max(), 2e-3)
+        self.assertTrue(np.allclose(traj.at(self.tp.t_fine), traj[0]))
+
+        self.tp.traj_type('spl')
+        with self.assertRaises(ValueError):
+            self.tp.create_trajectory(waypoints, traj_method='ts-hybrid', xyz_mask=mask)
+        with self.assertRaises(ValueError):
+            self.tp.set_hybrid_tolerance(tol=0)
+
+    def test_hybrid_failed_midpoint_not_used(self):
+        waypoints = [[0.6, 0.2, 0.2, 0, 0, 0], [0.3, 0.4, 0.2, 0, 0, 0], [0.0, 0.6, 0.2, 0, 0, 0]]
+        mask = [1, 1, 0, 0, 0, 0]
+        self.ik.verbose = False
+        self.tp.traj_type('qu')
+        self.tp.set_hybrid_tolerance(tol=1e-4, knots=0, max_depth=3)
+        solve = self.ik.solve
+        branches = []
+
+        def fail_after_knots(target, **kwargs):
+            q = solve(target, **kwargs)
+            if self.tp.waypoint_success is not None:
+                # every midpoint solve after the initial knots fails
+                branches.append(kwargs.get('branch'))
+                self.ik.success = False
+                return np.zeros(2)
+            return q
+
+        self.ik.solve = fail_after_knots
+        traj = self.tp.create_trajectory(waypoints, traj_method='ts-hybrid', n_samples=50, xyz_mask=mask)
+        self.assertGreater(len(self.tp.hybrid_unrefined), 0)
+        self.assertTrue(all(b is not None for b in branches))
+        self.assertEqual(len(traj.breakpoints), 3)
+        self.assertFalse(np.any(np.all(traj.at(traj.breakpoints) == 0.0, axis=1)))
+
+    def test_unreachable_waypoints_reported(self):
+        waypoints = [[0.6, 0.2, 0.2, 0, 0, 0], [5.0, 0.0, 0.2, 0, 0, 0], [0.0, 4.0, 0.2, 0, 0, 0]]
+        with self.assertRaises(ValueError) as ctx:
+            self.tp.create_trajectory(waypoints, traj_method='ts', n_samples=20)
+        self.assertIn("2 waypoint(s)", str(ctx.exception))
+
 
 if __name__ == "__main__":
     unittest.main()